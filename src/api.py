@@ -3,9 +3,24 @@ import hmac
 import hashlib
 import base64
 import requests
+import numpy as np
 import pandas as pd
-from config import API_KEY, api_secret, GRAPH_API_URL, BASE_URL, logger
-from utils import format_quantity
+from config import API_KEY, api_secret, GRAPH_API_URL, BASE_URL, OHLCV_DTYPE, OHLCV_CANDLE_SECONDS, logger
+from data_quality import check_candles
+from utils import to_units, format_units
+
+# HTTP transport used for every API call; replay.py swaps in a recorder or a recorded stand-in
+transport = requests
+# Pair rules that order prices are quantized to, loaded on the first order with a price
+_exchange_info = None
+
+def _default_exchange_info():
+    global _exchange_info
+    if _exchange_info is None:
+        # Imported here because exchange_info.py fetches its rules through this module
+        from exchange_info import ExchangeInfo
+        _exchange_info = ExchangeInfo()
+    return _exchange_info
 
 def get_headers(endpoint: str, nonce: str) -> dict:
     """
@@ -31,39 +46,121 @@ def get_headers(endpoint: str, nonce: str) -> dict:
         'Content-Type': 'application/json',
     }
 
-def get_ohlcv(symbol: str, limit: int = 100) -> pd.DataFrame:
+# Price and volume columns kept from the OHLCV response
+OHLCV_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+def parse_ohlcv(rows: list, dtype=OHLCV_DTYPE) -> pd.DataFrame:
+    """
+    Parses OHLCV rows from the API directly into typed columns.
+
+    Args:
+        rows (list of dict): The candles as returned by the API, each with 'time' (in seconds)
+            and the OHLCV fields, as numbers or numeric strings.
+        dtype (optional): The float type of the price and volume columns, e.g. 'float32' to
+            halve memory when holding long histories (default is config.OHLCV_DTYPE).
+
+    Returns:
+        pd.DataFrame: A DataFrame indexed by time with float 'open', 'high', 'low', 'close' and 'volume' columns.
+    """
+    count = len(rows)
+    columns = {column: np.fromiter((row[column] for row in rows), dtype=dtype, count=count)
+               for column in OHLCV_COLUMNS}
+    times = np.fromiter((row['time'] for row in rows), dtype=np.int64, count=count)
+    return pd.DataFrame(columns, index=pd.DatetimeIndex(pd.to_datetime(times, unit='s'), name='time'))
+
+def get_ohlcv(symbol: str, limit: int = 100, dtype=OHLCV_DTYPE) -> pd.DataFrame:
     """
     Fetches OHLCV (Open, High, Low, Close, Volume) data from the API.
 
     Args:
         symbol (str): The trading pair symbol (e.g., 'BTCUSD').
         limit (int): The number of data points to return (default is 100).
+        dtype (optional): The float type of the price and volume columns (default is config.OHLCV_DTYPE).
 
     Returns:
-        pd.DataFrame: A DataFrame containing the OHLCV data, or an empty DataFrame on failure.
+        pd.DataFrame: A DataFrame containing the OHLCV data, checked by `data_quality.check_candles`,
+        or an empty DataFrame on failure.
     """
     endpoint = f'/v1/ohlcs?pair={symbol}'
     url = GRAPH_API_URL + endpoint
     try:
-        response = requests.get(url, timeout=10)
+        response = transport.get(url, timeout=10)
         response.raise_for_status()
     except requests.exceptions.RequestException as e:
-        logger.error(f"Error fetching OHLCV data: {e}")
+        logger.error("Error fetching OHLCV data: %s", e, extra={'fields': {'symbol': symbol}})
         return pd.DataFrame()  # Return an empty DataFrame in case of error
 
     data = response.json()
     if not data:
-        logger.error("No data received from API")
+        logger.error("No data received from API", extra={'fields': {'symbol': symbol}})
         return pd.DataFrame()  # Return an empty DataFrame if no data is received
 
-    # Process the data into a DataFrame
-    df = pd.DataFrame(data)
-    df['time'] = pd.to_datetime(df['time'], unit='s')
-    df.set_index('time', inplace=True)
-    
-    return df.tail(limit)  # Return only the last 'limit' number of rows
+    # Parse only the last 'limit' rows into typed columns, then drop, order and gap-check them
+    df, _ = check_candles(parse_ohlcv(data[-limit:], dtype=dtype), spacing=OHLCV_CANDLE_SECONDS, symbol=symbol)
+    return df.iloc[-limit:]
+
+# Column names of the OHLCV arrays in a klines (TradingView-style) response
+KLINES_COLUMNS = {'open': 'o', 'high': 'h', 'low': 'l', 'close': 'c', 'volume': 'v'}
+
+def get_klines(symbol: str, start: int, end: int, resolution: int = 1, dtype=OHLCV_DTYPE) -> pd.DataFrame:
+    """
+    Fetches OHLCV candles of any resolution for a time range from the graph API.
+
+    Args:
+        symbol (str): The trading pair symbol (e.g., 'BTCTRY').
+        start (int): The start of the range, in Unix seconds (inclusive).
+        end (int): The end of the range, in Unix seconds (inclusive).
+        resolution (int, optional): The candle length in minutes (default is 1).
+        dtype (optional): The float type of the price and volume columns (default is config.OHLCV_DTYPE).
+
+    Returns:
+        pd.DataFrame or None: A DataFrame indexed by time with the OHLCV columns (empty if the range
+        has no candles), or None if the request failed.
+    """
+    endpoint = f'/v1/klines/history?symbol={symbol}&resolution={resolution}&from={start}&to={end}'
+    url = GRAPH_API_URL + endpoint
+    try:
+        response = transport.get(url, timeout=10)
+        response.raise_for_status()
+        data = response.json()
+    except (requests.exceptions.RequestException, ValueError) as e:
+        logger.error("Error fetching klines for %s: %s", symbol, e)
+        return None  # Return None so callers can retry the range
 
-def place_order(symbol: str, side: str, quantity: float, price: float = 0, stop_loss: float = None, take_profit: float = None) -> dict:
+    if data.get('s') not in ('ok', 'no_data'):
+        logger.error("Error fetching klines for %s: %s", symbol, data)
+        return None
+
+    # Convert the column arrays directly into typed arrays
+    times = np.asarray(data.get('t', []), dtype=np.int64)
+    columns = {column: np.asarray(data.get(key, []), dtype=dtype) for column, key in KLINES_COLUMNS.items()}
+    return pd.DataFrame(columns, index=pd.DatetimeIndex(pd.to_datetime(times, unit='s'), name='time'))
+
+def get_order_book(symbol: str, limit: int = 25) -> dict:
+    """
+    Fetches the visible bids and asks of a trading pair.
+
+    Args:
+        symbol (str): The trading pair symbol (e.g., 'BTCTRY').
+        limit (int, optional): The number of price levels per side (default is 25).
+
+    Returns:
+        dict: 'bids' and 'asks' as (levels x 2) float arrays of price and quantity, best first,
+        or an empty dict on failure.
+    """
+    url = BASE_URL + f'/api/v2/orderbook?pairSymbol={symbol}&limit={limit}'
+    try:
+        response = transport.get(url, timeout=10)
+        response.raise_for_status()
+        data = response.json().get('data') or {}
+    except (requests.exceptions.RequestException, ValueError) as e:
+        logger.error("Error fetching order book: %s", e, extra={'fields': {'symbol': symbol}})
+        return {}  # Return an empty dict in case of error
+
+    return {side: np.asarray(data.get(side) or [], dtype=np.float64).reshape(-1, 2) for side in ('bids', 'asks')}
+
+def place_order(symbol: str, side: str, quantity: float, price: float = 0, stop_loss: float = None, take_profit: float = None,
+                quantity_precision: int = 8, exchange_info=None) -> dict:
     """
     Places an order (buy/sell) on the exchange.
 
@@ -74,43 +171,53 @@ def place_order(symbol: str, side: str, quantity: float, price: float = 0, stop_
         price (float, optional): The price at which to place the order (default is 0 for market orders).
         stop_loss (float, optional): The price at which to trigger a stop loss.
         take_profit (float, optional): The price at which to trigger a take profit.
+        quantity_precision (int, optional): The decimal places of the quantity, rounded down (default is 8).
+        exchange_info (ExchangeInfo, optional): The pair rules the prices are rounded to: the pair's
+            tick size and quote precision (default is a shared instance, loaded on first use).
 
     Returns:
         dict or None: The response from the API if successful, otherwise None.
     """
     endpoint = '/api/v1/order'
     nonce = str(int(time.time() * 1000))  # Generate a unique nonce
-    formatted_quantity = format_quantity(quantity, precision=8)  # Ensure correct precision for quantity
+
+    # Round the limit, stop and take-profit prices to the pair's tick size and quote precision
+    prices = [price or 0, stop_loss or 0, take_profit or 0]
+    formatted = [None] * len(prices)
+    if any(prices):
+        units, precisions = (exchange_info or _default_exchange_info()).quantize_prices([symbol] * len(prices), prices)
+        formatted = [format_units(unit, precision) if value else None
+                     for value, unit, precision in zip(prices, units, precisions)]
 
     # Construct the order parameters
     params = {
         'pairSymbol': symbol,
-        'quantity': f"{formatted_quantity:.8f}",
-        'price': f"{price:.2f}" if price != 0 else 0,
+        'quantity': format_units(to_units(quantity, quantity_precision), quantity_precision),
+        'price': formatted[0] if price != 0 else 0,
         'orderType': 0 if side == 'buy' else 1,  # 0 for buy, 1 for sell
         'orderMethod': 1,
-        'stopPrice': f"{stop_loss:.2f}" if stop_loss else None,
-        'takeProfitPrice': f"{take_profit:.2f}" if take_profit else None,
+        'stopPrice': formatted[1],
+        'takeProfitPrice': formatted[2],
     }
     
     headers = get_headers(endpoint, nonce)  # Get the required headers for authentication
     url = BASE_URL + endpoint
     try:
-        response = requests.post(url, headers=headers, json=params)
+        response = transport.post(url, headers=headers, json=params)
         response_data = response.json()
     except requests.exceptions.RequestException as e:
-        logger.error(f"Error placing order: {e}")
+        logger.error("Error placing order: %s", e, extra={'fields': {'order': params}})
         return None  # Return None in case of error
     except requests.exceptions.JSONDecodeError:
-        logger.error(f"Error placing order: {response.status_code} - Response is not JSON.")
-        logger.error(f"Raw response content: {response.text}")
+        logger.error("Error placing order: %s - Response is not JSON.", response.status_code,
+                     extra={'fields': {'order': params, 'response': response.text}})
         return None  # Return None if response is not JSON
 
     if response.status_code != 200:
-        logger.error(f"Error placing order: {response.status_code} - {response_data}")
+        logger.error("Error placing order: %s - %s", response.status_code, response_data, extra={'fields': {'order': params}})
         return None  # Return None if the request fails with a non-200 status code
     
-    logger.info(f"Order placed: {response_data}")  # Log success
+    logger.info("Order placed", extra={'fields': {'order': params, 'response': response_data}})  # Log success
     return response_data  # Return the API response data
 
 def get_account_balance() -> list:
@@ -126,11 +233,29 @@ def get_account_balance() -> list:
     headers = get_headers(endpoint, nonce)  # Get the necessary headers
     url = BASE_URL + endpoint
     try:
-        response = requests.get(url, headers=headers, timeout=10)
+        response = transport.get(url, headers=headers, timeout=10)
         response.raise_for_status()  # Raise an exception for HTTP errors
     except requests.exceptions.RequestException as e:
-        logger.error(f"Error fetching account balance: {e}")
+        logger.error("Error fetching account balance: %s", e)
         return []  # Return an empty list in case of error
     
     logger.info("Account balance fetched successfully.")
-    return response.json().get('data', [])  # Return the balance data or an empty list
\ No newline at end of file
+    return response.json().get('data', [])  # Return the balance data or an empty list
+
+def get_exchange_info() -> list:
+    """
+    Fetches the trading rules of every pair on the exchange.
+
+    Returns:
+        list: A list of pair descriptions, each with its name, scales and filters, or an empty list on failure.
+    """
+    url = BASE_URL + '/api/v2/server/exchangeinfo'
+    try:
+        response = transport.get(url, timeout=10)
+        response.raise_for_status()
+        data = response.json()
+    except (requests.exceptions.RequestException, ValueError) as e:
+        logger.error("Error fetching exchange info: %s", e)
+        return []  # Return an empty list in case of error
+
+    return (data.get('data') or {}).get('symbols', [])
@@ -0,0 +1,129 @@
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import pandas as pd
+from tqdm import tqdm
+from api import get_klines
+from candle_store import CandleStore
+from config import GRAPH_API_RATE_LIMIT, logger
+from data_quality import check_candles
+
+class RateLimiter:
+    """
+    Spaces out calls from any number of threads so they stay within a request rate.
+    """
+
+    def __init__(self, requests_per_second: float):
+        """
+        Initializes the limiter.
+
+        Args:
+            requests_per_second (float): The maximum sustained request rate.
+        """
+        self.interval = 1.0 / requests_per_second
+        self._next_slot = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """
+        Blocks until the calling thread may send its next request.
+        """
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next_slot, now)
+            self._next_slot = slot + self.interval
+        time.sleep(max(0.0, slot - now))
+
+def chunk_ranges(start: int, end: int, resolution: int = 1, chunk_bars: int = 1000) -> list:
+    """
+    Splits a time range into consecutive chunks of at most `chunk_bars` candles.
+
+    Chunk boundaries are aligned to multiples of the chunk length, so the same chunks are produced
+    (and found in the store) whenever an overlapping range is backfilled again.
+
+    Args:
+        start (int): The start of the range, in Unix seconds.
+        end (int): The end of the range, in Unix seconds.
+        resolution (int, optional): The candle length in minutes (default is 1).
+        chunk_bars (int, optional): The number of candles per chunk (default is 1000).
+
+    Returns:
+        list: A list of (chunk_start, chunk_end) tuples in Unix seconds, both inclusive.
+    """
+    length = resolution * 60 * chunk_bars
+    first = start - start % length
+    return [(chunk_start, chunk_start + length - 1) for chunk_start in range(first, end + 1, length)]
+
+def backfill(pair: str, start: int, end: int, resolution: int = 1, chunk_bars: int = 1000,
+             max_workers: int = 4, requests_per_second: float = GRAPH_API_RATE_LIMIT,
+             retries: int = 3, store: CandleStore = None) -> dict:
+    """
+    Downloads historical candles into the local candle store.
+
+    The range is split into chunks that are downloaded concurrently within the rate limit,
+    validated and written to the store. Chunks already in the store are skipped, so an
+    interrupted backfill resumes where it stopped when run again.
+
+    Args:
+        pair (str): The trading pair symbol (e.g., 'BTCTRY').
+        start (int): The start of the range, in Unix seconds.
+        end (int): The end of the range, in Unix seconds.
+        resolution (int, optional): The candle length in minutes (default is 1).
+        chunk_bars (int, optional): The number of candles per request (default is 1000).
+        max_workers (int, optional): The number of concurrent downloads (default is 4).
+        requests_per_second (float, optional): The request rate limit (default is config.GRAPH_API_RATE_LIMIT).
+        retries (int, optional): Attempts per chunk before giving up on it (default is 3).
+        store (CandleStore, optional): The store to write to (default is a CandleStore at config.CANDLE_STORE_DIR).
+
+    Returns:
+        dict: Counts of 'chunks', 'skipped', 'downloaded', 'failed' chunks and stored 'candles'.
+    """
+    store = store or CandleStore()
+    limiter = RateLimiter(requests_per_second)
+    chunks = chunk_ranges(start, end, resolution, chunk_bars)
+    pending = [chunk for chunk in chunks if not store.has_chunk(pair, resolution, *chunk)]
+    summary = {'chunks': len(chunks), 'skipped': len(chunks) - len(pending), 'downloaded': 0, 'failed': 0, 'candles': 0}
+
+    # The chunk containing the current time is still filling up, so it is not checkpointed
+    now = int(time.time())
+
+    def download(chunk_start: int, chunk_end: int):
+        for attempt in range(retries):
+            limiter.wait()
+            df = get_klines(pair, chunk_start, chunk_end, resolution=resolution)
+            if df is not None:
+                # Gaps are only counted: the store keeps what the exchange returned
+                df, _ = check_candles(df, spacing=resolution * 60, policy='flag', symbol=pair)
+                if chunk_end < now:
+                    store.write_chunk(pair, resolution, chunk_start, chunk_end, df)
+                return len(df)
+            time.sleep(2 ** attempt)  # Back off before retrying the chunk
+        return None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(download, *chunk): chunk for chunk in pending}
+        for future in tqdm(as_completed(futures), total=len(futures), desc=f"Backfilling {pair}"):
+            count = future.result()
+            if count is None:
+                summary['failed'] += 1
+                logger.error("Backfill of %s chunk %s failed after %d attempts.", pair, futures[future], retries)
+            else:
+                summary['downloaded'] += 1
+                summary['candles'] += count
+
+    logger.info("Backfill of %s finished", pair, extra={'fields': summary})
+    return summary
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Download historical candles into the local candle store.')
+    parser.add_argument('pair', help="Trading pair symbol, e.g. 'BTCTRY'")
+    parser.add_argument('--start', required=True, help="Start date, e.g. '2023-01-01'")
+    parser.add_argument('--end', default=None, help='End date (default is now)')
+    parser.add_argument('--resolution', type=int, default=1, help='Candle length in minutes (default is 1)')
+    parser.add_argument('--workers', type=int, default=4, help='Concurrent downloads (default is 4)')
+    args = parser.parse_args()
+
+    start_time = int(pd.Timestamp(args.start).timestamp())
+    end_time = int(pd.Timestamp(args.end).timestamp()) if args.end else int(time.time())
+    backfill(args.pair, start_time, end_time, resolution=args.resolution, max_workers=args.workers)
@@ -0,0 +1,243 @@
+import hashlib
+import inspect
+import json
+import marshal
+import os
+import pickle
+import sysconfig
+import numpy as np
+import pandas as pd
+from config import BACKTEST_CACHE_DIR, BACKTEST_CACHE_MAX_BYTES, logger
+
+# Code under these directories (the standard library and installed packages) is not fingerprinted
+_LIBRARY_PATHS = tuple({os.path.realpath(sysconfig.get_paths()[name]) for name in ('stdlib', 'purelib', 'platlib')})
+# Module-level values of these types, and containers of them, are part of a function's fingerprint when it reads them
+_CONSTANT_TYPES = (type(None), bool, int, float, complex, str, bytes)
+# Returned by `BacktestCache.get` for keys that are not cached, so None results can be cached too
+_MISSING = object()
+
+def fingerprint_data(data) -> str:
+    """
+    Returns a hash of the contents of a DataFrame, Series or array.
+
+    Column names, dtypes and values (including the index of pandas objects) are hashed, so any
+    change to the candles gives a different fingerprint.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    if isinstance(data, pd.Series):
+        data = data.to_frame()
+    if isinstance(data, pd.DataFrame):
+        arrays = [('index', data.index.to_numpy())] + [(str(column), data[column].to_numpy()) for column in data.columns]
+    else:
+        arrays = [('array', np.asarray(data))]
+    for name, array in arrays:
+        if array.dtype.kind == 'M':
+            array = array.astype('datetime64[ns]').view(np.int64)
+        digest.update(f'{name}:{array.dtype.str}:{array.shape}'.encode('utf-8'))
+        if array.dtype.kind == 'O':
+            digest.update(repr(array.tolist()).encode('utf-8'))
+        else:
+            digest.update(np.ascontiguousarray(array).tobytes())
+    return digest.hexdigest()
+
+def _constant_repr(value) -> str:
+    # A deterministic representation of scalars and (nested) containers of them, or None for anything else
+    if isinstance(value, _CONSTANT_TYPES):
+        return repr(value)
+    if isinstance(value, (tuple, list)):
+        items = [_constant_repr(item) for item in value]
+        return None if None in items else f"{type(value).__name__}({', '.join(items)})"
+    if isinstance(value, (set, frozenset)):
+        items = [_constant_repr(item) for item in value]
+        return None if None in items else f"{type(value).__name__}({', '.join(sorted(items))})"
+    if isinstance(value, dict):
+        items = [(_constant_repr(key), _constant_repr(item)) for key, item in value.items()]
+        if any(None in pair for pair in items):
+            return None
+        return f"dict({', '.join(sorted(f'{key}: {item}' for key, item in items))})"
+    return None
+
+def _is_project_code(value) -> bool:
+    try:
+        path = inspect.getsourcefile(value)
+    except (TypeError, OSError):
+        return False  # Built-in or C code
+    return path is not None and not os.path.realpath(path).startswith(_LIBRARY_PATHS)
+
+def _source(value) -> bytes:
+    try:
+        return inspect.getsource(value).encode('utf-8')
+    except (OSError, TypeError):
+        pass
+    # Defined interactively; fall back to the bytecode
+    if inspect.isclass(value):
+        return b''.join(marshal.dumps(member.__code__) for _, member in sorted(vars(value).items())
+                        if inspect.isfunction(member))
+    return marshal.dumps(value.__code__) if hasattr(value, '__code__') else b''
+
+def _class_members(cls) -> list:
+    # The functions defined in a class body, including static and class methods and properties
+    members = []
+    for member in vars(cls).values():
+        if isinstance(member, (staticmethod, classmethod)):
+            member = member.__func__
+        if isinstance(member, property):
+            members.extend(function for function in (member.fget, member.fset, member.fdel) if function)
+        elif inspect.isfunction(member):
+            members.append(member)
+    return members + list(cls.__bases__)
+
+def fingerprint_function(function) -> str:
+    """
+    Returns a hash of a function's source and of the project code and constants it references.
+
+    Everything the function reads from its globals is followed: helper functions, classes (their
+    source, methods and base classes), modules (their whole source, and the functions and classes
+    used through them, e.g. `model.train_model`) and constants, including dicts, lists and tuples
+    of them. Editing an indicator, a model internal or a lookup table therefore changes the
+    fingerprint of every function built on it. Library code is not followed.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    seen = set()
+    pending = [function]
+    while pending:
+        current = pending.pop()
+        if not (inspect.isclass(current) or inspect.ismodule(current)):
+            current = inspect.unwrap(current)
+        if id(current) in seen or not _is_project_code(current):
+            continue
+        seen.add(id(current))
+        name = current.__name__ if inspect.ismodule(current) else f'{current.__module__}.{current.__qualname__}'
+        digest.update(f'{name}\n'.encode('utf-8') + _source(current))
+        if inspect.ismodule(current):
+            continue  # Its members are followed where they are used
+        if inspect.isclass(current):
+            pending.extend(_class_members(current))
+            continue
+
+        # Collect the global and attribute names used by the function and by any lambdas or nested functions in it
+        codes, names = [current.__code__], set()
+        while codes:
+            code = codes.pop()
+            names.update(code.co_names)
+            codes.extend(const for const in code.co_consts if inspect.iscode(const))
+        for name in sorted(names):
+            if name not in current.__globals__:
+                continue
+            value = current.__globals__[name]
+            if inspect.ismodule(value):
+                if _is_project_code(value):
+                    pending.append(value)
+                    # Attribute names are in co_names too, so `module.helper` is followed through them
+                    pending.extend(getattr(value, attribute) for attribute in sorted(names) if hasattr(value, attribute))
+            elif inspect.isfunction(value) or inspect.isclass(value) or hasattr(value, '__wrapped__'):
+                pending.append(value)
+            else:
+                constant = _constant_repr(value)
+                if constant is not None:
+                    digest.update(f'{name}={constant}'.encode('utf-8'))
+    return digest.hexdigest()
+
+def _describe(value):
+    # Callables are identified by their code, everything else by its value
+    if callable(value):
+        return fingerprint_function(value)
+    if isinstance(value, (pd.DataFrame, pd.Series, np.ndarray)):
+        return fingerprint_data(value)
+    return repr(value)
+
+class BacktestCache:
+    """
+    A content-addressed, size-bounded on-disk cache of backtest results.
+
+    A result is keyed by the fingerprint of the input candles, of the backtest and strategy code
+    and of the parameters, so a rerun after editing one indicator recomputes only the runs that
+    use it. When the cache grows beyond `max_bytes`, the least recently used results are evicted.
+    """
+
+    def __init__(self, root: str = BACKTEST_CACHE_DIR, max_bytes: int = BACKTEST_CACHE_MAX_BYTES):
+        """
+        Initializes the cache.
+
+        Args:
+            root (str, optional): The directory holding cached results (default is config.BACKTEST_CACHE_DIR).
+            max_bytes (int, optional): The total size of cached results kept (default is config.BACKTEST_CACHE_MAX_BYTES).
+        """
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, data, function, *args, **kwargs) -> str:
+        """
+        Returns the cache key of calling `function(*args, **kwargs)` on the given candles.
+        """
+        parts = [fingerprint_data(data), fingerprint_function(function),
+                 [_describe(arg) for arg in args], {name: _describe(value) for name, value in sorted(kwargs.items())}]
+        return hashlib.blake2b(json.dumps(parts).encode('utf-8'), digest_size=20).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], f'{key}.pkl')
+
+    def get(self, key: str, default=None):
+        """
+        Returns the cached result for a key, or `default` if it is not cached.
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                result = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return default
+        os.utime(path)  # Mark as recently used
+        return result
+
+    def put(self, key: str, result):
+        """
+        Atomically stores a result and evicts the least recently used results beyond the size limit.
+        """
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = f'{path}.{os.getpid()}.tmp'
+        with open(temporary, 'wb') as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, path)
+        self.evict()
+
+    def evict(self):
+        """
+        Removes the least recently used results until the cache fits in `max_bytes`.
+        """
+        entries = []
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                if name.endswith('.pkl'):
+                    stat = os.stat(os.path.join(directory, name))
+                    entries.append((stat.st_mtime, stat.st_size, os.path.join(directory, name)))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+
+    def run(self, function, *args, data, **kwargs):
+        """
+        Returns `function(*args, **kwargs)`, computing it only if the same run is not cached.
+
+        Args:
+            function (callable): The backtest to run.
+            *args: Positional arguments of the backtest; callables (strategies) are keyed by their code.
+            data: The candles the backtest reads, used to key the result.
+            **kwargs: Keyword arguments of the backtest.
+        """
+        key = self.key(data, function, *args, **kwargs)
+        result = self.get(key, _MISSING)
+        if result is not _MISSING:
+            self.hits += 1
+            return result
+        self.misses += 1
+        result = function(*args, **kwargs)
+        self.put(key, result)
+        logger.info("Backtest result cached", extra={'fields': {'function': function.__qualname__, 'key': key}})
+        return result
@@ -0,0 +1,112 @@
+import os
+import numpy as np
+import pandas as pd
+from config import CANDLE_STORE_DIR, OHLCV_DTYPE
+
+# On-disk record layout of one candle
+CANDLE_DTYPE = np.dtype([
+    ('time', np.int64),  # Unix seconds
+    ('open', np.float64),
+    ('high', np.float64),
+    ('low', np.float64),
+    ('close', np.float64),
+    ('volume', np.float64),
+])
+
+class CandleStore:
+    """
+    A local on-disk store of historical candles.
+
+    Candles are kept per pair and resolution as chunk files named after the time range they
+    cover. A chunk file is written atomically once its range has been downloaded and validated,
+    so its existence doubles as the checkpoint for resuming an interrupted backfill.
+    """
+
+    def __init__(self, root: str = CANDLE_STORE_DIR):
+        """
+        Initializes the store.
+
+        Args:
+            root (str, optional): The directory holding the store (default is config.CANDLE_STORE_DIR).
+        """
+        self.root = root
+
+    def _directory(self, pair: str, resolution: int) -> str:
+        return os.path.join(self.root, pair, f'{resolution}m')
+
+    def chunk_path(self, pair: str, resolution: int, start: int, end: int) -> str:
+        """
+        Returns the path of the chunk file covering [start, end] (in Unix seconds).
+        """
+        return os.path.join(self._directory(pair, resolution), f'{start}-{end}.npy')
+
+    def has_chunk(self, pair: str, resolution: int, start: int, end: int) -> bool:
+        """
+        Checks whether the chunk covering [start, end] has already been stored.
+        """
+        return os.path.exists(self.chunk_path(pair, resolution, start, end))
+
+    def write_chunk(self, pair: str, resolution: int, start: int, end: int, df: pd.DataFrame):
+        """
+        Atomically writes the candles of one chunk.
+
+        Args:
+            pair (str): The trading pair symbol (e.g., 'BTCTRY').
+            resolution (int): The candle length in minutes.
+            start (int): The start of the chunk's range, in Unix seconds.
+            end (int): The end of the chunk's range, in Unix seconds.
+            df (pd.DataFrame): Candles indexed by time with the OHLCV columns.
+        """
+        records = np.empty(len(df), dtype=CANDLE_DTYPE)
+        records['time'] = df.index.as_unit('s').asi8
+        for column in CANDLE_DTYPE.names[1:]:
+            records[column] = df[column].to_numpy()
+
+        path = self.chunk_path(pair, resolution, start, end)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = path + '.tmp'
+        with open(temporary, 'wb') as f:
+            np.save(f, records)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, path)  # Readers never see a partially written chunk
+
+    def load(self, pair: str, resolution: int = 1, start: int = None, end: int = None, dtype=OHLCV_DTYPE) -> pd.DataFrame:
+        """
+        Loads stored candles, sorted and deduplicated by time.
+
+        Args:
+            pair (str): The trading pair symbol (e.g., 'BTCTRY').
+            resolution (int, optional): The candle length in minutes (default is 1).
+            start (int, optional): Only return candles at or after this Unix time.
+            end (int, optional): Only return candles at or before this Unix time.
+            dtype (optional): The float type of the price and volume columns (default is config.OHLCV_DTYPE).
+
+        Returns:
+            pd.DataFrame: A DataFrame indexed by time with the OHLCV columns, empty if nothing is stored.
+        """
+        directory = self._directory(pair, resolution)
+        chunks = []
+        if os.path.isdir(directory):
+            for name in os.listdir(directory):
+                if not name.endswith('.npy'):
+                    continue
+                chunk_start, chunk_end = (int(part) for part in name[:-len('.npy')].split('-'))
+                # Skip chunks entirely outside the requested range without reading them
+                if (start is not None and chunk_end < start) or (end is not None and chunk_start > end):
+                    continue
+                chunks.append(np.load(os.path.join(directory, name), mmap_mode='r'))
+
+        records = np.concatenate(chunks) if chunks else np.empty(0, dtype=CANDLE_DTYPE)
+        # np.unique sorts by time and keeps the first record of each timestamp
+        _, first = np.unique(records['time'], return_index=True)
+        records = records[first]
+        mask = np.ones(len(records), dtype=bool)
+        if start is not None:
+            mask &= records['time'] >= start
+        if end is not None:
+            mask &= records['time'] <= end
+        records = records[mask]
+
+        columns = {column: records[column].astype(dtype) for column in CANDLE_DTYPE.names[1:]}
+        return pd.DataFrame(columns, index=pd.DatetimeIndex(pd.to_datetime(records['time'], unit='s'), name='time'))
@@ -1,9 +1,90 @@
 import os
 import base64
+import json
+import queue
+import atexit
 import logging
+from logging.handlers import QueueHandler, QueueListener
 
-# Configure the logging system to capture logs at the INFO level
-logging.basicConfig(level=logging.INFO)
+class StructuredFormatter(logging.Formatter):
+    """
+    Formats log records as one JSON object per line.
+
+    Structured data passed as `extra={'fields': {...}}` is added to the object as top-level keys.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        entry.update(getattr(record, 'fields', {}))
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+class TextFormatter(logging.Formatter):
+    """
+    Formats log records as plain lines, with the structured `extra={'fields': {...}}` data
+    appended as key=value pairs.
+    """
+
+    def __init__(self):
+        super().__init__(logging.BASIC_FORMAT)
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = getattr(record, 'fields', None)
+        if not fields:
+            return line
+        pairs = ' '.join(f'{key}={json.dumps(value, default=str)}' for key, value in fields.items())
+        # Keep a traceback, if any, after the fields
+        first, _, rest = line.partition('\n')
+        return f'{first} {pairs}' + (f'\n{rest}' if rest else '')
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    Queues log records without formatting them, so the message is only built on the writer thread.
+
+    Log arguments are therefore read after the call returns; pass values that are not mutated later.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+# Configure the logging system to capture logs at the INFO level. Callers only enqueue records;
+# formatting and writing happen on a background listener thread, off the decision path.
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")  # 'json' for structured records, 'text' for plain lines
+_log_queue = queue.SimpleQueue()
+
+def _log_formatter() -> logging.Formatter:
+    return StructuredFormatter() if LOG_FORMAT == 'json' else TextFormatter()
+
+_log_output = logging.StreamHandler()
+_log_output.setFormatter(_log_formatter())
+_log_listener = QueueListener(_log_queue, _log_output, respect_handler_level=True)
+_log_listener.start()
+atexit.register(_log_listener.stop)  # Drain queued records before the process exits
+logging.basicConfig(level=logging.INFO, handlers=[DeferredQueueHandler(_log_queue)])
+
+def configure_child_logging():
+    """
+    Makes a forked child process write its log records directly.
+
+    A forked child inherits the queue handler but not the listener thread that drains the queue,
+    so its records would be lost. Registered to run in every forked child (e.g. the process pools
+    of sharded_backtest.py and evaluation.py).
+    """
+    handler = logging.StreamHandler()
+    handler.setFormatter(_log_formatter())
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+
+os.register_at_fork(after_in_child=configure_child_logging)
 logger = logging.getLogger(__name__)
 
 # Retrieve API keys from environment variables
@@ -24,5 +105,68 @@ except Exception as e:
 BASE_URL = 'https://api.btcturk.com'  # Base URL for primary API
 GRAPH_API_URL = 'https://graph-api.btcturk.com'  # Base URL for graph API (historical data)
 
+# Float type of OHLCV price and volume columns; 'float32' halves memory for long histories
+OHLCV_DTYPE = os.getenv("OHLCV_DTYPE", "float64")
+
+# Local candle store location and the request rate allowed against the graph API during backfills
+CANDLE_STORE_DIR = os.getenv("CANDLE_STORE_DIR", os.path.join("data", "candles"))
+GRAPH_API_RATE_LIMIT = float(os.getenv("GRAPH_API_RATE_LIMIT", "5"))  # Requests per second
+
+# Balance ledger settings: how often (in seconds) the local ledger is reconciled against the
+# exchange, and the absolute drift per asset above which a warning is logged
+BALANCE_RECONCILE_INTERVAL = float(os.getenv("BALANCE_RECONCILE_INTERVAL", "300"))
+BALANCE_DRIFT_TOLERANCE = float(os.getenv("BALANCE_DRIFT_TOLERANCE", "1e-8"))
+
+# Location of the binary decision journal (see journal.py)
+JOURNAL_PATH = os.getenv("JOURNAL_PATH", os.path.join("data", "journal.bin"))
+
+# Persisted bot state (see state.py) and the directory holding trained model artifacts
+STATE_PATH = os.getenv("STATE_PATH", os.path.join("data", "state.bin"))
+MODEL_DIR = os.getenv("MODEL_DIR", os.path.join("data", "models"))
+
+# On-disk cache of backtest results (see backtest_cache.py) and its size limit in bytes
+BACKTEST_CACHE_DIR = os.getenv("BACKTEST_CACHE_DIR", os.path.join("data", "backtest_cache"))
+BACKTEST_CACHE_MAX_BYTES = int(os.getenv("BACKTEST_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+# Strategies run by the bot (see strategies.py), and optional per-strategy overrides as JSON,
+# e.g. '{"rsi": {"weight": 2}, "bollinger": {"params": {"trend_period": 100}}}'
+ENABLED_STRATEGIES = [name.strip() for name in os.getenv("STRATEGIES", "bollinger,macd,rsi,stochastic,atr,ml").split(",") if name.strip()]
+STRATEGY_OVERRIDES = json.loads(os.getenv("STRATEGY_OVERRIDES", "{}"))
+# Workers per pool used to evaluate strategies concurrently (see evaluation.py)
+EVALUATION_WORKERS = int(os.getenv("EVALUATION_WORKERS", "4"))
+# Candles fetched to train the model when no trained model is available
+MODEL_TRAINING_BARS = int(os.getenv("MODEL_TRAINING_BARS", "1000"))
+
+# Read-through caching of API reads (see read_cache.py): seconds OHLCV and balance responses are
+# reused, the candle length OHLCV responses also expire at, and the number of responses kept
+OHLCV_CACHE_TTL = float(os.getenv("OHLCV_CACHE_TTL", "60"))
+OHLCV_CANDLE_SECONDS = int(os.getenv("OHLCV_CANDLE_SECONDS", "86400"))
+BALANCE_CACHE_TTL = float(os.getenv("BALANCE_CACHE_TTL", "5"))
+READ_CACHE_MAX_ENTRIES = int(os.getenv("READ_CACHE_MAX_ENTRIES", "128"))
+
+# Smallest order value, in the quote asset, that the order batch submits (see orders.py)
+MIN_ORDER_NOTIONAL = float(os.getenv("MIN_ORDER_NOTIONAL", "10"))
+
+# Cached pair precisions and order limits (see exchange_info.py), refreshed after EXCHANGE_INFO_TTL seconds
+EXCHANGE_INFO_PATH = os.getenv("EXCHANGE_INFO_PATH", os.path.join("data", "exchange_info.json"))
+EXCHANGE_INFO_TTL = float(os.getenv("EXCHANGE_INFO_TTL", "21600"))
+
+# Sliced execution (see execution.py): orders worth at least EXECUTION_SLICE_NOTIONAL in the quote asset
+# are worked as child orders every EXECUTION_INTERVAL seconds over EXECUTION_DURATION seconds, either
+# evenly ('twap') or sized to EXECUTION_PARTICIPATION of the book depth within EXECUTION_PRICE_BAND ('iceberg')
+EXECUTION_SLICE_NOTIONAL = float(os.getenv("EXECUTION_SLICE_NOTIONAL", "50000"))
+EXECUTION_STYLE = os.getenv("EXECUTION_STYLE", "twap")
+EXECUTION_DURATION = float(os.getenv("EXECUTION_DURATION", "300"))
+EXECUTION_INTERVAL = float(os.getenv("EXECUTION_INTERVAL", "30"))
+EXECUTION_PARTICIPATION = float(os.getenv("EXECUTION_PARTICIPATION", "0.2"))
+EXECUTION_PRICE_BAND = float(os.getenv("EXECUTION_PRICE_BAND", "0.002"))
+# Seconds working orders may take to finish on shutdown before the rest is cancelled
+EXECUTION_STOP_TIMEOUT = float(os.getenv("EXECUTION_STOP_TIMEOUT", "360"))
+
+# Candle data quality checks (see data_quality.py): gaps are only counted ('flag') or, up to
+# DATA_QUALITY_MAX_FILL candles long, filled with flat candles at the previous close ('fill')
+DATA_QUALITY_GAP_POLICY = os.getenv("DATA_QUALITY_GAP_POLICY", "flag")
+DATA_QUALITY_MAX_FILL = int(os.getenv("DATA_QUALITY_MAX_FILL", "5"))
+
 # Logging configuration settings
 logger.info("API keys and base URLs loaded successfully.")
\ No newline at end of file
@@ -0,0 +1,120 @@
+import threading
+import time
+import numpy as np
+import pandas as pd
+from config import DATA_QUALITY_GAP_POLICY, DATA_QUALITY_MAX_FILL, logger
+
+# What to do with missing candles: leave and count them, or fill them with flat candles
+GAP_POLICIES = ('flag', 'fill')
+# Counters recorded per pair, summed over every checked batch
+METRIC_NAMES = ('batches', 'rows', 'invalid', 'unsorted', 'duplicates', 'gaps', 'missing_bars', 'filled_bars',
+                'largest_gap', 'misaligned', 'zero_volume')
+
+_metrics = {}  # symbol -> counters
+_metrics_lock = threading.Lock()
+
+def check_candles(df: pd.DataFrame, spacing: int = None, policy: str = DATA_QUALITY_GAP_POLICY,
+                  max_fill: int = DATA_QUALITY_MAX_FILL, symbol: str = None) -> tuple:
+    """
+    Validates, orders, deduplicates and gap-checks a batch of candles in a few vectorized passes.
+
+    Candles with missing or non-positive prices, a high below the low or a negative volume are
+    dropped. The rest are sorted by time if needed and deduplicated, keeping the last candle of
+    each timestamp. Steps longer than `spacing` are gaps: with the 'fill' policy, gaps of at most
+    `max_fill` candles are filled with flat candles at the previous close and zero volume, so
+    rolling windows span the time they are meant to; longer gaps, and all gaps with the 'flag'
+    policy, are only counted. Zero-volume candles and timestamps off the candle grid are counted too.
+
+    Args:
+        df (pd.DataFrame): Candles indexed by time with the OHLCV columns.
+        spacing (int, optional): The candle length in seconds (default is the most common step in the batch).
+        policy (str, optional): 'flag' or 'fill' (default is config.DATA_QUALITY_GAP_POLICY).
+        max_fill (int, optional): The longest gap, in candles, that is filled (default is config.DATA_QUALITY_MAX_FILL).
+        symbol (str, optional): The trading pair, under which the metrics are recorded.
+
+    Returns:
+        tuple: The checked candles and the metrics of the batch, a dict of the METRIC_NAMES counts.
+
+    Raises:
+        ValueError: If the policy is unknown.
+    """
+    if policy not in GAP_POLICIES:
+        raise ValueError(f"Invalid gap policy: {policy}")
+    metrics = dict.fromkeys(METRIC_NAMES, 0)
+    metrics.update(batches=1, rows=len(df))
+    if df.empty:
+        return df, _record(symbol, metrics)
+
+    prices = df[['open', 'high', 'low', 'close']].to_numpy()
+    valid = (np.isfinite(prices).all(axis=1) & (prices > 0).all(axis=1)
+             & (df['high'].to_numpy() >= df['low'].to_numpy()) & (df['volume'].to_numpy() >= 0))
+    metrics['invalid'] = int((~valid).sum())
+    times = pd.DatetimeIndex(df.index).as_unit('s').asi8[valid]
+    rows = np.flatnonzero(valid)
+
+    # Order by time (stable, so the last of equal timestamps stays last) and keep one candle per timestamp
+    steps = np.diff(times)
+    metrics['unsorted'] = int((steps < 0).sum())
+    if metrics['unsorted']:
+        order = np.argsort(times, kind='stable')
+        times, rows = times[order], rows[order]
+        steps = np.diff(times)
+    last = np.append(steps != 0, True)
+    metrics['duplicates'] = int((~last).sum())
+    times, rows = times[last], rows[last]
+    steps = steps[steps != 0]
+
+    if spacing is None:
+        values, counts = np.unique(steps, return_counts=True)
+        spacing = int(values[np.argmax(counts)]) if len(values) else 0
+    if spacing > 0 and len(times):
+        missing = np.maximum(steps // spacing - 1, 0)  # Candles missing after each candle
+        gaps = np.flatnonzero(missing > 0)
+        metrics.update(gaps=len(gaps), missing_bars=int(missing[gaps].sum()),
+                       largest_gap=int(missing.max(initial=0)),
+                       misaligned=int(((times - times[0]) % spacing != 0).sum()))
+
+    checked = df.iloc[rows]
+    if policy == 'fill' and spacing > 0 and metrics['gaps']:
+        checked = _fill_gaps(checked, times, missing, spacing, max_fill)
+        metrics['filled_bars'] = len(checked) - len(rows)
+    metrics['zero_volume'] = int((checked['volume'].to_numpy() == 0).sum()) - metrics['filled_bars']
+    return checked, _record(symbol, metrics)
+
+def _fill_gaps(df: pd.DataFrame, times: np.ndarray, missing: np.ndarray, spacing: int, max_fill: int) -> pd.DataFrame:
+    # Every fillable gap after candle i gets missing[i] flat candles at candle i's close
+    counts = np.where(missing <= max_fill, missing, 0)
+    after = np.repeat(np.arange(len(counts)), counts)
+    if not len(after):
+        return df
+    offsets = np.arange(len(after)) - np.repeat(np.cumsum(counts) - counts, counts) + 1
+    filled_times = times[after] + offsets * spacing
+
+    close = df['close'].to_numpy()[after]
+    columns = {column: np.concatenate([df[column].to_numpy(), close if column != 'volume' else np.zeros_like(close)])
+               for column in df.columns}
+    all_times = np.concatenate([times, filled_times])
+    order = np.argsort(all_times, kind='stable')
+    index = pd.DatetimeIndex(pd.to_datetime(all_times[order], unit='s'), name=df.index.name)
+    return pd.DataFrame({column: values[order] for column, values in columns.items()}, index=index)
+
+def _record(symbol: str, metrics: dict) -> dict:
+    issues = {name: metrics[name] for name in METRIC_NAMES[2:] if metrics[name]}
+    if symbol is not None:
+        with _metrics_lock:
+            totals = _metrics.setdefault(symbol, dict.fromkeys(METRIC_NAMES, 0))
+            for name in METRIC_NAMES:
+                totals[name] = max(totals[name], metrics[name]) if name == 'largest_gap' else totals[name] + metrics[name]
+            totals['last_checked'] = time.time()
+    if set(issues) - {'zero_volume'}:
+        logger.warning("Candle data quality issues", extra={'fields': {'symbol': symbol, **issues}})
+    return metrics
+
+def quality_metrics(symbol: str = None) -> dict:
+    """
+    Returns the data quality counters recorded for a pair, or for every pair by symbol if none is given.
+    """
+    with _metrics_lock:
+        if symbol is not None:
+            return dict(_metrics.get(symbol, dict.fromkeys(METRIC_NAMES, 0)))
+        return {pair: dict(totals) for pair, totals in _metrics.items()}
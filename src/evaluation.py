@@ -0,0 +1,120 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import pandas as pd
+from config import EVALUATION_WORKERS
+
+def _run_signal(signal, window: pd.DataFrame, arguments: dict) -> str:
+    return signal(window, **arguments)
+
+class StrategyExecutor:
+    """
+    Evaluates the strategies of a cycle concurrently.
+
+    Strategies marked `pool='thread'` run in a thread pool, which suits signals whose time is
+    spent in NumPy/pandas kernels that release the GIL; strategies marked `pool='process'` run in
+    a process pool, which suits pure-Python signals. Each strategy receives its own window of the
+    candles (see `Strategy.window`), a separate DataFrame, so no strategy can see another's changes.
+
+    The pools are created on first use and reused across cycles.
+    """
+
+    def __init__(self, max_workers: int = EVALUATION_WORKERS):
+        """
+        Initializes the executor.
+
+        Args:
+            max_workers (int, optional): The number of workers in each pool (default is config.EVALUATION_WORKERS).
+        """
+        self.max_workers = max_workers
+        self._pools = {}
+        self._futures = []
+
+    def _pool(self, kind: str):
+        if kind not in self._pools:
+            if kind == 'thread':
+                self._pools[kind] = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='strategy')
+            elif kind == 'process':
+                self._pools[kind] = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                raise ValueError(f"Unknown strategy pool '{kind}'; expected 'thread' or 'process'")
+        return self._pools[kind]
+
+    def submit(self, strategies: list, df: pd.DataFrame, **context) -> dict:
+        """
+        Starts evaluating every strategy on its window of the candles.
+
+        Args:
+            strategies (list of Strategy): The strategies to evaluate.
+            df (pd.DataFrame): The candles.
+            **context: Runtime objects strategies may declare, e.g. model=..., pipeline=...
+
+        Returns:
+            dict: Strategy name -> Future of its signal, in the order of `strategies`.
+        """
+        futures = {strategy.name: self._start(strategy, df, context) for strategy in strategies}
+        self._futures = list(futures.values())
+        return futures
+
+    def _start(self, strategy, df: pd.DataFrame, context: dict):
+        return self._pool(strategy.pool).submit(_run_signal, strategy.signal, strategy.window(df),
+                                                strategy.arguments(**context))
+
+    def add_producers(self, signal_pool, strategies: list, df: pd.DataFrame, **context) -> dict:
+        """
+        Adds the strategies to a signal pool as producers evaluated in the worker pools.
+
+        Strategies start lazily, in the pool's cheapest-first order. When the pool asks for a
+        signal, that strategy starts, together with up to `max_workers - 1` of the next ones the
+        pool is certain to evaluate whatever the pending signals turn out to be. A strategy the
+        pool may still skip, typically the costly model, only starts when the pool asks for it,
+        so the short-circuit saves its CPU time.
+
+        Returns:
+            dict: Strategy name -> Future of its signal, filled in as strategies start.
+        """
+        ordered = sorted(strategies, key=lambda strategy: strategy.cost)
+        weights = [strategy.weight for strategy in ordered]
+        futures = {}
+        self._futures = []
+
+        def start(position: int):
+            strategy = ordered[position]
+            if strategy.name not in futures:
+                futures[strategy.name] = self._start(strategy, df, context)
+                self._futures.append(futures[strategy.name])
+            return futures[strategy.name]
+
+        def producer(position: int):
+            def produce() -> str:
+                future = start(position)
+                # The largest lead the signals before each later strategy can build; the pool evaluates
+                # that strategy for sure only if the lead cannot exceed the weight left (see SignalPool)
+                lead = abs(sum(signal['weight'] if signal['value'] == 'buy' else -signal['weight']
+                               for signal in signal_pool.signals.values() if signal['value'] in ('buy', 'sell')))
+                for ahead in range(position + 1, min(position + self.max_workers, len(ordered))):
+                    lead += weights[ahead - 1]
+                    if lead > sum(weights[ahead:]):
+                        break
+                    start(ahead)
+                return future.result()
+            return produce
+
+        for position, strategy in enumerate(ordered):
+            signal_pool.add_producer(strategy.name, producer(position), weight=strategy.weight, cost=strategy.cost)
+        return futures
+
+    def cancel_pending(self):
+        """
+        Cancels evaluations of the last cycle that have not started, e.g. those the pool skipped.
+        """
+        for future in self._futures:
+            future.cancel()
+        self._futures = []
+
+    def shutdown(self):
+        """
+        Stops the worker pools.
+        """
+        self.cancel_pending()
+        for pool in self._pools.values():
+            pool.shutdown(wait=True)
+        self._pools = {}
@@ -0,0 +1,197 @@
+import json
+import os
+import threading
+import time
+import numpy as np
+import api
+from config import EXCHANGE_INFO_PATH, EXCHANGE_INFO_TTL, logger
+from utils import to_units
+
+# Decimal places used for pairs without exchange info: base amounts and quote amounts
+DEFAULT_BASE_PRECISION = 8
+DEFAULT_QUOTE_PRECISION = 2
+
+def _number(value, default: float) -> float:
+    # Filter values are numeric strings, and missing limits are null
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return default
+    return number if np.isfinite(number) else default
+
+class ExchangeInfo:
+    """
+    The trading rules of every pair: amount precisions, price tick size and order limits.
+
+    The rules are loaded once, kept on disk and refreshed only after `ttl` seconds, so checking
+    orders against them costs no network call. They are held as one array per rule, indexed by
+    pair, so a whole batch of orders is quantized and validated in a few vectorized operations.
+
+    When the rules cannot be fetched and no earlier copy is on disk, every pair falls back to the
+    default precisions and only the caller's minimum notional is checked, so trading is not
+    blocked by an unavailable endpoint.
+    """
+
+    def __init__(self, symbols: list = None, path: str = EXCHANGE_INFO_PATH, ttl: float = EXCHANGE_INFO_TTL,
+                 fetch=api.get_exchange_info, clock=time.time):
+        """
+        Initializes the rules; they are loaded on first use.
+
+        Args:
+            symbols (list of dict, optional): Pair descriptions as returned by `api.get_exchange_info`.
+                If given, they are used as they are and never refreshed.
+            path (str, optional): The file the fetched rules are kept in (default is config.EXCHANGE_INFO_PATH).
+            ttl (float, optional): The number of seconds before the rules are refreshed (default is config.EXCHANGE_INFO_TTL).
+            fetch (callable, optional): Returns the pair descriptions (default is api.get_exchange_info).
+            clock (callable, optional): Returns the current Unix time (default is time.time).
+        """
+        self.path = path
+        self.ttl = ttl
+        self.fetch = fetch
+        self.clock = clock
+        self.fetched_at = None
+        self._lock = threading.Lock()
+        self._static = symbols is not None
+        self._build(symbols or [])
+
+    def _build(self, symbols: list):
+        # One array per rule, indexed like `self.pairs`
+        self.pairs = [symbol['name'] for symbol in symbols]
+        self._index = {name: i for i, name in enumerate(self.pairs)}
+        filters = [next((f for f in symbol.get('filters', []) if f.get('filterType') == 'PRICE_FILTER'), {})
+                   for symbol in symbols]
+        self.base_precision = np.array([int(symbol.get('numeratorScale', DEFAULT_BASE_PRECISION)) for symbol in symbols], dtype=np.int64)
+        self.quote_precision = np.array([int(symbol.get('denominatorScale', DEFAULT_QUOTE_PRECISION)) for symbol in symbols], dtype=np.int64)
+        self.trading = np.array([symbol.get('status', 'TRADING') == 'TRADING' for symbol in symbols], dtype=bool)
+        self.tick_size = np.array([_number(f.get('tickSize'), 0.0) for f in filters], dtype=np.float64)
+        self.min_price = np.array([_number(f.get('minPrice'), 0.0) for f in filters], dtype=np.float64)
+        self.max_price = np.array([_number(f.get('maxPrice'), np.inf) for f in filters], dtype=np.float64)
+        self.min_notional = np.array([_number(f.get('minExchangeValue'), 0.0) for f in filters], dtype=np.float64)
+        self.max_notional = np.array([_number(f.get('maxExchangeValue'), np.inf) for f in filters], dtype=np.float64)
+        self.min_quantity = np.array([_number(f.get('minAmount'), 0.0) for f in filters], dtype=np.float64)
+        self.max_quantity = np.array([_number(f.get('maxAmount'), np.inf) for f in filters], dtype=np.float64)
+
+    def _read_file(self) -> tuple:
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                saved = json.load(f)
+            return saved['symbols'], saved['fetched_at']
+        except (OSError, ValueError, KeyError):
+            return None, None
+
+    def refresh(self, force: bool = False):
+        """
+        Loads the rules from disk, or fetches them if the saved copy is older than `ttl` (or `force` is set).
+        """
+        symbols, fetched_at = (None, None) if force else self._read_file()
+        now = self.clock()
+        if symbols is None or now - fetched_at >= self.ttl:
+            fetched = self.fetch()
+            if fetched:
+                symbols, fetched_at = fetched, now
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                with open(self.path, 'w', encoding='utf-8') as f:
+                    json.dump({'fetched_at': fetched_at, 'symbols': symbols}, f)
+            else:
+                if symbols is None:
+                    symbols, _ = self._read_file()
+                if symbols is not None:
+                    logger.warning("Exchange info could not be refreshed; using the saved copy", extra={'fields': {'path': self.path}})
+                else:
+                    logger.warning("Exchange info unavailable; using default precisions")
+        self._build(symbols or [])
+        # Retry a failed fetch on the next use instead of after a whole TTL
+        self.fetched_at = fetched_at if symbols else None
+
+    def _ensure_loaded(self):
+        if self._static:
+            return
+        with self._lock:
+            if self.fetched_at is None or self.clock() - self.fetched_at >= self.ttl:
+                self.refresh()
+
+    def _lookup(self, symbols) -> np.ndarray:
+        return np.array([self._index.get(str(symbol), -1) for symbol in symbols], dtype=np.int64)
+
+    def _rule(self, index: np.ndarray):
+        # Gathers one rule per order; orders for unknown pairs (index -1) get the default
+        def rule(values: np.ndarray, default) -> np.ndarray:
+            if not len(self.pairs):
+                return np.full(len(index), default)
+            return np.where(index >= 0, values[index], default)
+        return rule
+
+    def rules(self, symbol: str) -> dict:
+        """
+        Returns the rules of one pair, or None if the pair is not known.
+        """
+        self._ensure_loaded()
+        i = self._index.get(symbol)
+        if i is None:
+            return None
+        return {'base_precision': int(self.base_precision[i]), 'quote_precision': int(self.quote_precision[i]),
+                'trading': bool(self.trading[i]), 'tick_size': float(self.tick_size[i]),
+                'min_price': float(self.min_price[i]), 'max_price': float(self.max_price[i]),
+                'min_notional': float(self.min_notional[i]), 'max_notional': float(self.max_notional[i]),
+                'min_quantity': float(self.min_quantity[i]), 'max_quantity': float(self.max_quantity[i])}
+
+    def validate(self, symbols, quantities, prices, quote, min_notional: float = 0.0) -> tuple:
+        """
+        Quantizes a batch of market orders to the pair precisions and checks them against the pair limits.
+
+        Quantities are rounded down to whole units of the precision of the asset they are in: the
+        quote asset for orders with `quote` set (market buys), the base asset otherwise.
+
+        Args:
+            symbols (array-like of str): The trading pair of each order.
+            quantities (array-like of float): The amount of each order.
+            prices (array-like of float): The reference price of each pair, to value the orders.
+            quote (array-like of bool): Whether each quantity is in the quote asset.
+            min_notional (float, optional): A minimum order value applied on top of the pair limits (default is 0).
+
+        Returns:
+            tuple: The quantized quantities as integer units, their precisions (decimal places), and
+            the reason each order is rejected ('' for valid orders).
+        """
+        self._ensure_loaded()
+        prices = np.asarray(prices, dtype=np.float64)
+        quote = np.asarray(quote, dtype=bool)
+        index = self._lookup(symbols)
+        known = index >= 0
+        rule = self._rule(index)
+
+        precisions = np.where(quote, rule(self.quote_precision, DEFAULT_QUOTE_PRECISION),
+                              rule(self.base_precision, DEFAULT_BASE_PRECISION))
+        units = to_units(quantities, precisions)
+        amounts = units / 10.0 ** precisions
+        base = np.where(quote, amounts / prices, amounts)
+        notional = np.where(quote, amounts, amounts * prices)
+
+        reasons = np.full(len(index), '', dtype=object)
+        checks = (  # Later checks take precedence
+            (base > rule(self.max_quantity, np.inf), 'above maximum quantity'),
+            (base < rule(self.min_quantity, 0.0), 'below minimum quantity'),
+            (notional > rule(self.max_notional, np.inf), 'above maximum notional'),
+            (notional < np.maximum(rule(self.min_notional, 0.0), min_notional), 'below minimum notional'),
+            (units <= 0, 'zero quantity'),
+            (~rule(self.trading, True), 'pair not trading'),
+            (~known & bool(self.pairs), 'unknown pair'),
+        )
+        for failed, reason in checks:
+            reasons[failed] = reason
+        return units, precisions, reasons
+
+    def quantize_prices(self, symbols, prices) -> tuple:
+        """
+        Rounds limit or stop prices to the nearest tick and to the pair's quote precision.
+
+        Returns:
+            tuple: The prices as integer units and their precisions (decimal places).
+        """
+        self._ensure_loaded()
+        prices = np.asarray(prices, dtype=np.float64)
+        rule = self._rule(self._lookup(symbols))
+        precisions = rule(self.quote_precision, DEFAULT_QUOTE_PRECISION)
+        ticks = rule(self.tick_size, 0.0)
+        prices = np.where(ticks > 0, np.round(prices / np.where(ticks > 0, ticks, 1.0)) * ticks, prices)
+        return to_units(prices, precisions, round_down=False), precisions
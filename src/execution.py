@@ -0,0 +1,444 @@
+import argparse
+import itertools
+import math
+import threading
+import time
+import numpy as np
+import api
+import read_cache
+from config import (EXECUTION_SLICE_NOTIONAL, EXECUTION_STYLE, EXECUTION_DURATION, EXECUTION_INTERVAL,
+                    EXECUTION_PARTICIPATION, EXECUTION_PRICE_BAND, MIN_ORDER_NOTIONAL, logger)
+from exchange_info import ExchangeInfo
+
+STYLES = ('twap', 'iceberg')
+# Consecutive rejected child orders after which a parent order is given up
+MAX_FAILED_CHILDREN = 3
+
+class ParentOrder:
+    """
+    A large order worked as a series of child orders.
+
+    The quantity is in the quote asset for market buys and in the base asset for sells, like the
+    orders of `orders.OrderBatch`. Its progress is read from `filled`, `children` and `status`,
+    which is 'working' until the order is 'filled', 'cancelled', 'failed' or 'rejected'.
+    """
+
+    _ids = itertools.count(1)
+
+    def __init__(self, symbol: str, side: str, quantity: float, quote: bool, style: str, start: float,
+                 duration: float, interval: float, participation: float, reference_price: float = None):
+        self.id = next(ParentOrder._ids)
+        self.symbol = symbol
+        self.side = side
+        self.quantity = quantity
+        self.quote = quote
+        self.style = style
+        self.start = start
+        self.end = start + duration
+        self.interval = interval
+        self.participation = participation
+        self.reference_price = reference_price
+        self.filled = 0.0
+        self.children = []  # (time, quantity, response) of every child order sent
+        self.failures = 0  # Consecutive rejected child orders
+        self.next_time = start
+        self.status = 'working'
+        self.done = threading.Event()
+
+    @property
+    def remaining(self) -> float:
+        return max(self.quantity - self.filled, 0.0)
+
+    def finish(self, status: str):
+        self.status = status
+        self.done.set()
+
+def _mid_price(book: dict) -> float:
+    if not book or not len(book.get('bids', ())) or not len(book.get('asks', ())):
+        return None
+    return (book['bids'][0, 0] + book['asks'][0, 0]) / 2
+
+def visible_liquidity(book: dict, side: str, band: float = EXECUTION_PRICE_BAND, quote: bool = False) -> float:
+    """
+    Returns the quantity a market order can take from the book without moving the price beyond `band`.
+
+    Args:
+        book (dict): 'bids' and 'asks' arrays as returned by `api.get_order_book`.
+        side (str): The side of the order: buys take the asks, sells take the bids.
+        band (float, optional): The largest relative distance from the best price (default is config.EXECUTION_PRICE_BAND).
+        quote (bool, optional): Whether to measure the liquidity in the quote asset (default is False).
+
+    Returns:
+        float: The liquidity within the band, or 0 if that side of the book is empty.
+    """
+    levels = book.get('asks' if side == 'buy' else 'bids') if book else None
+    if levels is None or not len(levels):
+        return 0.0
+    best = levels[0, 0]
+    within = np.abs(levels[:, 0] / best - 1) <= band
+    amounts = levels[within, 1] * levels[within, 0] if quote else levels[within, 1]
+    return float(amounts.sum())
+
+class ExecutionScheduler:
+    """
+    Works large orders as child orders so they do not move the book, in a background thread.
+
+    Two schedules are supported. 'twap' splits what remains evenly over the intervals left until
+    the end of the order's duration, so child orders that were rejected or only partly filled
+    are spread over the rest of the schedule. 'iceberg' sizes each child order to a share of the
+    liquidity visible within a price band of the best price, falling back to the TWAP size when
+    the book is unavailable, and sends the rest once the duration is over.
+
+    Child orders are quantized and checked against the pair rules before they are sent, and no
+    child order leaves a remainder too small to be sent on its own.
+    """
+
+    def __init__(self, place=api.place_order, order_book=api.get_order_book, exchange_info: ExchangeInfo = None,
+                 on_response=None, clock=time.time, slice_notional: float = EXECUTION_SLICE_NOTIONAL,
+                 min_notional: float = MIN_ORDER_NOTIONAL, band: float = EXECUTION_PRICE_BAND):
+        """
+        Initializes a scheduler with no orders.
+
+        Args:
+            place (callable, optional): Function placing one order (default is api.place_order).
+            order_book (callable, optional): Function returning the book of a pair (default is api.get_order_book).
+            exchange_info (ExchangeInfo, optional): The pair rules child orders are checked against
+                (default is none: default precisions and `min_notional` only).
+            on_response (callable, optional): Called after every child order with the parent order,
+                the child quantity, the API response (None if the order failed) and the price the
+                child order was valued at, e.g. to update a ledger and journal the order.
+            clock (callable, optional): Returns the current Unix time (default is time.time).
+            slice_notional (float, optional): The order value from which `place` slices orders
+                (default is config.EXECUTION_SLICE_NOTIONAL).
+            min_notional (float, optional): The smallest child order value (default is config.MIN_ORDER_NOTIONAL).
+            band (float, optional): The price band of the liquidity iceberg orders take from
+                (default is config.EXECUTION_PRICE_BAND).
+        """
+        self.place_order = place
+        self.order_book = order_book
+        self.exchange_info = exchange_info if exchange_info is not None else ExchangeInfo(symbols=[])
+        self.on_response = on_response
+        self.clock = clock
+        self.slice_notional = slice_notional
+        self.min_notional = min_notional
+        self.band = band
+        self.parents = []  # Working parent orders
+        self.children_sent = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def submit(self, symbol: str, side: str, quantity: float, quote: bool = None, style: str = EXECUTION_STYLE,
+               duration: float = EXECUTION_DURATION, interval: float = EXECUTION_INTERVAL,
+               participation: float = EXECUTION_PARTICIPATION, reference_price: float = None) -> ParentOrder:
+        """
+        Schedules a parent order; its first child order is sent on the next step.
+
+        Args:
+            symbol (str): The trading pair symbol (e.g., 'BTCTRY').
+            side (str): 'buy' or 'sell'.
+            quantity (float): The amount to trade.
+            quote (bool, optional): Whether `quantity` is in the quote asset (default is True for buys,
+                which are market orders in the quote asset, and False for sells).
+            style (str, optional): 'twap' or 'iceberg' (default is config.EXECUTION_STYLE).
+            duration (float, optional): Seconds over which the order is worked (default is config.EXECUTION_DURATION).
+            interval (float, optional): Seconds between child orders (default is config.EXECUTION_INTERVAL).
+            participation (float, optional): The share of the visible liquidity each iceberg child
+                order takes (default is config.EXECUTION_PARTICIPATION).
+            reference_price (float, optional): The price used to value the order when the book is
+                unavailable.
+
+        Returns:
+            ParentOrder: The scheduled order.
+        """
+        if side not in ('buy', 'sell'):
+            raise ValueError(f"Invalid order side: {side}")
+        if style not in STYLES:
+            raise ValueError(f"Invalid execution style: {style}")
+        parent = ParentOrder(symbol, side, float(quantity), side == 'buy' if quote is None else quote, style,
+                             self.clock(), duration, interval, participation, reference_price)
+        with self._lock:
+            self.parents.append(parent)
+        logger.info("Parent order scheduled", extra={'fields': {
+            'id': parent.id, 'symbol': symbol, 'side': side, 'quantity': parent.quantity, 'style': style}})
+        self._wake.set()
+        return parent
+
+    def place(self, symbol: str, side: str, quantity: float, reference_price: float = None, **kwargs):
+        """
+        Places an order like `api.place_order`, scheduling it instead if it is a large market order.
+
+        Market buys are valued at their quote quantity and sells at `reference_price`; sells
+        without a reference price and limit orders are always placed at once.
+
+        Returns:
+            dict or None: The API response of an order placed at once, or {'scheduled': id} for a
+            scheduled one, whose child orders are reported to `on_response`.
+        """
+        notional = quantity if side == 'buy' else quantity * (reference_price or 0)
+        if kwargs.get('price') or notional < self.slice_notional:
+            return self.place_order(symbol, side, quantity, **kwargs)
+        return {'scheduled': self.submit(symbol, side, quantity, reference_price=reference_price).id}
+
+    def cancel(self, parent: ParentOrder):
+        """
+        Stops sending child orders for a parent order. A child order already being sent is not recalled.
+        """
+        with self._lock:
+            if parent.status == 'working':
+                parent.finish('cancelled')
+                logger.info("Parent order cancelled", extra={'fields': {'id': parent.id, 'filled': parent.filled}})
+
+    def _child_quantity(self, parent: ParentOrder, now: float, book: dict) -> float:
+        remaining = parent.remaining
+        if now >= parent.end:
+            return remaining
+        intervals_left = max(math.ceil((parent.end - now) / parent.interval), 1)
+        quantity = remaining / intervals_left
+        if parent.style == 'iceberg':
+            liquidity = visible_liquidity(book, parent.side, self.band, quote=parent.quote)
+            if liquidity > 0:
+                quantity = parent.participation * liquidity
+        return min(quantity, remaining)
+
+    def _send_child(self, parent: ParentOrder, now: float):
+        book = self.order_book(parent.symbol) if parent.style == 'iceberg' else None
+        price = _mid_price(book) or parent.reference_price
+        if not price:
+            book = self.order_book(parent.symbol)
+            price = _mid_price(book)
+        if not price:
+            parent.next_time = now + parent.interval
+            logger.warning("No price to value the child order; retrying later", extra={'fields': {'id': parent.id}})
+            return
+
+        # Neither the child order nor what it leaves may fall below the minimum order value
+        rules = self.exchange_info.rules(parent.symbol) or {}
+        minimum = max(rules.get('min_notional', 0.0), self.min_notional) * (1 if parent.quote else 1 / price)
+        remaining = parent.remaining
+        quantity = min(max(self._child_quantity(parent, now, book), minimum), remaining)
+        if remaining - quantity < minimum:
+            quantity = remaining
+
+        units, precisions, reasons = self.exchange_info.validate([parent.symbol], [quantity], [price], quote=[parent.quote],
+                                                                 min_notional=self.min_notional)
+        if reasons[0]:
+            with self._lock:
+                parent.finish('filled' if parent.filled else 'rejected')
+            logger.info("Parent order remainder rejected locally", extra={'fields': {
+                'id': parent.id, 'remaining': remaining, 'reason': reasons[0]}})
+            return
+
+        quantity = int(units[0]) / 10 ** int(precisions[0])
+        response = self.place_order(parent.symbol, parent.side, quantity, quantity_precision=int(precisions[0]))
+        parent.children.append((now, quantity, response))
+        parent.next_time = now + parent.interval
+        self.children_sent += 1
+        if self.on_response is not None:
+            self.on_response(parent, quantity, response, price)
+        if response is None:
+            parent.failures += 1
+            if parent.failures >= MAX_FAILED_CHILDREN:
+                with self._lock:
+                    parent.finish('failed')
+                logger.error("Parent order failed", extra={'fields': {'id': parent.id, 'filled': parent.filled}})
+            return
+
+        # Market orders fill when accepted; a response reporting a smaller quantity is a partial fill
+        parent.failures = 0
+        parent.filled += float((response.get('data') or {}).get('quantity', quantity))
+        read_cache.get_account_balance.invalidate()
+        if parent.remaining * 10 ** int(precisions[0]) < 1:  # Less than one unit of the order precision left
+            with self._lock:
+                parent.finish('filled')
+            logger.info("Parent order filled", extra={'fields': {
+                'id': parent.id, 'filled': parent.filled, 'children': len(parent.children)}})
+
+    def step(self, now: float = None) -> float:
+        """
+        Sends the child orders that are due.
+
+        Args:
+            now (float, optional): The current time (default is the scheduler's clock).
+
+        Returns:
+            float or None: When the next child order is due, or None if no order is working.
+        """
+        now = self.clock() if now is None else now
+        with self._lock:
+            due = [parent for parent in self.parents if parent.status == 'working' and parent.next_time <= now]
+        for parent in due:
+            if parent.status == 'working':  # It may have been cancelled meanwhile
+                self._send_child(parent, now)
+        with self._lock:
+            self.parents = [parent for parent in self.parents if parent.status == 'working']
+            return min((parent.next_time for parent in self.parents), default=None)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                next_time = self.step()
+            except Exception as e:
+                logger.error("Execution step failed: %s", e)
+                next_time = self.clock() + 1
+            self._wake.wait(None if next_time is None else max(next_time - self.clock(), 0))
+            self._wake.clear()
+
+    def start(self):
+        """
+        Starts sending child orders in a background thread.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='execution-scheduler', daemon=True)
+        self._thread.start()
+
+    def stop(self, wait: bool = True, timeout: float = None):
+        """
+        Stops the background thread.
+
+        Args:
+            wait (bool, optional): Whether to let the working orders finish first; otherwise they
+                are cancelled (default is True).
+            timeout (float, optional): The longest time to wait, after which the remaining orders
+                are cancelled (default is None: no limit).
+        """
+        if wait and self._thread is not None:
+            deadline = None if timeout is None else time.monotonic() + timeout
+            for parent in list(self.parents):
+                parent.done.wait(None if deadline is None else max(deadline - time.monotonic(), 0))
+        for parent in list(self.parents):
+            self.cancel(parent)
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+class SimulatedOrderBook:
+    """
+    A local order book for benchmarking execution schedules.
+
+    Market orders walk the levels of the opposite side and deplete them; depleted liquidity is
+    replenished towards its initial depth with the given half-life. Time is simulated, so a
+    schedule spanning minutes is benchmarked in milliseconds.
+    """
+
+    def __init__(self, mid: float = 3500000.0, spread: float = 0.0002, levels: int = 50, step: float = 0.0002,
+                 depth: float = 0.05, half_life: float = 20.0):
+        """
+        Initializes a symmetric book.
+
+        Args:
+            mid (float, optional): The initial mid price (default is 3500000).
+            spread (float, optional): The relative spread between the best bid and ask (default is 0.0002).
+            levels (int, optional): The number of price levels per side (default is 50).
+            step (float, optional): The relative distance between levels (default is 0.0002).
+            depth (float, optional): The base asset quantity of the best levels; deeper levels hold
+                more (default is 0.05).
+            half_life (float, optional): Seconds in which half of the depleted liquidity returns (default is 20).
+        """
+        offsets = spread / 2 + step * np.arange(levels)
+        self.prices = {'asks': mid * (1 + offsets), 'bids': mid * (1 - offsets)}
+        self.full = depth * (1 + 0.1 * np.arange(levels))
+        self.sizes = {'asks': self.full.copy(), 'bids': self.full.copy()}
+        self.half_life = half_life
+        self.mid = mid
+        self.time = 0.0
+        self.fills = []  # (time, side, base quantity, quote amount) of every order
+
+    def clock(self) -> float:
+        return self.time
+
+    def advance(self, to: float):
+        """
+        Moves the simulated time forward, replenishing the depleted liquidity.
+        """
+        decay = 0.5 ** (max(to - self.time, 0.0) / self.half_life)
+        for side in self.sizes:
+            self.sizes[side] = self.full - (self.full - self.sizes[side]) * decay
+        self.time = max(to, self.time)
+
+    def order_book(self, symbol: str, limit: int = 25) -> dict:
+        return {side: np.column_stack([self.prices[side][:limit], self.sizes[side][:limit]]) for side in ('bids', 'asks')}
+
+    def place(self, symbol: str, side: str, quantity: float, price: float = 0, **kwargs) -> dict:
+        """
+        Executes a market order, a buy in the quote asset or a sell in the base asset, like `api.place_order`.
+        """
+        book_side = 'asks' if side == 'buy' else 'bids'
+        prices, sizes = self.prices[book_side], self.sizes[book_side]
+        # Amount available at each level, in the unit of the order
+        available = sizes * prices if side == 'buy' else sizes
+        cumulative = np.cumsum(available)
+        taken = np.clip(quantity - (cumulative - available), 0, available)
+        base = taken / prices if side == 'buy' else taken
+        sizes -= base
+        filled_base, filled_quote = float(base.sum()), float((base * prices).sum())
+        if filled_base <= 0:
+            return None
+        self.fills.append((self.time, side, filled_base, filled_quote))
+        return {'success': True, 'data': {'id': len(self.fills), 'pairSymbol': symbol, 'type': side,
+                                          'quantity': float(taken.sum()), 'price': filled_quote / filled_base}}
+
+def benchmark(side: str = 'buy', quantity: float = 2000000.0, styles: tuple = ('single',) + STYLES,
+              duration: float = EXECUTION_DURATION, interval: float = EXECUTION_INTERVAL,
+              participation: float = EXECUTION_PARTICIPATION, **book) -> dict:
+    """
+    Executes the same order in one go and with each schedule against a fresh simulated book.
+
+    Args:
+        side (str, optional): 'buy' (quantity in the quote asset) or 'sell' (in the base asset) (default is 'buy').
+        quantity (float, optional): The order quantity (default is 2000000).
+        styles (tuple, optional): 'single' and/or the schedule styles to compare.
+        duration (float, optional): The schedule duration in seconds (default is config.EXECUTION_DURATION).
+        interval (float, optional): Seconds between child orders (default is config.EXECUTION_INTERVAL).
+        participation (float, optional): The iceberg share of visible liquidity (default is config.EXECUTION_PARTICIPATION).
+        **book: Keyword arguments of `SimulatedOrderBook`.
+
+    Returns:
+        dict: Per style, the 'slippage_bps' of the average fill price from the initial mid price
+        (positive is a cost), the 'filled' fraction, the number of 'children', the simulated
+        'seconds' the order took and the 'children_per_second' the scheduler sent in wall time.
+    """
+    results = {}
+    for style in styles:
+        simulated = SimulatedOrderBook(**book)
+        scheduler = ExecutionScheduler(place=simulated.place, order_book=simulated.order_book, clock=simulated.clock,
+                                       slice_notional=0)
+        start = time.perf_counter()
+        if style == 'single':
+            simulated.place('SIM', side, quantity)
+        else:
+            scheduler.submit('SIM', side, quantity, style=style, duration=duration, interval=interval,
+                             participation=participation, reference_price=simulated.mid)
+            next_time = scheduler.step()
+            while next_time is not None:
+                simulated.advance(next_time)
+                next_time = scheduler.step()
+        wall = time.perf_counter() - start
+
+        fills = np.array([fill[2:] for fill in simulated.fills]).reshape(-1, 2)
+        base, quote = fills.sum(axis=0) if len(fills) else (0.0, 0.0)
+        average = quote / base if base else np.nan
+        slippage = (average / simulated.mid - 1) * (1 if side == 'buy' else -1) * 1e4
+        results[style] = {'slippage_bps': float(slippage), 'filled': float((quote if side == 'buy' else base) / quantity),
+                          'children': len(fills), 'seconds': simulated.time,
+                          'children_per_second': len(fills) / wall if wall else None}
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark execution schedules against a simulated order book.')
+    parser.add_argument('--side', choices=('buy', 'sell'), default='buy', help="Order side (default is 'buy')")
+    parser.add_argument('--quantity', type=float, default=2000000.0,
+                        help='Order quantity: quote asset for buys, base asset for sells (default is 2000000)')
+    parser.add_argument('--duration', type=float, default=EXECUTION_DURATION, help='Schedule duration in seconds')
+    parser.add_argument('--interval', type=float, default=EXECUTION_INTERVAL, help='Seconds between child orders')
+    parser.add_argument('--participation', type=float, default=EXECUTION_PARTICIPATION, help='Iceberg share of visible liquidity')
+    args = parser.parse_args()
+
+    for style, result in benchmark(args.side, args.quantity, duration=args.duration, interval=args.interval,
+                                   participation=args.participation).items():
+        logger.info("Execution benchmark: %s", style, extra={'fields': result})
@@ -0,0 +1,115 @@
+import numpy as np
+
+# Exit reasons, named like the actions in the backtest trade logs
+STOP_LOSS = 'stop-loss'
+TAKE_PROFIT = 'take-profit'
+TRAILING_STOP = 'trailing-stop'
+TIME_EXIT = 'time-exit'
+NO_EXIT = ''
+
+def _first_true(mask: np.ndarray) -> int:
+    """
+    Returns the index of the first True value in a boolean array, or -1 if there is none.
+    """
+    if not mask.any():
+        return -1
+    return int(np.argmax(mask))
+
+def resolve_exit(high: np.ndarray, low: np.ndarray, close: np.ndarray, entry_index: int, entry_price: float,
+                 stop_loss_pct: float = None, take_profit_pct: float = None, trailing_stop_pct: float = None,
+                 max_holding_bars: int = None, open_: np.ndarray = None) -> tuple:
+    """
+    Finds the first bar after an entry at which a long position is exited.
+
+    The stop and target are checked against each bar's low and high, so intrabar hits are caught.
+    If a bar touches both, the stop is assumed to be hit first. When opening prices are given,
+    a bar that gaps through a level is filled at its open instead of at the level.
+
+    Args:
+        high (np.ndarray): High prices.
+        low (np.ndarray): Low prices.
+        close (np.ndarray): Close prices.
+        entry_index (int): The bar at whose close the position was entered.
+        entry_price (float): The entry price.
+        stop_loss_pct (float, optional): Fixed stop distance below the entry price (e.g., 0.05).
+        take_profit_pct (float, optional): Target distance above the entry price (e.g., 0.1).
+        trailing_stop_pct (float, optional): Stop distance below the highest high since entry.
+        max_holding_bars (int, optional): Exit at the close this many bars after entry.
+        open_ (np.ndarray, optional): Open prices, used to model gaps through a level.
+
+    Returns:
+        tuple: (exit_index, exit_price, exit_reason). exit_index is -1 and exit_price is NaN
+        if the position is still open at the end of the data.
+    """
+    start = entry_index + 1
+    end = len(close)
+    if max_holding_bars is not None:
+        end = min(end, entry_index + max_holding_bars + 1)
+    bar_high = high[start:end]
+    bar_low = low[start:end]
+
+    # Stop level for every bar: the fixed stop, raised by the trailing stop where it is higher
+    stop_level = np.full(bar_low.shape, -np.inf)
+    if stop_loss_pct is not None:
+        stop_level[:] = entry_price * (1 - stop_loss_pct)
+    trailing = None
+    if trailing_stop_pct is not None:
+        # The trailing stop only uses highs from bars before the one being checked
+        peak = np.maximum.accumulate(np.concatenate(([entry_price], bar_high[:-1]))) if bar_high.size else bar_high
+        trailing = peak * (1 - trailing_stop_pct)
+        stop_level = np.maximum(stop_level, trailing)
+
+    stop_bar = _first_true(bar_low <= stop_level)
+    target_bar = -1
+    if take_profit_pct is not None:
+        target_price = entry_price * (1 + take_profit_pct)
+        target_bar = _first_true(bar_high >= target_price)
+
+    if stop_bar != -1 and (target_bar == -1 or stop_bar <= target_bar):
+        price = stop_level[stop_bar]
+        if open_ is not None:
+            price = min(price, open_[start + stop_bar])
+        reason = TRAILING_STOP if trailing is not None and trailing[stop_bar] >= stop_level[stop_bar] else STOP_LOSS
+        return start + stop_bar, float(price), reason
+    if target_bar != -1:
+        price = target_price if open_ is None else max(target_price, open_[start + target_bar])
+        return start + target_bar, float(price), TAKE_PROFIT
+    if max_holding_bars is not None and entry_index + max_holding_bars < len(close):
+        exit_index = entry_index + max_holding_bars
+        return exit_index, float(close[exit_index]), TIME_EXIT
+    return -1, np.nan, NO_EXIT
+
+def resolve_exits(high, low, close, entry_indices, entry_prices, stop_loss_pct: float = None,
+                  take_profit_pct: float = None, trailing_stop_pct: float = None,
+                  max_holding_bars: int = None, open_=None) -> tuple:
+    """
+    Resolves the exits for a batch of long entries over the same OHLC arrays.
+
+    Args:
+        high, low, close (array-like): High, low and close prices.
+        entry_indices (array-like): The bars at whose close each position was entered.
+        entry_prices (array-like): The entry price of each position.
+        stop_loss_pct, take_profit_pct, trailing_stop_pct, max_holding_bars, open_:
+            See `resolve_exit`.
+
+    Returns:
+        tuple: Arrays (exit_indices, exit_prices, exit_reasons), one element per entry.
+    """
+    high = np.asarray(high, dtype=float)
+    low = np.asarray(low, dtype=float)
+    close = np.asarray(close, dtype=float)
+    if open_ is not None:
+        open_ = np.asarray(open_, dtype=float)
+
+    entry_indices = np.asarray(entry_indices, dtype=np.int64)
+    exit_indices = np.full(entry_indices.shape, -1, dtype=np.int64)
+    exit_prices = np.full(entry_indices.shape, np.nan)
+    exit_reasons = np.full(entry_indices.shape, NO_EXIT, dtype=object)
+
+    for k, (entry_index, entry_price) in enumerate(zip(entry_indices, entry_prices)):
+        exit_indices[k], exit_prices[k], exit_reasons[k] = resolve_exit(
+            high, low, close, int(entry_index), float(entry_price),
+            stop_loss_pct=stop_loss_pct, take_profit_pct=take_profit_pct,
+            trailing_stop_pct=trailing_stop_pct, max_holding_bars=max_holding_bars, open_=open_)
+
+    return exit_indices, exit_prices, exit_reasons
@@ -0,0 +1,178 @@
+import numpy as np
+import pandas as pd
+
+# Feature columns produced by the pipeline, in model input order
+FEATURE_COLUMNS = ['returns', 'SMA_50', 'SMA_200', 'volume']
+
+class FeaturePipeline:
+    """
+    Maintains the model's feature matrix incrementally, one candle at a time.
+
+    Features are kept in preallocated float arrays and updated with running sums, so appending
+    a candle costs O(1). Training (`X`, `y`) and inference (`latest`) read views of the same
+    contiguous buffer, so neither copies the matrix nor depends on columns added to a DataFrame.
+    """
+
+    SHORT_WINDOW = 50
+    LONG_WINDOW = 200
+    # Rows needed before the first complete feature row (the long moving average)
+    LOOKBACK = LONG_WINDOW
+    # Bars ahead whose direction is the target: row i is labelled with the direction of candle i + HORIZON
+    HORIZON = 1
+    # Running sums are recomputed exactly this often to stop floating-point error accumulating
+    RESYNC_INTERVAL = 10000
+
+    def __init__(self, capacity: int = 1024):
+        """
+        Initializes an empty pipeline.
+
+        Args:
+            capacity (int, optional): The number of candles to preallocate room for (default is 1024).
+        """
+        self._close = np.empty(capacity, dtype=np.float64)
+        self._features = np.empty((capacity, len(FEATURE_COLUMNS)), dtype=np.float64)
+        self._direction = np.empty(capacity, dtype=np.int64)  # Direction of each candle's own return
+        self._size = 0
+        self._short_sum = 0.0
+        self._long_sum = 0.0
+        self.last_time = None  # Index value of the last candle appended via `update`
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _reserve(self, extra: int):
+        # Grow geometrically so appends stay amortized O(1)
+        needed = self._size + extra
+        if needed <= len(self._close):
+            return
+        capacity = max(needed, 2 * len(self._close))
+        for name in ('_close', '_features', '_direction'):
+            old = getattr(self, name)
+            new = np.empty((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self._size] = old[:self._size]
+            setattr(self, name, new)
+
+    def _resync_sums(self):
+        end = self._size
+        self._short_sum = float(self._close[max(0, end - self.SHORT_WINDOW):end].sum())
+        self._long_sum = float(self._close[max(0, end - self.LONG_WINDOW):end].sum())
+
+    def append(self, close: float, volume: float):
+        """
+        Appends one candle and computes its feature row.
+
+        Args:
+            close (float): The closing price of the candle.
+            volume (float): The volume of the candle.
+        """
+        self._reserve(1)
+        i = self._size
+        self._close[i] = close
+
+        # Update the running window sums, dropping the candle that left each window
+        self._short_sum += close
+        self._long_sum += close
+        if i >= self.SHORT_WINDOW:
+            self._short_sum -= self._close[i - self.SHORT_WINDOW]
+        if i >= self.LONG_WINDOW:
+            self._long_sum -= self._close[i - self.LONG_WINDOW]
+
+        row = self._features[i]
+        row[0] = close / self._close[i - 1] - 1 if i > 0 else np.nan
+        row[1] = self._short_sum / self.SHORT_WINDOW if i >= self.SHORT_WINDOW - 1 else np.nan
+        row[2] = self._long_sum / self.LONG_WINDOW if i >= self.LONG_WINDOW - 1 else np.nan
+        row[3] = volume
+        self._direction[i] = 1 if row[0] > 0 else 0
+        self._size += 1
+
+        if self._size % self.RESYNC_INTERVAL == 0:
+            self._resync_sums()
+
+    def extend(self, close, volume):
+        """
+        Appends a batch of candles, computing their feature rows with array operations.
+
+        Args:
+            close (array-like): The closing prices of the candles, oldest first.
+            volume (array-like): The volumes of the candles, oldest first.
+        """
+        close = np.asarray(close, dtype=np.float64)
+        volume = np.asarray(volume, dtype=np.float64)
+        count = len(close)
+        if count == 0:
+            return
+        self._reserve(count)
+        start = self._size
+        end = start + count
+        self._close[start:end] = close
+
+        # Work over the new rows plus the history the long window still needs
+        history = min(start, self.LONG_WINDOW)
+        window = self._close[start - history:end]
+        cumulative = np.concatenate(([0.0], np.cumsum(window)))
+        positions = np.arange(history, history + count)  # Row positions within `window`
+        rows = np.arange(start, end)  # Absolute row numbers
+
+        features = self._features[start:end]
+        features[:, 0] = np.nan
+        has_previous = rows > 0
+        features[has_previous, 0] = window[positions[has_previous]] / window[positions[has_previous] - 1] - 1
+        for column, period in ((1, self.SHORT_WINDOW), (2, self.LONG_WINDOW)):
+            complete = rows >= period - 1
+            features[:, column] = np.nan
+            features[complete, column] = (cumulative[positions[complete] + 1]
+                                          - cumulative[positions[complete] + 1 - period]) / period
+        features[:, 3] = volume
+        self._direction[start:end] = features[:, 0] > 0
+
+        self._size = end
+        self._resync_sums()
+
+    def update(self, df: pd.DataFrame):
+        """
+        Appends the candles of a DataFrame that are newer than the last candle seen.
+
+        Args:
+            df (pd.DataFrame): Candles indexed by time, with 'close' and 'volume' columns.
+        """
+        new = df if self.last_time is None else df[df.index > self.last_time]
+        if new.empty:
+            return
+        self.extend(new['close'].to_numpy(dtype=np.float64), new['volume'].to_numpy(dtype=np.float64))
+        self.last_time = new.index[-1]
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'FeaturePipeline':
+        """
+        Builds a pipeline from the candles of a DataFrame.
+
+        Args:
+            df (pd.DataFrame): Candles with 'close' and 'volume' columns, oldest first.
+
+        Returns:
+            FeaturePipeline: A pipeline holding one feature row per candle.
+        """
+        pipeline = cls(capacity=max(len(df), 1))
+        pipeline.update(df)
+        return pipeline
+
+    @property
+    def X(self) -> np.ndarray:
+        """
+        The complete feature rows that have a target, as a view of the buffer (rows before the long
+        window fills, and the last HORIZON rows, whose next candles are not known yet, are excluded).
+        """
+        return self._features[self.LOOKBACK - 1:max(self._size - self.HORIZON, self.LOOKBACK - 1)]
+
+    @property
+    def y(self) -> np.ndarray:
+        """
+        The direction target aligned with `X`: 1 if the return HORIZON candles later is positive, 0 otherwise.
+        """
+        return self._direction[self.LOOKBACK - 1 + self.HORIZON:max(self._size, self.LOOKBACK - 1 + self.HORIZON)]
+
+    def latest(self) -> np.ndarray:
+        """
+        Returns the feature row of the most recent candle as a (1, n_features) view.
+        """
+        return self._features[self._size - 1:self._size]
@@ -1,5 +1,64 @@
+import numpy as np
 import pandas as pd
 
+# Signals as integer codes, as returned by the `*_signal_series` functions and stored in the decision journal
+SIGNAL_CODES = {'hold': 0, 'buy': 1, 'sell': -1}
+# Signal codes back to names ('buy', 'sell', 'hold')
+SIGNAL_NAMES = {code: name for name, code in SIGNAL_CODES.items()}
+
+def _price(prices, column: str):
+    """
+    Returns a price column as floats, without copying it if it is already a float column.
+
+    `prices` is a candle DataFrame (giving a Series) or a mapping of column name to a
+    (bar x symbol) DataFrame (giving that DataFrame).
+    """
+    values = prices[column]
+    dtypes = values.dtypes if isinstance(values, pd.DataFrame) else [values.dtype]
+    return values if all(np.issubdtype(dtype, np.floating) for dtype in dtypes) else values.astype(np.float64)
+
+def _keep_dtype(result, like: pd.Series):
+    """
+    Casts an indicator result back to the input's float type (rolling windows compute in float64).
+    """
+    return result.astype(like.dtype)  # Lazy under copy-on-write when the type already matches
+
+def _latest(codes: pd.Series) -> str:
+    """
+    Returns the signal of the last bar of a signal series as a name ('buy', 'sell', 'hold').
+    """
+    return SIGNAL_NAMES[int(codes.iloc[-1])]
+
+# Column-wise indicator math, shared by the DataFrame indicators and the signal series below.
+# Each takes float price Series (one market) or (bar x symbol) DataFrames (a portfolio).
+
+def _bollinger(close, window: int, no_of_std: int):
+    rolling = close.rolling(window=window)
+    sma = rolling.mean()
+    std = rolling.std()
+    return sma, sma + (std * no_of_std), sma - (std * no_of_std)
+
+def _macd(close, slow: int, fast: int, signal: int):
+    macd_line = close.ewm(span=fast, min_periods=fast).mean() - close.ewm(span=slow, min_periods=slow).mean()
+    return macd_line, macd_line.ewm(span=signal, min_periods=signal).mean()
+
+def _rsi(close, period: int):
+    delta = close.diff()
+    avg_gain = delta.where(delta > 0, 0).rolling(window=period).mean()
+    avg_loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+    return 100 - (100 / (1 + avg_gain / avg_loss))
+
+def _stochastic(close, low, high, period: int):
+    lowest_low = low.rolling(window=period).min()
+    highest_high = high.rolling(window=period).max()
+    percent_k = 100 * ((close - lowest_low) / (highest_high - lowest_low))
+    return percent_k, percent_k.rolling(window=3).mean()
+
+def _atr(high, low, close, period: int):
+    previous_close = close.shift()
+    true_range = np.fmax(high - low, np.fmax((high - previous_close).abs(), (low - previous_close).abs()))
+    return true_range.rolling(window=period).mean()
+
 def simple_moving_average(df: pd.DataFrame, period: int) -> pd.Series:
     """
     Calculates the Simple Moving Average (SMA) for a given period.
@@ -11,7 +70,8 @@ def simple_moving_average(df: pd.DataFrame, period: int) -> pd.Series:
     Returns:
         pd.Series: A series representing the moving average.
     """
-    return df['close'].astype(float).rolling(window=period).mean()
+    close = _price(df, 'close')
+    return _keep_dtype(close.rolling(window=period).mean(), close)
 
 def bollinger_bands(df: pd.DataFrame, window: int = 20, no_of_std: int = 2) -> pd.DataFrame:
     """
@@ -23,13 +83,11 @@ def bollinger_bands(df: pd.DataFrame, window: int = 20, no_of_std: int = 2) -> p
         no_of_std (int, optional): The number of standard deviations for the upper/lower bands (default is 2).
 
     Returns:
-        pd.DataFrame: The DataFrame with added 'SMA', 'Upper Band', and 'Lower Band' columns.
+        pd.DataFrame: A new DataFrame with 'SMA', 'Upper Band', and 'Lower Band' columns. The input is not modified.
     """
-    df['SMA'] = df['close'].rolling(window=window).mean()
-    df['STD'] = df['close'].rolling(window=window).std()
-    df['Upper Band'] = df['SMA'] + (df['STD'] * no_of_std)
-    df['Lower Band'] = df['SMA'] - (df['STD'] * no_of_std)
-    return df
+    close = _price(df, 'close')
+    sma, upper_band, lower_band = _bollinger(close, window, no_of_std)
+    return _keep_dtype(pd.DataFrame({'SMA': sma, 'Upper Band': upper_band, 'Lower Band': lower_band}), close)
 
 def bollinger_trade_signal(df: pd.DataFrame, window: int = 20, no_of_std: int = 2, trend_period: int = 50) -> str:
     """
@@ -44,15 +102,7 @@ def bollinger_trade_signal(df: pd.DataFrame, window: int = 20, no_of_std: int =
     Returns:
         str: 'buy' if the price is below the lower band and trend is down, 'sell' if price is above the upper band and trend is up, otherwise 'hold'.
     """
-    df = bollinger_bands(df, window=window, no_of_std=no_of_std)
-    df['Trend'] = df['close'].rolling(window=trend_period).mean()
-
-    if df['close'].iloc[-1] > df['Upper Band'].iloc[-1] and df['close'].iloc[-1] > df['Trend'].iloc[-1]:
-        return 'sell'
-    elif df['close'].iloc[-1] < df['Lower Band'].iloc[-1] and df['close'].iloc[-1] < df['Trend'].iloc[-1]:
-        return 'buy'
-    else:
-        return 'hold'
+    return _latest(bollinger_signal_series(df, window=window, no_of_std=no_of_std, trend_period=trend_period))
 
 def macd(df: pd.DataFrame, slow: int = 26, fast: int = 12, signal: int = 9) -> pd.DataFrame:
     """
@@ -65,13 +115,11 @@ def macd(df: pd.DataFrame, slow: int = 26, fast: int = 12, signal: int = 9) -> p
         signal (int, optional): The period for the signal line EMA (default is 9).
 
     Returns:
-        pd.DataFrame: The DataFrame with added 'EMA_slow', 'EMA_fast', 'MACD', and 'Signal Line' columns.
+        pd.DataFrame: A new DataFrame with 'MACD' and 'Signal Line' columns. The input is not modified.
     """
-    df['EMA_slow'] = df['close'].ewm(span=slow, min_periods=slow).mean()
-    df['EMA_fast'] = df['close'].ewm(span=fast, min_periods=fast).mean()
-    df['MACD'] = df['EMA_fast'] - df['EMA_slow']
-    df['Signal Line'] = df['MACD'].ewm(span=signal, min_periods=signal).mean()
-    return df
+    close = _price(df, 'close')
+    macd_line, signal_line = _macd(close, slow, fast, signal)
+    return _keep_dtype(pd.DataFrame({'MACD': macd_line, 'Signal Line': signal_line}), close)
 
 def macd_trade_signal(df: pd.DataFrame, momentum_threshold: float = 0.001) -> str:
     """
@@ -84,15 +132,7 @@ def macd_trade_signal(df: pd.DataFrame, momentum_threshold: float = 0.001) -> st
     Returns:
         str: 'buy' if MACD is above the Signal Line and momentum is strong, 'sell' if MACD is below the Signal Line and momentum is strong, otherwise 'hold'.
     """
-    df = macd(df)
-    df['Momentum'] = abs(df['MACD'] - df['Signal Line'])
-
-    if df['MACD'].iloc[-1] > df['Signal Line'].iloc[-1] and df['Momentum'].iloc[-1] > momentum_threshold:
-        return 'buy'
-    elif df['MACD'].iloc[-1] < df['Signal Line'].iloc[-1] and df['Momentum'].iloc[-1] > momentum_threshold:
-        return 'sell'
-    else:
-        return 'hold'
+    return _latest(macd_signal_series(df, momentum_threshold=momentum_threshold))
 
 def rsi(df: pd.DataFrame, period: int = 14) -> pd.DataFrame:
     """
@@ -103,18 +143,10 @@ def rsi(df: pd.DataFrame, period: int = 14) -> pd.DataFrame:
         period (int, optional): The period over which to calculate RSI (default is 14).
 
     Returns:
-        pd.DataFrame: The DataFrame with an added 'RSI' column.
+        pd.DataFrame: A new DataFrame with an 'RSI' column. The input is not modified.
     """
-    delta = df['close'].diff()
-    gain = delta.where(delta > 0, 0)
-    loss = -delta.where(delta < 0, 0)
-
-    avg_gain = gain.rolling(window=period).mean()
-    avg_loss = loss.rolling(window=period).mean()
-
-    rs = avg_gain / avg_loss
-    df['RSI'] = 100 - (100 / (1 + rs))
-    return df
+    close = _price(df, 'close')
+    return _keep_dtype(pd.DataFrame({'RSI': _rsi(close, period)}), close)
 
 def rsi_trade_signal(df: pd.DataFrame) -> str:
     """
@@ -126,13 +158,7 @@ def rsi_trade_signal(df: pd.DataFrame) -> str:
     Returns:
         str: 'buy' if RSI is below 30 (oversold), 'sell' if RSI is above 70 (overbought), otherwise 'hold'.
     """
-    df = rsi(df)
-    if df['RSI'].iloc[-1] < 30:
-        return 'buy'
-    elif df['RSI'].iloc[-1] > 70:
-        return 'sell'
-    else:
-        return 'hold'
+    return _latest(rsi_signal_series(df))
 
 def stochastic_oscillator(df: pd.DataFrame, period: int = 14) -> pd.DataFrame:
     """
@@ -143,13 +169,11 @@ def stochastic_oscillator(df: pd.DataFrame, period: int = 14) -> pd.DataFrame:
         period (int, optional): The period over which to calculate the Stochastic Oscillator (default is 14).
 
     Returns:
-        pd.DataFrame: The DataFrame with added '%K' and '%D' columns.
+        pd.DataFrame: A new DataFrame with '%K' and '%D' columns. The input is not modified.
     """
-    df['L14'] = df['low'].rolling(window=period).min()
-    df['H14'] = df['high'].rolling(window=period).max()
-    df['%K'] = 100 * ((df['close'] - df['L14']) / (df['H14'] - df['L14']))
-    df['%D'] = df['%K'].rolling(window=3).mean()
-    return df
+    close = _price(df, 'close')
+    percent_k, percent_d = _stochastic(close, _price(df, 'low'), _price(df, 'high'), period)
+    return _keep_dtype(pd.DataFrame({'%K': percent_k, '%D': percent_d}), close)
 
 def stochastic_trade_signal(df: pd.DataFrame) -> str:
     """
@@ -161,13 +185,7 @@ def stochastic_trade_signal(df: pd.DataFrame) -> str:
     Returns:
         str: 'buy' if %K is below 20 and rising, 'sell' if %K is above 80 and falling, otherwise 'hold'.
     """
-    df = stochastic_oscillator(df)
-    if df['%K'].iloc[-1] < 20 and df['%K'].iloc[-1] > df['%K'].iloc[-2]:
-        return 'buy'
-    elif df['%K'].iloc[-1] > 80 and df['%K'].iloc[-1] < df['%K'].iloc[-2]:
-        return 'sell'
-    else:
-        return 'hold'
+    return _latest(stochastic_signal_series(df))
 
 def atr(df: pd.DataFrame, period: int = 14) -> pd.DataFrame:
     """
@@ -178,14 +196,10 @@ def atr(df: pd.DataFrame, period: int = 14) -> pd.DataFrame:
         period (int, optional): The period over which to calculate ATR (default is 14).
 
     Returns:
-        pd.DataFrame: The DataFrame with an added 'ATR' column.
+        pd.DataFrame: A new DataFrame with an 'ATR' column. The input is not modified.
     """
-    df['HL'] = df['high'] - df['low']
-    df['HC'] = abs(df['high'] - df['close'].shift())
-    df['LC'] = abs(df['low'] - df['close'].shift())
-    df['TR'] = df[['HL', 'HC', 'LC']].max(axis=1)
-    df['ATR'] = df['TR'].rolling(window=period).mean()
-    return df
+    high = _price(df, 'high')
+    return _keep_dtype(pd.DataFrame({'ATR': atr_series(df, period=period)}), high)
 
 def atr_trade_signal(df: pd.DataFrame) -> str:
     """
@@ -197,14 +211,72 @@ def atr_trade_signal(df: pd.DataFrame) -> str:
     Returns:
         str: 'buy' if volatility is low and increasing, 'sell' if volatility is high and decreasing, otherwise 'hold'.
     """
-    df = atr(df)
-    latest_atr = df['ATR'].iloc[-1]
-    previous_atr = df['ATR'].iloc[-2]
-    volatility_change = latest_atr - previous_atr
-
-    if volatility_change > 0 and latest_atr < df['ATR'].mean():
-        return 'buy'
-    elif volatility_change < 0 and latest_atr > df['ATR'].mean():
-        return 'sell'
-    else:
-        return 'hold'
\ No newline at end of file
+    return _latest(atr_signal_series(df))
+
+# Vectorized signal series. Each function returns, for every bar, the signal its scalar
+# counterpart above would return if called with the candles up to and including that bar,
+# encoded as SIGNAL_CODES. `prices` is either a candle DataFrame (giving a Series) or a mapping
+# of column name to a (bar x symbol) DataFrame (giving a DataFrame), so a whole portfolio is
+# evaluated with one call per strategy.
+
+def _codes(buy, sell):
+    """
+    Encodes boolean buy/sell conditions as an int8 signal series or frame.
+    """
+    return (buy.astype(np.int8) - sell.astype(np.int8)).astype(np.int8)
+
+def bollinger_signal_series(prices, window: int = 20, no_of_std: int = 2, trend_period: int = 50):
+    """
+    Vectorized `bollinger_trade_signal` for every bar.
+    """
+    close = _price(prices, 'close')
+    _, upper_band, lower_band = _bollinger(close, window, no_of_std)
+    trend = close.rolling(window=trend_period).mean()
+    return _codes((close < lower_band) & (close < trend), (close > upper_band) & (close > trend))
+
+def macd_signal_series(prices, momentum_threshold: float = 0.001, slow: int = 26, fast: int = 12, signal: int = 9):
+    """
+    Vectorized `macd_trade_signal` for every bar.
+    """
+    macd_line, signal_line = _macd(_price(prices, 'close'), slow, fast, signal)
+    strong = (macd_line - signal_line).abs() > momentum_threshold
+    return _codes((macd_line > signal_line) & strong, (macd_line < signal_line) & strong)
+
+def rsi_signal_series(prices, period: int = 14):
+    """
+    Vectorized `rsi_trade_signal` for every bar.
+    """
+    values = _rsi(_price(prices, 'close'), period)
+    return _codes(values < 30, values > 70)
+
+def stochastic_signal_series(prices, period: int = 14):
+    """
+    Vectorized `stochastic_trade_signal` for every bar.
+    """
+    percent_k, _ = _stochastic(_price(prices, 'close'), _price(prices, 'low'), _price(prices, 'high'), period)
+    previous_k = percent_k.shift()
+    return _codes((percent_k < 20) & (percent_k > previous_k), (percent_k > 80) & (percent_k < previous_k))
+
+def atr_series(prices, period: int = 14):
+    """
+    Vectorized `atr` for a candle DataFrame or a mapping of (bar x symbol) frames.
+    """
+    return _atr(_price(prices, 'high'), _price(prices, 'low'), _price(prices, 'close'), period)
+
+def atr_signal_series(prices, period: int = 14):
+    """
+    Vectorized `atr_trade_signal` for every bar; the mean ATR is taken over all bars so far.
+    """
+    values = atr_series(prices, period=period)
+    change = values.diff()
+    mean_atr = values.expanding().mean()
+    return _codes((change > 0) & (values < mean_atr), (change < 0) & (values > mean_atr))
+
+# Vectorized signal series by strategy name (see strategies.REGISTRY)
+SIGNAL_SERIES = {
+    'bollinger': bollinger_signal_series,
+    'macd': macd_signal_series,
+    'rsi': rsi_signal_series,
+    'stochastic': stochastic_signal_series,
+    'atr': atr_signal_series,
+}
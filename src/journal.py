@@ -0,0 +1,167 @@
+import json
+import os
+import struct
+import threading
+import time
+import numpy as np
+from config import logger
+from indicators import SIGNAL_CODES
+
+# Signal values are stored as indicators.SIGNAL_CODES
+NOT_EVALUATED = -128  # The strategy was skipped by the signal pool
+# Record kinds; SCHEDULED records a large order handed to the execution scheduler, whose child
+# orders are recorded as ORDER records
+CYCLE, ORDER, SCHEDULED = 0, 1, 2
+
+_MAGIC = b'SDPJ'
+_VERSION = 1
+_HEADER_PREFIX = struct.Struct('<4sHI')  # magic, version, length of the JSON strategy list
+
+def journal_dtype(signal_count: int) -> np.dtype:
+    """
+    Returns the fixed-size record layout of a journal with the given number of strategies.
+
+    Cycle records fill the candle, signal and combined fields; order records fill the order fields.
+    """
+    return np.dtype([
+        ('kind', np.int8),
+        ('wall_time', np.float64),  # Unix seconds when the record was written
+        ('candle_time', np.int64),  # Unix seconds of the latest candle the cycle analysed
+        ('open', np.float64),
+        ('high', np.float64),
+        ('low', np.float64),
+        ('close', np.float64),
+        ('volume', np.float64),
+        ('signals', np.int8, (signal_count,)),
+        ('combined', np.int8),
+        ('side', np.int8),
+        ('quantity', np.float64),
+        ('price', np.float64),
+        ('accepted', np.bool_),
+    ])
+
+class DecisionJournal:
+    """
+    A compact, append-only binary journal of each cycle's inputs, signals and orders.
+
+    The file starts with a short header naming the strategies, followed by fixed-size records,
+    so a journal of any length can be scanned in one call with `read_journal`.
+    """
+
+    def __init__(self, path: str, strategies: list, rotate: bool = False):
+        """
+        Opens the journal for appending, creating it if needed.
+
+        Args:
+            path (str): The journal file path.
+            strategies (list of str): The strategy names, in the order their signals are stored.
+            rotate (bool, optional): Whether an existing journal written for different strategies is
+                renamed aside (to `<name>.<unix time><ext>`) and a new one started, instead of
+                raising (default is False).
+
+        Raises:
+            ValueError: If an existing journal at `path` was written for different strategies and
+                `rotate` is not set.
+        """
+        self.strategies = list(strategies)
+        self.dtype = journal_dtype(len(self.strategies))
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            existing, offset = _read_header(path)
+            if existing != self.strategies:
+                if not rotate:
+                    raise ValueError(f"Journal {path} was written for strategies {existing}, not {self.strategies}.")
+                root, ext = os.path.splitext(path)
+                stamp = int(time.time())
+                rotated = f"{root}.{stamp}{ext}"
+                suffix = 1
+                while os.path.exists(rotated):  # Rotated more than once within the second
+                    rotated = f"{root}.{stamp}-{suffix}{ext}"
+                    suffix += 1
+                os.replace(path, rotated)
+                logger.warning("Strategies changed; journal rotated", extra={'fields': {
+                    'rotated_to': rotated, 'previous': existing, 'strategies': self.strategies}})
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            # Drop a trailing partial record left by a crash mid-write so new records stay aligned
+            complete = (os.path.getsize(path) - offset) // self.dtype.itemsize
+            os.truncate(path, offset + complete * self.dtype.itemsize)
+            self._file = open(path, 'ab')
+        else:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            self._file = open(path, 'wb')
+            names = json.dumps(self.strategies).encode('utf-8')
+            self._file.write(_HEADER_PREFIX.pack(_MAGIC, _VERSION, len(names)) + names)
+        self._record = np.zeros(1, dtype=self.dtype)
+        self._lock = threading.Lock()  # Orders are also recorded from the execution scheduler's thread
+
+    def _write(self, **fields):
+        with self._lock:
+            record = self._record
+            record.fill(0)
+            record['wall_time'] = time.time()
+            for name, value in fields.items():
+                record[name] = value
+            self._file.write(record.tobytes())
+            self._file.flush()
+
+    def record_cycle(self, candle, signals: dict, combined: str):
+        """
+        Appends the inputs and decisions of one analysis cycle.
+
+        Args:
+            candle (pd.Series): The latest candle (a row of the OHLCV DataFrame, named by its time).
+            signals (dict): The signal pool's signals, name -> {'value': ..., 'weight': ...}.
+            combined (str): The combined signal ('buy', 'sell', 'hold').
+        """
+        codes = [SIGNAL_CODES[signals[name]['value']] if name in signals else NOT_EVALUATED
+                 for name in self.strategies]
+        self._write(kind=CYCLE, candle_time=int(candle.name.timestamp()), open=candle['open'], high=candle['high'],
+                    low=candle['low'], close=candle['close'], volume=candle['volume'],
+                    signals=codes, combined=SIGNAL_CODES[combined])
+
+    def record_order(self, side: str, quantity: float, price: float = 0, accepted: bool = True,
+                     scheduled: bool = False):
+        """
+        Appends an order sent to the exchange, or scheduled to be sent as child orders.
+
+        Args:
+            side (str): 'buy' or 'sell'.
+            quantity (float): The order quantity.
+            price (float, optional): The limit price, or 0 for market orders.
+            accepted (bool, optional): Whether the exchange accepted the order (default is True).
+            scheduled (bool, optional): Whether the order was handed to the execution scheduler
+                instead; it is recorded as a SCHEDULED record, never accepted (default is False).
+        """
+        self._write(kind=SCHEDULED if scheduled else ORDER, side=SIGNAL_CODES[side], quantity=quantity, price=price,
+                    accepted=accepted and not scheduled)
+
+    def close(self):
+        """
+        Closes the journal file.
+        """
+        self._file.close()
+
+def _read_header(path: str) -> tuple:
+    with open(path, 'rb') as f:
+        magic, version, length = _HEADER_PREFIX.unpack(f.read(_HEADER_PREFIX.size))
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"{path} is not a version {_VERSION} decision journal.")
+        strategies = json.loads(f.read(length).decode('utf-8'))
+    return strategies, _HEADER_PREFIX.size + length
+
+def read_journal(path: str) -> tuple:
+    """
+    Reads a whole decision journal as a structured array.
+
+    Args:
+        path (str): The journal file path.
+
+    Returns:
+        tuple: The strategy names and a read-only structured array of records (memory-mapped).
+    """
+    strategies, offset = _read_header(path)
+    dtype = journal_dtype(len(strategies))
+    # Ignore a trailing partial record left by a crash mid-write
+    count = (os.path.getsize(path) - offset) // dtype.itemsize
+    if count == 0:
+        return strategies, np.zeros(0, dtype=dtype)
+    return strategies, np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=(count,))
@@ -0,0 +1,213 @@
+import threading
+import time
+from collections.abc import Mapping
+from read_cache import get_account_balance
+from config import BALANCE_RECONCILE_INTERVAL, BALANCE_DRIFT_TOLERANCE, logger
+from utils import split_symbol
+
+class BalanceLedger(Mapping):
+    """
+    A local, in-memory ledger of account balances indexed by asset.
+
+    The ledger is updated from our own order acknowledgements and fills, so balance checks are
+    answered with a dictionary lookup instead of a signed REST call. It is reconciled against the
+    exchange balance endpoint on a slow background schedule; the drift found at each
+    reconciliation is recorded in `drift` and `max_drift`, and the reconciliations that found
+    drift beyond the tolerance are counted in `drift_events`.
+
+    As a Mapping, the ledger maps each asset to its free balance, so it can be passed directly
+    to `utils.check_balance`.
+    """
+
+    def __init__(self, fetch_balances=get_account_balance, tolerance: float = BALANCE_DRIFT_TOLERANCE):
+        """
+        Initializes an empty ledger.
+
+        Args:
+            fetch_balances (callable, optional): Function returning the exchange balance list
+                (default is the cached read_cache.get_account_balance).
+            tolerance (float, optional): Absolute drift per asset above which a warning is logged.
+        """
+        self.fetch_balances = fetch_balances
+        self.tolerance = tolerance
+        self.balances = {}  # asset -> {'free': float, 'locked': float}
+        self.drift = {}  # asset -> local free minus exchange free at the last reconciliation
+        self.max_drift = 0.0  # Largest absolute drift seen at the last reconciliation
+        self.reconciliations = 0
+        self.drift_events = 0  # Reconciliations that found an asset drifted beyond the tolerance
+        self.last_reconciled = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __getitem__(self, asset: str) -> float:
+        return self.balances[asset]['free']
+
+    def __iter__(self):
+        return iter(self.balances)
+
+    def __len__(self) -> int:
+        return len(self.balances)
+
+    def _entry(self, asset: str) -> dict:
+        # Create the entry on first use so unseen assets start at zero
+        return self.balances.setdefault(asset, {'free': 0.0, 'locked': 0.0})
+
+    def _move_to_locked(self, asset: str, amount: float):
+        entry = self._entry(asset)
+        entry['free'] -= amount
+        entry['locked'] += amount
+
+    def _release_locked(self, asset: str, amount: float):
+        # Consume the reserved amount first, then fall back to the free balance
+        entry = self._entry(asset)
+        from_locked = min(entry['locked'], amount)
+        entry['locked'] -= from_locked
+        entry['free'] -= amount - from_locked
+
+    def on_order_ack(self, symbol: str, side: str, quantity: float, price: float = 0):
+        """
+        Reserves the balance an accepted order will consume.
+
+        Market buys (price 0) are denominated in the quote asset, matching how the bot places them.
+
+        Args:
+            symbol (str): The trading pair symbol (e.g., 'BTCTRY').
+            side (str): 'buy' or 'sell'.
+            quantity (float): The order quantity.
+            price (float, optional): The limit price, or 0 for market orders.
+        """
+        base, quote = split_symbol(symbol)
+        with self._lock:
+            if side == 'buy':
+                self._move_to_locked(quote, quantity * price if price else quantity)
+            else:
+                self._move_to_locked(base, quantity)
+
+    def on_order_response(self, response: dict, price: float = None):
+        """
+        Applies an order acknowledgement as returned by `api.place_order`.
+
+        Market orders execute when they are accepted, so they are applied as a fill at the price of
+        the response or, if it has none, at `price`. Limit orders only reserve their balance until
+        their fills arrive through `on_fill`.
+
+        Args:
+            response (dict): The API response of a successful order, or None.
+            price (float, optional): The reference price the market order was sent at.
+        """
+        if not response or not response.get('data'):
+            return
+        order = response['data']
+        symbol, side, quantity = order['pairSymbol'], order['type'], float(order['quantity'])
+        order_price = float(order.get('price') or 0)
+        if order.get('method', 'market') != 'market':
+            self.on_order_ack(symbol, side, quantity, order_price)
+            return
+        fill_price = order_price or price
+        if not fill_price:
+            # Without a price the bought or sold amount is unknown; reserve it until the next reconciliation
+            logger.warning("Market order acknowledged without a price", extra={'fields': {'order': order}})
+            self.on_order_ack(symbol, side, quantity)
+            return
+        # Market buys are denominated in the quote asset, sells in the base asset
+        self.on_fill(symbol, side, quantity / fill_price if side == 'buy' else quantity, fill_price)
+
+    def on_fill(self, symbol: str, side: str, quantity: float, price: float, fee: float = 0.0):
+        """
+        Applies an executed fill to the ledger.
+
+        Args:
+            symbol (str): The trading pair symbol (e.g., 'BTCTRY').
+            side (str): 'buy' or 'sell'.
+            quantity (float): The filled quantity of the base asset.
+            price (float): The fill price.
+            fee (float, optional): The fee charged, in the quote asset (default is 0).
+        """
+        base, quote = split_symbol(symbol)
+        notional = quantity * price
+        with self._lock:
+            if side == 'buy':
+                self._release_locked(quote, notional + fee)
+                self._entry(base)['free'] += quantity
+            else:
+                self._release_locked(base, quantity)
+                self._entry(quote)['free'] += notional - fee
+
+    def reconcile(self, balances: list = None) -> bool:
+        """
+        Replaces the local balances with the exchange's and records the drift between them.
+
+        Args:
+            balances (list, optional): The exchange balance list. Fetched if not given.
+
+        Returns:
+            bool: True if the ledger was reconciled, False if no balances were available.
+        """
+        if balances is None:
+            balances = self.fetch_balances()
+        if not balances:
+            logger.warning("Balance reconciliation skipped: no balances received.")
+            return False
+
+        exchange = {item['asset']: {'free': float(item['free']), 'locked': float(item.get('locked') or 0)}
+                    for item in balances}
+        with self._lock:
+            # The first reconciliation only fills the empty ledger, so it is not counted as drift
+            drift = {}
+            if self.reconciliations:
+                for asset in exchange.keys() | self.balances.keys():
+                    local_free = self.balances.get(asset, {'free': 0.0})['free']
+                    drift[asset] = local_free - exchange.get(asset, {'free': 0.0})['free']
+            self.balances = exchange
+            self.drift = drift
+            self.max_drift = max_drift = max((abs(value) for value in drift.values()), default=0.0)
+            first = not self.reconciliations
+            self.reconciliations += 1
+            self.last_reconciled = time.time()
+            drifted = {asset: value for asset, value in drift.items() if abs(value) > self.tolerance}
+            if drifted:
+                self.drift_events += 1
+
+        if not first:
+            if drifted:
+                logger.warning("Balance ledger drift from exchange", extra={'fields': {'drift': drifted}})
+            logger.info("Balance ledger reconciled", extra={'fields': {'max_drift': max_drift}})
+        return True
+
+    def stats(self) -> dict:
+        """
+        Returns the reconciliation counters and the largest drift found at the last reconciliation.
+        """
+        with self._lock:
+            return {'reconciliations': self.reconciliations, 'drift_events': self.drift_events,
+                    'max_drift': self.max_drift, 'last_reconciled': self.last_reconciled}
+
+    def _run(self, interval: float):
+        while not self._stop.wait(interval):
+            try:
+                self.reconcile()
+            except Exception as e:
+                logger.error("Balance reconciliation failed: %s", e)
+
+    def start(self, interval: float = BALANCE_RECONCILE_INTERVAL):
+        """
+        Starts reconciling against the exchange in a background thread.
+
+        Args:
+            interval (float, optional): Seconds between reconciliations.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(interval,), name='balance-ledger', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops the background reconciliation thread.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -1,9 +1,18 @@
-from api import get_ohlcv, place_order, get_account_balance
+from functools import partial
+from read_cache import get_ohlcv
 from utils import check_balance
-from indicators import bollinger_trade_signal, macd_trade_signal, rsi_trade_signal, stochastic_trade_signal, atr_trade_signal
-from model import train_model, model_trade_signal
-from config import logger
+from model import train_model
+from config import EXECUTION_STOP_TIMEOUT, JOURNAL_PATH, MODEL_TRAINING_BARS, logger
 from signal_pool import SignalPool
+from ledger import BalanceLedger
+from features import FeaturePipeline
+from journal import DecisionJournal
+from state import BotState, save_model_artifact, load_model_artifact
+from orders import OrderBatch
+from exchange_info import ExchangeInfo
+from execution import ExecutionScheduler
+from strategies import enabled_strategies, required_lookback
+from evaluation import StrategyExecutor
 
 def main():
     """
@@ -11,63 +20,144 @@ def main():
 
     The function fetches market data when needed, analyzes it using various strategies
     including machine learning models and technical indicators, and executes trades
-    based on the combined signals generated by SignalPool.
+    based on the combined signals generated by SignalPool. Orders decided during the cycle are
+    netted per pair and submitted together at its end; large ones are worked as child orders in
+    the background (see execution.py), which the run waits for before exiting.
+
+    Runtime state is checkpointed to the state file, so a restart resumes where the last run
+    stopped: the trained model is reloaded, the startup buy is not repeated, and a candle that
+    was already processed is not analyzed or traded on again.
     """
     symbol = 'BTCTRY'  # The trading symbol for the cryptocurrency
     quantity = 0.000055  # Amount of BTC for buy/sell orders
     tl_quantity = 105  # Amount of TL to be used for purchasing
-    model = None  # Initial value for the machine learning model
-
-    # Initialize the signal pool to aggregate signals from different strategies
-    signal_pool = SignalPool()
-    previous_combined_signal = None
+    # Restore the state checkpointed by the previous run, if any
+    state = BotState()
+    ledger = journal = executor = scheduler = None
 
     try:
-        # Check TL balance and buy BTC if sufficient balance is available
-        if check_balance('TRY', tl_quantity, get_account_balance()):
-            logger.info('Buying BTC...')
-            place_order(symbol, 'buy', tl_quantity)
-        else:
-            logger.info("Not enough TL balance to buy BTC.")
-        
-        # Fetch and analyze OHLCV data
-        df = get_ohlcv(symbol)
+        model = load_model_artifact(state.data['model_path'])  # None until a model has been trained
+
+        # The enabled strategies (see config.ENABLED_STRATEGIES) and the history they need
+        strategies = enabled_strategies()
+        uses_model = any('model' in strategy.context for strategy in strategies)
+        limit = required_lookback(strategies)
+        if uses_model and model is None:
+            limit = max(limit, MODEL_TRAINING_BARS)
+
+        # Initialize the signal pool to aggregate signals from different strategies
+        signal_pool = SignalPool()
+        previous_combined_signal = state.data['previous_combined_signal']
+
+        # Track balances locally; the exchange is only queried on the reconciliation schedule
+        ledger = BalanceLedger()
+        ledger.reconcile()
+        ledger.start()
+        # A journal written for another strategy set is set aside and a new one started
+        journal = DecisionJournal(JOURNAL_PATH, [strategy.name for strategy in strategies], rotate=True)
+
+        executor = StrategyExecutor()
+
+        # Orders are collected as intents during the cycle and netted into the fewest orders at the end;
+        # the pair rules they are checked against are kept on disk and refreshed rarely
+        exchange_info = ExchangeInfo()
+        orders = OrderBatch(exchange_info=exchange_info)
+        # Large orders are worked as child orders in the background; each child order is applied to
+        # the ledger and journaled like an order placed at once
+        def on_child_order(parent, quantity: float, response: dict, price: float):
+            ledger.on_order_response(response, price)
+            journal.record_order(parent.side, quantity, accepted=response is not None)
+
+        scheduler = ExecutionScheduler(exchange_info=exchange_info, on_response=on_child_order)
+        scheduler.start()
+
+        def submit_orders(price: float):
+            # Checkpoint before sending so a crash can never send the same orders twice
+            if any(source == 'startup' for *_, source in orders.intents):
+                state.checkpoint(startup_buy_done=True)
+            for order, response in orders.submit({symbol: price}, place=partial(scheduler.place, reference_price=price)):
+                ledger.on_order_response(response, price)
+                journal.record_order(order['side'], order['quantity'], accepted=response is not None,
+                                     scheduled='scheduled' in (response or {}))
+            state.checkpoint(positions=dict(ledger))
+
+        # Fetch only the candles the enabled strategies need
+        df = get_ohlcv(symbol, limit=limit)
         if df.empty:
             logger.info("No data to analyze.")
             return  # If no data is fetched, terminate the process
+        price = float(df['close'].iloc[-1])  # Reference price for netting the cycle's orders
+
+        # Check TL balance and buy BTC if sufficient balance is available (once, not on every restart)
+        if state.data['startup_buy_done']:
+            logger.info("Startup buy already done in a previous run.")
+        elif check_balance('TRY', tl_quantity, ledger):
+            logger.info('Buying BTC...')
+            orders.add(symbol, 'buy', tl_quantity, quote=True, source='startup')
+        else:
+            logger.info("Not enough TL balance to buy BTC.")
+
+        candle_time = int(df.index[-1].timestamp())
+        if state.data['last_candle_time'] is not None and candle_time <= state.data['last_candle_time']:
+            logger.info("Latest candle was already processed.")
+            submit_orders(price)
+            return
         
+        # Build the feature matrix once; training and prediction share its buffer
+        pipeline = FeaturePipeline.from_frame(df) if uses_model else None
+
         # Train the machine learning model (only if not trained yet)
-        if model is None:
-            model = train_model(df)
+        if uses_model and model is None:
+            model = train_model(pipeline)
+            state.checkpoint(model_path=save_model_artifact(model))
             logger.info("Model trained successfully.")
         
-        # Add signals from different strategies to the signal pool
-        signal_pool.add_signal('bollinger', bollinger_trade_signal(df), weight=1)
-        signal_pool.add_signal('macd', macd_trade_signal(df), weight=1)
-        signal_pool.add_signal('rsi', rsi_trade_signal(df), weight=1)
-        signal_pool.add_signal('stochastic', stochastic_trade_signal(df), weight=1)
-        signal_pool.add_signal('atr', atr_trade_signal(df), weight=1)
-        signal_pool.add_signal('ml', model_trade_signal(df, model), weight=2)  # Give ML more weight
+        # Evaluate the strategies concurrently, each on its own window; the signal pool combines
+        # them cheapest first and stops waiting once the remaining weight can no longer change the result
+        executor.add_producers(signal_pool, strategies, df, model=model, pipeline=pipeline)
 
         # Get the combined signal from the signal pool
         combined_signal = signal_pool.get_combined_signal()
+        executor.cancel_pending()
+        logger.info("Combined signal: %s", combined_signal,
+                    extra={'fields': {'signals': dict(signal_pool.signals), 'skipped': signal_pool.last_skipped}})
+
+        journal.record_cycle(df.iloc[-1], signal_pool.signals, combined_signal)
+
+        # Checkpoint the decision before acting on it, so a restart never trades on this candle again
+        signal_changed = combined_signal != previous_combined_signal
+        previous_combined_signal = combined_signal
+        state.checkpoint(
+            previous_combined_signal=previous_combined_signal,
+            last_signals={name: signal['value'] for name, signal in signal_pool.signals.items()},
+            last_candle_time=candle_time,
+        )
 
-        # Execute a trade if the combined signal has changed
-        if combined_signal != previous_combined_signal:
-            if combined_signal == 'buy':
-                logger.info('Buying BTC (Combined Signal)...')
-                place_order(symbol, 'buy', quantity)
-            elif combined_signal == 'sell':
-                logger.info('Selling BTC (Combined Signal)...')
-                place_order(symbol, 'sell', quantity)
+        # Queue a trade if the combined signal has changed; it is netted with the startup buy
+        if signal_changed and combined_signal in ('buy', 'sell'):
+            logger.info('%s BTC (Combined Signal)...', 'Buying' if combined_signal == 'buy' else 'Selling')
+            orders.add(symbol, combined_signal, quantity, source='combined')
 
-            previous_combined_signal = combined_signal
+        submit_orders(price)
 
         # Reset the signal pool after each round of analysis
         signal_pool.reset()
 
     except Exception as e:
-        logger.error(f"An unexpected error occurred: {e}")
+        logger.exception("An unexpected error occurred: %s", e)
+    finally:
+        if scheduler is not None:
+            # Let scheduled orders finish before the process exits, cancelling what is left after the timeout
+            scheduler.stop(timeout=EXECUTION_STOP_TIMEOUT)
+            if scheduler.children_sent:
+                state.checkpoint(positions=dict(ledger))
+        if ledger is not None:
+            ledger.stop()
+        if executor is not None:
+            executor.shutdown()
+        if journal is not None:
+            journal.close()
+        state.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,232 @@
+import argparse
+import time
+from multiprocessing import resource_tracker, shared_memory
+import numpy as np
+import pandas as pd
+from read_cache import get_ohlcv
+from config import logger
+
+# Columns of each candle row in the shared buffer; times are stored as Unix seconds
+BUS_COLUMNS = ('time', 'open', 'high', 'low', 'close', 'volume')
+# Header slots: sequence counter (odd while a write is in progress), capacity, candles written
+_SEQUENCE, _CAPACITY, _COUNT = range(3)
+_HEADER_SLOTS = 4
+# Attempts at a consistent read of the buffer before giving up on a writer stuck mid-write
+_READ_ATTEMPTS = 1000
+# Seconds a reader waits before retrying a read that overlapped a write
+_READ_RETRY_SLEEP = 0.0001
+
+def bus_name(symbol: str) -> str:
+    """
+    Returns the shared-memory name used for a trading pair's candle buffer.
+    """
+    return f'sdpbot_{symbol}'
+
+def _layout(buffer, capacity: int) -> tuple:
+    header = np.ndarray((_HEADER_SLOTS,), dtype=np.int64, buffer=buffer)
+    # Every row is stored twice, `capacity` rows apart, so the latest rows are always contiguous
+    rows = np.ndarray((2 * capacity, len(BUS_COLUMNS)), dtype=np.float64, buffer=buffer, offset=header.nbytes)
+    return header, rows
+
+class CandleBusWriter:
+    """
+    Publishes one pair's candles into a named shared-memory ring buffer.
+
+    A single fetcher process owns the writer; any number of strategy processes on the same host
+    attach a `CandleBusReader` to the same name instead of polling the API themselves.
+    """
+
+    def __init__(self, symbol: str, capacity: int = 4096):
+        """
+        Creates the shared-memory buffer for a pair.
+
+        Args:
+            symbol (str): The trading pair symbol (e.g., 'BTCTRY').
+            capacity (int, optional): The number of most recent candles kept (default is 4096).
+        """
+        size = _HEADER_SLOTS * 8 + 2 * capacity * len(BUS_COLUMNS) * 8
+        try:
+            self.shm = shared_memory.SharedMemory(name=bus_name(symbol), create=True, size=size)
+        except FileExistsError:
+            # Left behind by a writer that crashed before closing; readers still attached keep the old copy
+            logger.warning("Replacing the stale %s market data bus left by a previous writer.", symbol)
+            stale = shared_memory.SharedMemory(name=bus_name(symbol))
+            stale.close()
+            stale.unlink()
+            self.shm = shared_memory.SharedMemory(name=bus_name(symbol), create=True, size=size)
+        self.header, self.rows = _layout(self.shm.buf, capacity)
+        self.header[:] = 0
+        self.header[_CAPACITY] = capacity
+        self.capacity = capacity
+        self.last_time = None
+
+    def publish(self, df: pd.DataFrame) -> int:
+        """
+        Appends the candles of a DataFrame that are newer than the last one published.
+
+        A candle with the same time as the last one published replaces it in place, so the
+        still-forming latest candle stays current between polls.
+
+        Args:
+            df (pd.DataFrame): Candles indexed by time with the OHLCV columns, as returned by `get_ohlcv`.
+
+        Returns:
+            int: The number of candles published, including a replaced last candle.
+        """
+        if df.empty:
+            return 0
+        times = df.index.as_unit('s').asi8
+        new = times >= self.last_time if self.last_time is not None else np.ones(len(df), dtype=bool)
+        # Only the most recent `capacity` candles fit in the buffer
+        new_rows = np.column_stack([times[new]] + [df[column].to_numpy(dtype=np.float64)[new] for column in BUS_COLUMNS[1:]])[-self.capacity:]
+        if not len(new_rows):
+            return 0
+
+        count = int(self.header[_COUNT])
+        start = count - 1 if count and new_rows[0, 0] == self.last_time else count
+        slots = (start + np.arange(len(new_rows))) % self.capacity
+        self.header[_SEQUENCE] += 1  # Odd: readers retry until the write completes
+        self.rows[slots] = new_rows
+        self.rows[slots + self.capacity] = new_rows
+        self.header[_COUNT] = start + len(new_rows)
+        self.header[_SEQUENCE] += 1
+        self.last_time = int(times[-1])
+        return len(new_rows)
+
+    def close(self):
+        """
+        Releases and removes the shared-memory buffer.
+        """
+        del self.header, self.rows
+        self.shm.close()
+        self.shm.unlink()
+
+class CandleBusReader:
+    """
+    Attaches read-only to a pair's shared-memory candle buffer.
+    """
+
+    def __init__(self, symbol: str):
+        """
+        Attaches to the buffer published by a `CandleBusWriter` for the pair.
+
+        Args:
+            symbol (str): The trading pair symbol (e.g., 'BTCTRY').
+        """
+        self.shm = shared_memory.SharedMemory(name=bus_name(symbol))
+        # Only the writer may remove the buffer; stop this process's tracker unlinking it on exit
+        resource_tracker.unregister(self.shm._name, 'shared_memory')
+        capacity = int(np.ndarray((_HEADER_SLOTS,), dtype=np.int64, buffer=self.shm.buf)[_CAPACITY])
+        self.header, rows = _layout(self.shm.buf, capacity)
+        rows.flags.writeable = False
+        self.rows = rows
+        self.capacity = capacity
+
+    @property
+    def count(self) -> int:
+        """
+        The total number of candles published so far.
+        """
+        return int(self.header[_COUNT])
+
+    def window(self, bars: int = None) -> np.ndarray:
+        """
+        Returns the latest candles as a zero-copy, read-only view of the shared buffer.
+
+        The view stays valid until the writer has published another `capacity - bars` candles;
+        copy it if it is kept longer than that.
+
+        Args:
+            bars (int, optional): The number of most recent candles (default is all available).
+
+        Returns:
+            np.ndarray or None: An array of shape (bars, len(BUS_COLUMNS)), oldest candle first, or
+            None if no consistent read succeeded, e.g. because the writer died mid-write.
+        """
+        for _ in range(_READ_ATTEMPTS):
+            sequence = int(self.header[_SEQUENCE])
+            if sequence % 2:
+                time.sleep(_READ_RETRY_SLEEP)  # A write is in progress
+                continue
+            count = int(self.header[_COUNT])
+            available = min(count, self.capacity)
+            bars = available if bars is None else min(bars, available)
+            end = (count - 1) % self.capacity + self.capacity + 1 if count else 0
+            view = self.rows[end - bars:end]
+            if int(self.header[_SEQUENCE]) == sequence:
+                return view
+            time.sleep(_READ_RETRY_SLEEP)
+        logger.error("No consistent read of the market data bus after %d attempts.", _READ_ATTEMPTS)
+        return None
+
+    def frame(self, bars: int = None) -> pd.DataFrame:
+        """
+        Returns the latest candles as a DataFrame indexed by time, like `get_ohlcv`.
+
+        Args:
+            bars (int, optional): The number of most recent candles (default is all available).
+
+        Returns:
+            pd.DataFrame or None: The candles, or None if the buffer could not be read (see `window`).
+        """
+        view = self.window(bars)
+        if view is None:
+            return None
+        columns = {column: view[:, i] for i, column in enumerate(BUS_COLUMNS[1:], start=1)}
+        index = pd.DatetimeIndex(pd.to_datetime(view[:, 0].astype(np.int64), unit='s'), name='time')
+        return pd.DataFrame(columns, index=index)
+
+    def wait_for_bar(self, after_count: int, timeout: float = None, poll_interval: float = 0.05) -> int:
+        """
+        Blocks until more than `after_count` candles have been published.
+
+        Args:
+            after_count (int): The candle count the caller has already seen.
+            timeout (float, optional): The maximum number of seconds to wait (default is no limit).
+            poll_interval (float, optional): Seconds between checks of the shared counter (default is 0.05).
+
+        Returns:
+            int: The new candle count, or the unchanged count if the timeout expired.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.count <= after_count:
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            time.sleep(poll_interval)
+        return self.count
+
+    def close(self):
+        """
+        Detaches from the shared-memory buffer.
+        """
+        del self.header, self.rows
+        self.shm.close()
+
+def run_fetcher(symbols: list, interval: float = 60, capacity: int = 4096):
+    """
+    Polls the API once per interval for each pair and publishes new candles to the bus.
+
+    Args:
+        symbols (list of str): The trading pair symbols to publish.
+        interval (float, optional): Seconds between polls (default is 60).
+        capacity (int, optional): The number of candles kept per pair (default is 4096).
+    """
+    writers = {symbol: CandleBusWriter(symbol, capacity=capacity) for symbol in symbols}
+    try:
+        while True:
+            for symbol, writer in writers.items():
+                published = writer.publish(get_ohlcv(symbol, limit=capacity))
+                if published:
+                    logger.info("Published %d new %s candles to the market data bus.", published, symbol)
+            time.sleep(interval)
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Fetch candles once and share them with local strategy processes.')
+    parser.add_argument('symbols', nargs='+', help="Trading pair symbols, e.g. 'BTCTRY ETHTRY'")
+    parser.add_argument('--interval', type=float, default=60, help='Seconds between polls (default is 60)')
+    parser.add_argument('--capacity', type=int, default=4096, help='Candles kept per pair (default is 4096)')
+    args = parser.parse_args()
+    run_fetcher(args.symbols, interval=args.interval, capacity=args.capacity)
@@ -1,50 +1,76 @@
 import pandas as pd
-import numpy as np
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, f1_score
-from indicators import simple_moving_average
+from features import FeaturePipeline
+from config import logger
 
-def prepare_data(df: pd.DataFrame) -> tuple:
+def build_features(data) -> tuple:
     """
-    Prepares the data for the machine learning model by calculating returns,
-    adding moving averages, and creating a binary direction column.
+    Returns the model features and the binary direction target (of the next candle) for the given data.
 
     Args:
-        df (pd.DataFrame): The input DataFrame containing the financial data.
-            Expected columns: ['close', 'volume'].
+        data (pd.DataFrame or FeaturePipeline): The candles, with 'close' and 'volume' columns,
+            or a feature pipeline already holding them.
 
     Returns:
-        tuple: A tuple containing the training and testing sets (X_train, X_test, y_train, y_test).
+        tuple: A tuple containing the features (X) and the target (y), in time order. Both are
+        views of the pipeline's buffer, not copies.
     """
-    # Calculate percentage change (returns) based on the 'close' price
-    df['returns'] = df['close'].pct_change()
+    pipeline = data if isinstance(data, FeaturePipeline) else FeaturePipeline.from_frame(data)
+    return pipeline.X, pipeline.y
 
-    # Add Simple Moving Average (SMA) as a new feature
-    df['SMA_50'] = simple_moving_average(df, period=50)
-    df['SMA_200'] = simple_moving_average(df, period=200)
+def prepare_data(data) -> tuple:
+    """
+    Prepares the data for the machine learning model from the returns, moving averages,
+    volume and next-candle direction calculated by the feature pipeline.
 
-    # Create a 'direction' column: 1 if returns are positive, 0 otherwise
-    df['direction'] = np.where(df['returns'] > 0, 1, 0)
+    The rows are split in time order: the model is tested on the most recent 20% and trained on
+    the rows before them, less the last FeaturePipeline.HORIZON rows, whose targets are candles
+    of the test period.
 
-    # Drop any rows with NaN values that were created during the calculation
-    df = df.dropna()
+    Args:
+        data (pd.DataFrame or FeaturePipeline): The candles, with 'close' and 'volume' columns,
+            or a feature pipeline already holding them. A DataFrame is left unchanged.
 
-    # Define the features (X) including returns and moving averages, and the target variable (y)
-    X = df[['returns', 'SMA_50', 'SMA_200', 'volume']]  # Adding volume and moving averages
-    y = df['direction']
+    Returns:
+        tuple: A tuple containing the training and testing sets (X_train, X_test, y_train, y_test).
+    """
+    X, y = build_features(data)
 
     # Split the data into training and testing sets (80% training, 20% testing)
-    return train_test_split(X, y, test_size=0.2, random_state=42)
+    split = int(len(X) * 0.8)
+    train_end = max(split - FeaturePipeline.HORIZON, 0)
+    return X[:train_end], X[split:], y[:train_end], y[split:]
 
-def train_model(df: pd.DataFrame, model_type: str = 'random_forest') -> RandomForestClassifier:
+def create_model(model_type: str = 'random_forest', params: dict = None):
+    """
+    Creates an untrained model of the given type.
+
+    Args:
+        model_type (str, optional): The type of model to use. Options are 'random_forest' or 'decision_tree'.
+            Default is 'random_forest'.
+        params (dict, optional): Hyperparameters overriding the defaults for the model.
+
+    Returns:
+        Untrained model (RandomForestClassifier, DecisionTreeClassifier).
+    """
+    if model_type == 'random_forest':
+        return RandomForestClassifier(**{'n_estimators': 100, 'random_state': 42, **(params or {})})
+    else:
+        from sklearn.tree import DecisionTreeClassifier
+        return DecisionTreeClassifier(**(params or {}))
+
+def train_model(df, model_type: str = 'random_forest', params: dict = None) -> RandomForestClassifier:
     """
     Trains a machine learning model on the prepared financial data.
 
     Args:
-        df (pd.DataFrame): The input DataFrame containing the financial data.
+        df (pd.DataFrame or FeaturePipeline): The input DataFrame containing the financial data,
+            or a feature pipeline already holding it.
         model_type (str, optional): The type of model to use. Options are 'random_forest' or 'decision_tree'.
             Default is 'random_forest'.
+        params (dict, optional): Hyperparameters overriding the defaults for the model,
+            e.g. the best parameters found by `tuning.search_model`.
 
     Returns:
         Trained model (RandomForestClassifier, DecisionTreeClassifier).
@@ -53,12 +79,7 @@ def train_model(df: pd.DataFrame, model_type: str = 'random_forest') -> RandomFo
     X_train, X_test, y_train, y_test = prepare_data(df)
 
     # Initialize and train the chosen model
-    if model_type == 'random_forest':
-        model = RandomForestClassifier(n_estimators=100, random_state=42)
-    else:
-        from sklearn.tree import DecisionTreeClassifier
-        model = DecisionTreeClassifier()
-
+    model = create_model(model_type, params)
     model.fit(X_train, y_train)
 
     # Evaluate the model's accuracy and F1 score on the test set
@@ -66,34 +87,29 @@ def train_model(df: pd.DataFrame, model_type: str = 'random_forest') -> RandomFo
     accuracy = accuracy_score(y_test, y_pred)
     f1 = f1_score(y_test, y_pred)
 
-    print(f"Model Accuracy: {accuracy:.2f}")
-    print(f"Model F1 Score: {f1:.2f}")
+    logger.info("Model evaluated", extra={'fields': {'accuracy': accuracy, 'f1': f1}})
 
     return model
 
-def model_trade_signal(df: pd.DataFrame, model) -> str:
+def model_trade_signal(df: pd.DataFrame, model, pipeline: FeaturePipeline = None) -> str:
     """
     Generates a trade signal based on the trained machine learning model.
 
     Args:
         df (pd.DataFrame): The input DataFrame containing the financial data.
         model: The trained machine learning model.
+        pipeline (FeaturePipeline, optional): A pipeline already holding the candles of `df`.
+            If not given, the features are calculated from the last candles of `df`.
 
     Returns:
         str: 'buy' if the model predicts an upward movement, 'sell' otherwise.
     """
-    # Calculate the latest return and moving averages for the most recent data point
-    latest_return = df['close'].pct_change().iloc[-1]
-    sma_50 = df['SMA_50'].iloc[-1]
-    sma_200 = df['SMA_200'].iloc[-1]
-    volume = df['volume'].iloc[-1]
-
-    # Create the input features for prediction
-    input_data = pd.DataFrame([[latest_return, sma_50, sma_200, volume]],
-                              columns=['returns', 'SMA_50', 'SMA_200', 'volume'])
+    # Only the most recent feature row is needed, which depends on the last LOOKBACK candles
+    if pipeline is None:
+        pipeline = FeaturePipeline.from_frame(df.tail(FeaturePipeline.LOOKBACK))
 
     # Predict the direction based on the latest data
-    prediction = model.predict(input_data)
+    prediction = model.predict(pipeline.latest())
 
     # Return 'buy' if the model predicts upward movement, otherwise 'sell'
-    return 'buy' if prediction == 1 else 'sell'
\ No newline at end of file
+    return 'buy' if prediction == 1 else 'sell'
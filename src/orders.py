@@ -0,0 +1,113 @@
+import numpy as np
+from api import place_order
+from config import MIN_ORDER_NOTIONAL, logger
+from exchange_info import ExchangeInfo
+from read_cache import get_account_balance
+
+class OrderBatch:
+    """
+    Collects the order intents of one cycle and submits them as the fewest possible orders.
+
+    Intents for the same pair are netted against each other, so opposing strategies or a startup
+    buy followed by a sell signal cost one order (or none) instead of several. Quantities are
+    converted to the base asset with a reference price per pair, netted, then rounded down to the
+    pair precisions and checked against the pair limits in one vectorized pass, so orders the
+    exchange would reject are dropped locally instead of costing a request.
+
+    Market buys are submitted in the quote asset and sells in the base asset, matching how the
+    exchange (and `BalanceLedger.on_order_ack`) interprets market orders.
+    """
+
+    def __init__(self, min_notional: float = MIN_ORDER_NOTIONAL, exchange_info: ExchangeInfo = None):
+        """
+        Initializes an empty batch.
+
+        Args:
+            min_notional (float, optional): The smallest order value, in the quote asset, worth
+                submitting (default is config.MIN_ORDER_NOTIONAL).
+            exchange_info (ExchangeInfo, optional): The pair precisions and limits orders are checked
+                against (default is none: default precisions and `min_notional` only).
+        """
+        self.min_notional = min_notional
+        self.exchange_info = exchange_info if exchange_info is not None else ExchangeInfo(symbols=[])
+        self.intents = []  # (symbol, side, quantity, quote, source)
+        self.intents_received = 0
+        self.orders_sent = 0
+
+    def add(self, symbol: str, side: str, quantity: float, quote: bool = False, source: str = None):
+        """
+        Adds an order intent to the batch.
+
+        Args:
+            symbol (str): The trading pair symbol (e.g., 'BTCTRY').
+            side (str): 'buy' or 'sell'.
+            quantity (float): The amount to trade.
+            quote (bool, optional): Whether `quantity` is in the quote asset (e.g., TRY) rather
+                than the base asset (default is False).
+            source (str, optional): The strategy or step that produced the intent, for logging.
+        """
+        if side not in ('buy', 'sell'):
+            raise ValueError(f"Invalid order side: {side}")
+        self.intents.append((symbol, side, float(quantity), quote, source))
+        self.intents_received += 1
+
+    def net(self, prices: dict) -> list:
+        """
+        Nets the collected intents per pair without submitting them.
+
+        Args:
+            prices (dict): The reference price of each pair in the batch, symbol -> price.
+
+        Returns:
+            list of dict: The orders to submit, each with 'symbol', 'side', 'quantity' and the
+            'precision' (decimal places) of the quantity.
+        """
+        if not self.intents:
+            return []
+        symbols, sides, quantities, quotes, _ = zip(*self.intents)
+        pairs, pair_index = np.unique(symbols, return_inverse=True)
+        missing = [pair for pair in pairs if not prices.get(pair)]
+        if missing:
+            raise ValueError(f"No reference price for {', '.join(missing)}")
+
+        pair_prices = np.array([prices[pair] for pair in pairs], dtype=np.float64)
+        signs = np.where(np.array(sides) == 'buy', 1.0, -1.0)
+        quantities = np.array(quantities, dtype=np.float64)
+        # Express every intent in the base asset, signed by side, and sum per pair
+        base = signs * np.where(quotes, quantities / pair_prices[pair_index], quantities)
+        net_base = np.bincount(pair_index, weights=base, minlength=len(pairs))
+
+        buys = net_base > 0
+        amounts = np.where(buys, net_base * pair_prices, -net_base)
+        units, precisions, reasons = self.exchange_info.validate(pairs, amounts, pair_prices, quote=buys,
+                                                                 min_notional=self.min_notional)
+        submit = reasons == ''
+
+        for pair, reason in zip(pairs[(net_base != 0) & ~submit], reasons[(net_base != 0) & ~submit]):
+            logger.info("Netted order rejected locally", extra={'fields': {'symbol': str(pair), 'reason': reason}})
+        return [{'symbol': str(pair), 'side': 'buy' if buy else 'sell',
+                 'quantity': int(unit) / 10 ** int(precision), 'precision': int(precision)}
+                for pair, buy, unit, precision in zip(pairs[submit], buys[submit], units[submit], precisions[submit])]
+
+    def submit(self, prices: dict, place=place_order) -> list:
+        """
+        Nets the collected intents, submits the resulting orders and clears the batch.
+
+        Args:
+            prices (dict): The reference price of each pair in the batch, symbol -> price.
+            place (callable, optional): Function placing one order (default is api.place_order).
+
+        Returns:
+            list: (order, response) tuples, where response is None for orders that failed.
+        """
+        orders = self.net(prices)
+        results = [(order, place(order['symbol'], order['side'], order['quantity'], quantity_precision=order['precision']))
+                   for order in orders]
+        if orders:
+            get_account_balance.invalidate()  # Orders change the balances; never serve the old ones
+        logger.info("Order batch submitted", extra={'fields': {
+            'intents': len(self.intents), 'orders': len(orders),
+            'sources': sorted({source for *_, source in self.intents if source})}})
+        self.orders_sent += len(orders)
+        self.intents = []
+        return results
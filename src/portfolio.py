@@ -0,0 +1,164 @@
+import argparse
+import numpy as np
+import pandas as pd
+from candle_store import CandleStore
+from config import logger
+from indicators import SIGNAL_SERIES, atr_series
+
+ALLOCATIONS = ('equal', 'signal', 'volatility')
+
+def align_prices(frames: dict) -> dict:
+    """
+    Aligns per-symbol candle DataFrames into (bar x symbol) matrices.
+
+    Args:
+        frames (dict): Symbol -> candle DataFrame indexed by time (e.g. from `CandleStore.load`).
+
+    Returns:
+        dict: Column name ('open', 'high', 'low', 'close', 'volume') -> DataFrame with one column
+        per symbol on the union of the time indexes. Missing bars repeat the last close (with zero
+        volume), and bars before a symbol's first candle are NaN.
+    """
+    columns = {}
+    for column in ('open', 'high', 'low', 'close', 'volume'):
+        columns[column] = pd.DataFrame({symbol: frame[column] for symbol, frame in frames.items()}).sort_index()
+    close = columns['close'].ffill()
+    for column in ('open', 'high', 'low'):
+        columns[column] = columns[column].fillna(close)
+    columns['close'] = close
+    columns['volume'] = columns['volume'].fillna(0).where(close.notna())
+    return columns
+
+def signal_matrix(prices: dict, strategies: list = None, params: dict = None) -> pd.DataFrame:
+    """
+    Evaluates strategies on every symbol and bar at once and sums their signals.
+
+    Args:
+        prices (dict): The (bar x symbol) matrices from `align_prices`.
+        strategies (list of str, optional): Names in indicators.SIGNAL_SERIES (default is all of them).
+        params (dict, optional): Per-strategy keyword arguments, e.g. {'rsi': {'period': 21}}.
+
+    Returns:
+        pd.DataFrame: For each bar and symbol, the number of strategies signalling buy minus the
+        number signalling sell.
+    """
+    strategies = list(SIGNAL_SERIES) if strategies is None else strategies
+    params = params or {}
+    total = np.zeros(prices['close'].shape, dtype=np.int16)
+    for name in strategies:
+        total += SIGNAL_SERIES[name](prices, **params.get(name, {})).to_numpy(dtype=np.int16)
+    return pd.DataFrame(total, index=prices['close'].index, columns=prices['close'].columns)
+
+def target_weights(signals: pd.DataFrame, prices: dict = None, allocation: str = 'equal', atr_period: int = 14) -> pd.DataFrame:
+    """
+    Turns a signal matrix into the portfolio weight of every symbol at every bar.
+
+    A symbol is held from a bar with a positive signal until a bar with a negative one, like the
+    single-pair backtests; bars with a zero signal keep the previous state. Held symbols share
+    the capital according to `allocation`:
+
+    - 'equal': the same weight for every held symbol.
+    - 'signal': in proportion to the signal that opened (or last strengthened) the position.
+    - 'volatility': in inverse proportion to the symbol's ATR relative to its price.
+
+    Args:
+        signals (pd.DataFrame): A (bar x symbol) signal matrix, e.g. from `signal_matrix`.
+        prices (dict, optional): The matrices from `align_prices`; required for 'volatility'.
+        allocation (str, optional): One of ALLOCATIONS (default is 'equal').
+        atr_period (int, optional): The ATR period for 'volatility' (default is 14).
+
+    Returns:
+        pd.DataFrame: Weights summing to 1 across symbols at bars where anything is held, else 0.
+    """
+    if allocation not in ALLOCATIONS:
+        raise ValueError(f"Unknown allocation '{allocation}'; expected one of {ALLOCATIONS}")
+    values = signals.to_numpy(dtype=np.float64)
+    # Positive signals open (or resize) a position, negative signals close it, zero keeps the state
+    state = pd.DataFrame(np.where(values > 0, values, np.where(values < 0, 0.0, np.nan)),
+                         index=signals.index, columns=signals.columns).ffill().fillna(0.0).to_numpy()
+
+    if allocation == 'equal':
+        raw = (state > 0).astype(np.float64)
+    elif allocation == 'signal':
+        raw = state
+    else:
+        if prices is None:
+            raise ValueError("Volatility-scaled allocation needs the price matrices.")
+        relative_atr = (atr_series(prices, period=atr_period) / prices['close']).to_numpy()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            raw = np.where((state > 0) & (relative_atr > 0), 1.0 / relative_atr, 0.0)
+        raw = np.nan_to_num(raw, nan=0.0, posinf=0.0)
+
+    total = raw.sum(axis=1, keepdims=True)
+    weights = np.divide(raw, total, out=np.zeros_like(raw), where=total > 0)
+    return pd.DataFrame(weights, index=signals.index, columns=signals.columns)
+
+def portfolio_backtest(prices: dict, signals: pd.DataFrame, allocation: str = 'equal', initial_balance: float = 1000,
+                       fee: float = 0.001, atr_period: int = 14) -> dict:
+    """
+    Simulates a portfolio over aligned price and signal matrices with array operations only.
+
+    The weights decided at a bar's close are held over the next bar, and the portfolio is
+    rebalanced to the new weights at each close, paying `fee` on the value traded.
+
+    Args:
+        prices (dict): The (bar x symbol) matrices from `align_prices`.
+        signals (pd.DataFrame): The (bar x symbol) signal matrix, e.g. from `signal_matrix`.
+        allocation (str, optional): One of ALLOCATIONS (default is 'equal').
+        initial_balance (float, optional): The starting capital (default is 1000).
+        fee (float, optional): The fee rate on traded value (default is 0.001).
+        atr_period (int, optional): The ATR period for volatility-scaled allocation (default is 14).
+
+    Returns:
+        dict: 'equity' (pd.Series of portfolio value), 'weights' (pd.DataFrame), 'returns'
+        (pd.Series of per-bar portfolio returns), 'turnover' (pd.Series) and 'summary' (dict).
+    """
+    weights = target_weights(signals, prices, allocation=allocation, atr_period=atr_period)
+    close = prices['close'].to_numpy(dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        asset_returns = np.nan_to_num(close[1:] / close[:-1] - 1, nan=0.0, posinf=0.0, neginf=0.0)
+
+    held = weights.to_numpy()
+    gross = np.concatenate([[0.0], (held[:-1] * asset_returns).sum(axis=1)])
+
+    # Between closes the held weights drift with prices; rebalancing trades the difference
+    drifted = np.zeros_like(held)
+    drifted[1:] = held[:-1] * (1 + asset_returns)
+    drifted[1:] /= np.where(1 + gross[1:] > 0, 1 + gross[1:], 1.0)[:, None]
+    turnover = np.abs(held - drifted).sum(axis=1)
+
+    returns = (1 + gross) * (1 - fee * turnover) - 1
+    equity = initial_balance * np.cumprod(1 + returns)
+    peak = np.maximum.accumulate(equity)
+    summary = {
+        'total_return': float(equity[-1] / initial_balance - 1) if len(equity) else 0.0,
+        'max_drawdown': float((1 - equity / peak).max()) if len(equity) else 0.0,
+        'average_exposure': float(held.sum(axis=1).mean()) if len(held) else 0.0,
+        'total_turnover': float(turnover.sum()),
+    }
+    index = signals.index
+    return {
+        'equity': pd.Series(equity, index=index, name='equity'),
+        'weights': weights,
+        'returns': pd.Series(returns, index=index, name='returns'),
+        'turnover': pd.Series(turnover, index=index, name='turnover'),
+        'summary': summary,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Backtest a portfolio of pairs from the local candle store.')
+    parser.add_argument('pairs', nargs='+', help="Trading pair symbols, e.g. 'BTCTRY ETHTRY'")
+    parser.add_argument('--start', default=None, help="Start date, e.g. '2023-01-01'")
+    parser.add_argument('--end', default=None, help='End date (default is the last stored candle)')
+    parser.add_argument('--resolution', type=int, default=1, help='Candle length in minutes (default is 1)')
+    parser.add_argument('--strategies', default=','.join(SIGNAL_SERIES), help='Comma-separated strategy names')
+    parser.add_argument('--allocation', choices=ALLOCATIONS, default='equal', help="Allocation rule (default is 'equal')")
+    args = parser.parse_args()
+
+    start_time = int(pd.Timestamp(args.start).timestamp()) if args.start else None
+    end_time = int(pd.Timestamp(args.end).timestamp()) if args.end else None
+    store = CandleStore()
+    frames = {pair: store.load(pair, resolution=args.resolution, start=start_time, end=end_time) for pair in args.pairs}
+    matrices = align_prices({pair: frame for pair, frame in frames.items() if not frame.empty})
+    result = portfolio_backtest(matrices, signal_matrix(matrices, args.strategies.split(',')), allocation=args.allocation)
+    logger.info("Portfolio backtest finished", extra={'fields': result['summary']})
@@ -0,0 +1,131 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+import api
+from config import OHLCV_CACHE_TTL, OHLCV_CANDLE_SECONDS, BALANCE_CACHE_TTL, READ_CACHE_MAX_ENTRIES
+
+class _Flight:
+    """
+    A call in progress that concurrent callers with the same arguments wait on.
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class ReadThroughCache:
+    """
+    A thread-safe, read-through cache with single-flight coalescing for a read-only API function.
+
+    Concurrent calls with the same arguments share one call to the wrapped function. Results are
+    kept until their TTL expires or, if `candle_seconds` is set, until the next candle boundary,
+    whichever comes first, so a new candle is never hidden behind a cached response. At most
+    `max_entries` results are kept, evicting the least recently used.
+
+    Every caller gets its own copy of a result, so modifying it never changes what the cache or
+    other callers hold.
+    """
+
+    def __init__(self, function, ttl: float, candle_seconds: int = None, max_entries: int = READ_CACHE_MAX_ENTRIES,
+                 clock=time.time):
+        """
+        Wraps a function.
+
+        Args:
+            function (callable): The API function to cache.
+            ttl (float): The maximum number of seconds a result is served from the cache.
+            candle_seconds (int, optional): The candle length; results also expire at each
+                multiple of it (in Unix time).
+            max_entries (int, optional): The number of results kept (default is config.READ_CACHE_MAX_ENTRIES).
+            clock (callable, optional): Returns the current Unix time (default is time.time).
+        """
+        self.function = function
+        self.ttl = ttl
+        self.candle_seconds = candle_seconds
+        self.max_entries = max_entries
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0  # Calls served by another caller's call in flight
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> (expires_at, result)
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        _CACHES.append(self)
+
+    def _expires_at(self, now: float) -> float:
+        expires_at = now + self.ttl
+        if self.candle_seconds:
+            expires_at = min(expires_at, (now // self.candle_seconds + 1) * self.candle_seconds)
+        return expires_at
+
+    def __call__(self, *args, **kwargs):
+        key = (args, tuple(sorted(kwargs.items())))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > self.clock():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(entry[1])
+            flight = self._in_flight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._in_flight[key] = _Flight()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return copy.deepcopy(flight.result)
+
+        try:
+            flight.result = self.function(*args, **kwargs)
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+                # Failed calls (exceptions, or the empty result the API functions return) are not cached
+                if flight.error is None and flight.result is not None and len(flight.result):
+                    self._entries[key] = (self._expires_at(self.clock()), flight.result)
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+                        self.evictions += 1
+            flight.done.set()
+        return copy.deepcopy(flight.result)
+
+    def invalidate(self):
+        """
+        Drops all cached results, e.g. after an order changed the balances.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """
+        Returns the hit, miss, coalesced and eviction counters and the number of cached results.
+        """
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'coalesced': self.coalesced,
+                    'evictions': self.evictions, 'entries': len(self._entries)}
+
+_CACHES = []
+
+def clear_all():
+    """
+    Drops the cached results of every read-through cache in the process.
+    """
+    for cache in _CACHES:
+        cache.invalidate()
+
+# Cached versions of the read endpoints. The graph API's OHLCV candles are daily, so results
+# expire after OHLCV_CACHE_TTL seconds or at the next daily candle, whichever comes first.
+get_ohlcv = ReadThroughCache(api.get_ohlcv, ttl=OHLCV_CACHE_TTL, candle_seconds=OHLCV_CANDLE_SECONDS)
+get_account_balance = ReadThroughCache(api.get_account_balance, ttl=BALANCE_CACHE_TTL)
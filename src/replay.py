@@ -0,0 +1,259 @@
+import argparse
+import gzip
+import json
+import os
+import tempfile
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+import numpy as np
+import requests
+import api
+import read_cache
+from config import logger
+
+class Recorder:
+    """
+    An HTTP transport that forwards requests to the real one and records every exchange.
+
+    Each request and its response (or error) is appended as one JSON line to a gzip file, with
+    the time the exchange took. Authentication headers are not recorded.
+    """
+
+    def __init__(self, path: str, transport=requests):
+        """
+        Opens the recording for writing.
+
+        Args:
+            path (str): The recording file path (gzip-compressed JSON lines).
+            transport (optional): The transport requests are forwarded to (default is requests).
+        """
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._file = gzip.open(path, 'wt', encoding='utf-8')
+        self.transport = transport
+        self.cycles = 0
+
+    def _call(self, method: str, url: str, **kwargs) -> requests.Response:
+        entry = {'method': method, 'url': url, 'params': kwargs.get('json')}
+        start = time.perf_counter()
+        try:
+            response = getattr(self.transport, method)(url, **kwargs)
+        except requests.exceptions.RequestException as e:
+            entry.update(elapsed=time.perf_counter() - start, error=str(e))
+            self._write(entry)
+            raise
+        entry.update(elapsed=time.perf_counter() - start, status=response.status_code, body=response.text)
+        self._write(entry)
+        return response
+
+    def _write(self, entry: dict):
+        self._file.write(json.dumps(entry) + '\n')
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self._call('get', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self._call('post', url, **kwargs)
+
+    def mark_cycle(self):
+        """
+        Marks the end of one decision cycle, so replays can run the same number of cycles.
+        """
+        self.cycles += 1
+        self._write({'cycle': self.cycles})
+
+    def close(self):
+        """
+        Closes the recording.
+        """
+        self._file.close()
+
+def read_recording(path: str) -> tuple:
+    """
+    Reads a recording.
+
+    Args:
+        path (str): The recording file path.
+
+    Returns:
+        tuple: The list of recorded exchanges and the number of recorded cycles.
+    """
+    entries, cycles = [], 0
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            entry = json.loads(line)
+            if 'cycle' in entry:
+                cycles = entry['cycle']
+            else:
+                entries.append(entry)
+    return entries, cycles
+
+class Replayer:
+    """
+    A local stand-in for the HTTP transport that serves recorded responses.
+
+    Responses are served per method and URL in the order they were recorded, after waiting the
+    recorded time divided by `speed`. Orders the bot sends are collected in `sent` instead of
+    reaching the exchange, so two replays of the same recording can be compared.
+    """
+
+    def __init__(self, path: str, speed: float = None):
+        """
+        Loads a recording.
+
+        Args:
+            path (str): The recording file path.
+            speed (float, optional): How many times faster than recorded to respond, e.g. 1 for
+                recorded speed or 100 to accelerate (default is None: respond without waiting).
+        """
+        entries, self.cycles = read_recording(path)
+        self.speed = speed
+        self._responses = defaultdict(deque)
+        for entry in entries:
+            self._responses[(entry['method'], entry['url'])].append(entry)
+        self.sent = []  # (method, url, params) of every POST request, in order
+        self.served = 0
+        self.missed = 0
+
+    def _call(self, method: str, url: str, **kwargs) -> requests.Response:
+        if method == 'post':
+            self.sent.append((method, url, kwargs.get('json')))
+        queue = self._responses.get((method, url))
+        if not queue:
+            self.missed += 1
+            raise requests.exceptions.ConnectionError(f"No recorded response for {method.upper()} {url}")
+        entry = queue.popleft()
+        if self.speed:
+            time.sleep(entry['elapsed'] / self.speed)
+        self.served += 1
+        if 'error' in entry:
+            raise requests.exceptions.ConnectionError(entry['error'])
+
+        response = requests.Response()
+        response.status_code = entry['status']
+        response._content = entry['body'].encode('utf-8')
+        response.encoding = 'utf-8'
+        response.url = url
+        return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self._call('get', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self._call('post', url, **kwargs)
+
+@contextmanager
+def recording(path: str):
+    """
+    Records all API traffic made inside the block to `path`.
+
+    Yields:
+        Recorder: The recorder, whose `mark_cycle` delimits decision cycles.
+    """
+    recorder = Recorder(path, transport=api.transport)
+    previous, api.transport = api.transport, recorder
+    try:
+        yield recorder
+    finally:
+        api.transport = previous
+        recorder.close()
+
+@contextmanager
+def replaying(path: str, speed: float = None):
+    """
+    Serves all API traffic made inside the block from the recording at `path`.
+
+    Yields:
+        Replayer: The stand-in transport, holding the requests sent during the replay.
+    """
+    replayer = Replayer(path, speed=speed)
+    previous, api.transport = api.transport, replayer
+    try:
+        yield replayer
+    finally:
+        api.transport = previous
+
+def replay_cycles(path: str, cycle, speed: float = None) -> dict:
+    """
+    Runs the recorded number of decision cycles against a recording.
+
+    Args:
+        path (str): The recording file path.
+        cycle (callable): Runs one decision cycle, e.g. `main.main`.
+        speed (float, optional): Replay speed factor (default is None: no waiting).
+
+    Returns:
+        dict: The 'sent' requests, the per-cycle wall times in 'cycle_seconds', and the number of
+        responses 'served' and requests 'missed' (not found in the recording).
+    """
+    with replaying(path, speed=speed) as replayer:
+        cycle_seconds = []
+        for _ in range(max(replayer.cycles, 1)):
+            read_cache.clear_all()  # Cycles replay faster than recorded, so cached reads would span cycles
+            start = time.perf_counter()
+            cycle()
+            cycle_seconds.append(time.perf_counter() - start)
+    return {'sent': replayer.sent, 'cycle_seconds': cycle_seconds, 'served': replayer.served, 'missed': replayer.missed}
+
+def compare_runs(baseline: dict, candidate: dict) -> dict:
+    """
+    Compares the outputs and timings of two replays of the same recording.
+
+    Args:
+        baseline (dict): The result of `replay_cycles` for the reference run.
+        candidate (dict): The result of `replay_cycles` for the run being checked.
+
+    Returns:
+        dict: Whether the sent requests are 'identical', the index of the 'first_difference'
+        (or None), and the median cycle time of both runs with their 'speedup'.
+    """
+    first_difference = next((i for i, (a, b) in enumerate(zip(baseline['sent'], candidate['sent'])) if a != b), None)
+    if first_difference is None and len(baseline['sent']) != len(candidate['sent']):
+        first_difference = min(len(baseline['sent']), len(candidate['sent']))
+    baseline_median = float(np.median(baseline['cycle_seconds']))
+    candidate_median = float(np.median(candidate['cycle_seconds']))
+    return {
+        'identical': first_difference is None,
+        'first_difference': first_difference,
+        'baseline_median_seconds': baseline_median,
+        'candidate_median_seconds': candidate_median,
+        'speedup': baseline_median / candidate_median if candidate_median else None,
+    }
+
+def _run_isolated(function, *args, **kwargs):
+    # The bot keeps its state and journal under the working directory, so each run gets a fresh one
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            return function(*args, **kwargs)
+        finally:
+            os.chdir(cwd)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record the bot's API traffic, or replay it offline.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    record_parser = subparsers.add_parser('record', help='Run live decision cycles and record their API traffic')
+    record_parser.add_argument('path', help='Recording file, e.g. recordings/day.jsonl.gz')
+    record_parser.add_argument('--cycles', type=int, default=1, help='Decision cycles to run (default is 1)')
+    record_parser.add_argument('--interval', type=float, default=60, help='Seconds between cycles (default is 60)')
+    replay_parser = subparsers.add_parser('replay', help='Replay a recording offline, twice, and compare the runs')
+    replay_parser.add_argument('path', help='Recording file')
+    replay_parser.add_argument('--speed', type=float, default=None, help='Speed factor (default is no waiting)')
+    args = parser.parse_args()
+
+    from main import main
+    path = os.path.abspath(args.path)
+    if args.command == 'record':
+        with recording(path) as recorder:
+            for i in range(args.cycles):
+                main()
+                recorder.mark_cycle()
+                if i + 1 < args.cycles:
+                    time.sleep(args.interval)
+        logger.info("Recorded %d cycles to %s", args.cycles, path)
+    else:
+        baseline = _run_isolated(replay_cycles, path, main, speed=args.speed)
+        candidate = _run_isolated(replay_cycles, path, main, speed=args.speed)
+        logger.info("Replay comparison", extra={'fields': {**compare_runs(baseline, candidate),
+                                                           'orders': len(candidate['sent']), 'missed': candidate['missed']}})
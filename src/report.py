@@ -0,0 +1,175 @@
+import html
+import os
+import numpy as np
+import pandas as pd
+
+# Point budget per plotted series; reports stay the same size however many bars were simulated
+DEFAULT_POINTS = 2000
+PALETTE = ('#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b', '#e377c2', '#7f7f7f', '#bcbd22', '#17becf')
+# Trade marker colours by trade log action
+MARKER_COLOURS = {'buy': '#2ca02c', 'sell': '#d62728', 'stop-loss': '#ff7f0e', 'take-profit': '#1f77b4'}
+
+_WIDTH, _HEIGHT = 960, 360
+_MARGIN = (60, 20, 30, 40)  # left, right, top, bottom
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int = DEFAULT_POINTS) -> np.ndarray:
+    """
+    Downsamples a series with the Largest-Triangle-Three-Buckets algorithm.
+
+    The first and last points are kept, the rest are split into `threshold - 2` buckets, and from
+    each bucket the point forming the largest triangle with the previously kept point and the
+    average of the next bucket is kept, which preserves peaks, troughs and the overall shape.
+
+    Args:
+        x (np.ndarray): The x values, increasing.
+        y (np.ndarray): The y values.
+        threshold (int, optional): The number of points to keep (default is DEFAULT_POINTS).
+
+    Returns:
+        np.ndarray: The indices of the kept points, increasing.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)  # Bucket boundaries of the inner points
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_end = edges[bucket + 2] if bucket + 2 < len(edges) else n
+        next_x = x[end:next_end].mean() if next_end > end else x[-1]
+        next_y = y[end:next_end].mean() if next_end > end else y[-1]
+        # Twice the triangle areas between the previous point, each candidate and the next bucket's average
+        areas = np.abs((x[previous] - next_x) * (y[start:end] - y[previous])
+                       - (x[previous] - x[start:end]) * (next_y - y[previous]))
+        previous = start + int(np.nanargmax(areas)) if np.isfinite(areas).any() else start
+        kept[bucket + 1] = previous
+    return kept
+
+def _to_numbers(x) -> np.ndarray:
+    # Datetimes are plotted as Unix seconds
+    values = pd.Index(x)
+    if values.inferred_type in ('datetime', 'datetime64'):  # Also timestamps in an object column, e.g. a trade log
+        values = pd.DatetimeIndex(values)
+    if isinstance(values, pd.DatetimeIndex):
+        return values.as_unit('s').asi8.astype(np.float64)
+    return values.to_numpy(dtype=np.float64)
+
+def _downsample(x, y, points: int) -> tuple:
+    x, y = _to_numbers(x), np.asarray(y, dtype=np.float64)
+    finite = np.isfinite(y)
+    x, y = x[finite], y[finite]
+    kept = lttb(x, y, points)
+    return x[kept], y[kept]
+
+def _format_tick(value: float, is_time: bool) -> str:
+    if is_time:
+        return pd.Timestamp(value, unit='s').strftime('%Y-%m-%d %H:%M')
+    return f'{value:,.6g}'
+
+def _svg_chart(title: str, lines: list, markers: list, is_time: bool, y_label: str) -> str:
+    """
+    Renders line series and point markers as an inline SVG chart.
+
+    Args:
+        lines (list): (label, x, y, colour, dashed) tuples, already downsampled.
+        markers (list): (label, x, y, colour) tuples.
+    """
+    all_x = np.concatenate([line[1] for line in lines] + [marker[1] for marker in markers]) if lines or markers else np.zeros(1)
+    all_y = np.concatenate([line[2] for line in lines] + [marker[2] for marker in markers]) if lines or markers else np.zeros(1)
+    x_min, x_max = float(all_x.min()), float(all_x.max())
+    y_min, y_max = float(all_y.min()), float(all_y.max())
+    x_span, y_span = (x_max - x_min) or 1.0, (y_max - y_min) or 1.0
+    left, right, top, bottom = _MARGIN
+    width, height = _WIDTH - left - right, _HEIGHT - top - bottom
+
+    def sx(values):
+        return left + (np.asarray(values) - x_min) / x_span * width
+
+    def sy(values):
+        return top + height - (np.asarray(values) - y_min) / y_span * height
+
+    parts = [f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {_WIDTH} {_HEIGHT}" width="{_WIDTH}" height="{_HEIGHT}">',
+             f'<text x="{_WIDTH / 2}" y="18" text-anchor="middle" font-weight="bold">{html.escape(title)}</text>',
+             f'<text x="14" y="{top + height / 2}" transform="rotate(-90 14 {top + height / 2})" text-anchor="middle">{html.escape(y_label)}</text>']
+    for fraction in np.linspace(0, 1, 5):
+        y_value, x_value = y_min + fraction * y_span, x_min + fraction * x_span
+        parts.append(f'<line x1="{left}" x2="{left + width}" y1="{sy(y_value):.1f}" y2="{sy(y_value):.1f}" stroke="#ddd"/>')
+        parts.append(f'<text x="{left - 4}" y="{sy(y_value) + 4:.1f}" text-anchor="end" font-size="10">{_format_tick(y_value, False)}</text>')
+        parts.append(f'<text x="{sx(x_value):.1f}" y="{top + height + 16}" text-anchor="middle" font-size="10">{_format_tick(x_value, is_time)}</text>')
+    for label, x, y, colour, dashed in lines:
+        points = ' '.join(f'{a:.1f},{b:.1f}' for a, b in zip(sx(x), sy(y)))
+        dash = ' stroke-dasharray="6 3" stroke-width="2"' if dashed else ' stroke-width="1.2"'
+        parts.append(f'<polyline fill="none" stroke="{colour}"{dash} points="{points}"><title>{html.escape(label)}</title></polyline>')
+    for label, x, y, colour in markers:
+        for a, b in zip(sx(x), sy(y)):
+            parts.append(f'<circle cx="{a:.1f}" cy="{b:.1f}" r="3" fill="{colour}"><title>{html.escape(label)}</title></circle>')
+    parts.append('</svg>')
+    return '\n'.join(parts)
+
+def _legend(entries: list) -> str:
+    return ' '.join(f'<span style="color:{colour}">&#9632; {html.escape(label)}</span>' for label, colour in entries)
+
+def write_report(path: str, title: str, equity: dict, x, price=None, trades: dict = None, summary: dict = None,
+                 points: int = DEFAULT_POINTS, y_label: str = 'Balance', dashed: tuple = ()) -> str:
+    """
+    Writes a self-contained static HTML report of a backtest run.
+
+    Every series is downsampled with `lttb` to at most `points` points, so the report is quick to
+    generate and small whatever the length of the run. Trades are drawn as markers on the price chart.
+
+    Args:
+        path (str): The output HTML file.
+        title (str): The report title.
+        equity (dict): Label -> balance values, one per element of `x`.
+        x: The bar times (or numbers) of the balance values.
+        price (pd.Series, optional): The price, indexed by time, to chart with the trade markers.
+        trades (dict, optional): Label -> trade log DataFrame with 'Datetime', 'Action' and 'Price' columns.
+        summary (dict, optional): Label -> value pairs listed under the title.
+        points (int, optional): The point budget per series (default is DEFAULT_POINTS).
+        y_label (str, optional): The balance axis label (default is 'Balance').
+        dashed (tuple, optional): Labels of equity series drawn dashed, e.g. a total.
+
+    Returns:
+        str: The path of the written report.
+    """
+    is_time = isinstance(pd.Index(x), pd.DatetimeIndex)
+    lines, legend = [], []
+    for i, (label, values) in enumerate(equity.items()):
+        values = np.asarray(values, dtype=np.float64)
+        colour = PALETTE[i % len(PALETTE)]
+        line_x, line_y = _downsample(pd.Index(x)[-len(values):], values, points)
+        lines.append((label, line_x, line_y, colour, label in dashed))
+        legend.append((label, colour))
+    sections = [_legend(legend), _svg_chart('Balance over time', lines, [], is_time, y_label)]
+
+    if price is not None:
+        price_x, price_y = _downsample(price.index, price.to_numpy(), points)
+        markers, marker_legend = [], []
+        for label, log in (trades or {}).items():
+            if log is None or log.empty:
+                continue
+            for action, rows in log.groupby('Action'):
+                colour = MARKER_COLOURS.get(action, '#000')
+                # Keep the marker count within the point budget as well
+                rows = rows.iloc[np.linspace(0, len(rows) - 1, min(len(rows), points)).astype(int)]
+                markers.append((f'{label}: {action}', _to_numbers(rows['Datetime']), rows['Price'].to_numpy(dtype=np.float64), colour))
+                if (action, colour) not in marker_legend:
+                    marker_legend.append((action, colour))
+        sections.append(_legend([('Price', '#444')] + marker_legend))
+        sections.append(_svg_chart('Price and trades', [('Price', price_x, price_y, '#444', False)], markers,
+                                   isinstance(price.index, pd.DatetimeIndex), 'Price'))
+
+    rows = ''.join(f'<tr><td>{html.escape(str(key))}</td><td>{html.escape(str(value))}</td></tr>'
+                   for key, value in (summary or {}).items())
+    document = (f'<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>{html.escape(title)}</title>'
+                '<style>body{font-family:sans-serif;margin:24px} td{padding:2px 12px} svg{display:block;margin:8px 0 24px}</style>'
+                f'</head><body><h1>{html.escape(title)}</h1><table>{rows}</table>\n' + '\n'.join(sections) + '\n</body></html>\n')
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(document)
+    return path
@@ -0,0 +1,134 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from exits import resolve_exit
+from indicators import SIGNAL_CODES, SIGNAL_NAMES
+
+def shard_ranges(start: int, end: int, shards: int) -> list:
+    """
+    Splits the bars [start, end) into `shards` contiguous ranges of nearly equal length.
+
+    Returns:
+        list: A list of (shard_start, shard_end) tuples, end exclusive.
+    """
+    bounds = np.linspace(start, end, max(1, min(shards, end - start)) + 1).astype(int)
+    return [(int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+def _shard_signals(signal_fn, frame: pd.DataFrame, offset: int, start: int, end: int, warmup: int, params: dict) -> np.ndarray:
+    # `frame` holds the bars [offset, end) of the full data, i.e. the shard plus its warmup bars
+    codes = np.empty(end - start, dtype=np.int8)
+    for i in range(start, end):
+        window = frame.iloc[max(0, i - warmup) - offset:i - offset]
+        codes[i - start] = SIGNAL_CODES[signal_fn(window, **params)]
+    return codes
+
+def signal_series(signal_fn, data: pd.DataFrame, warmup: int = 200, start: int = 20, shards: int = None,
+                  max_workers: int = None, **params) -> np.ndarray:
+    """
+    Evaluates a strategy at every bar, splitting the bars into shards run in a process pool.
+
+    The signal at bar i is computed from the `warmup` bars before it (bars i - warmup to i - 1),
+    so each shard only needs its own bars plus `warmup` bars of history, and the signals are the
+    same whatever the number of shards. `warmup` must cover the longest window the strategy
+    reads (e.g. 200 bars for a 200-bar moving average). Exponentially weighted indicators never
+    forget a bar entirely: a span-s EWM still weights bars older than n by (1 - 2 / (s + 1)) ** n, so
+    `warmup` must reach the convergence length where that is negligible. The default of 200 bars
+    leaves the 26-bar slow EMA of `macd_trade_signal` a weight of about 2e-7 outside the window.
+
+    Args:
+        signal_fn (callable): A module-level signal function (e.g. `indicators.rsi_trade_signal`)
+            taking a DataFrame and returning 'buy', 'sell' or 'hold'.
+        data (pd.DataFrame): The candles.
+        warmup (int, optional): The number of bars of history passed to each evaluation (default is 200).
+        start (int, optional): The first bar to evaluate (default is 20, as in the backtest scripts).
+        shards (int, optional): The number of shards (default is the number of workers).
+        max_workers (int, optional): The number of worker processes (default is the CPU count).
+        **params: Keyword arguments passed to `signal_fn`.
+
+    Returns:
+        np.ndarray: The signal codes (see indicators.SIGNAL_CODES) of bars `start` to `len(data) - 1`.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    ranges = shard_ranges(start, len(data), shards or max_workers)
+    if len(ranges) <= 1 or max_workers == 1:
+        return _shard_signals(signal_fn, data, 0, start, len(data), warmup, params)
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = []
+        for shard_start, shard_end in ranges:
+            offset = max(0, shard_start - warmup)
+            # Each worker receives only its shard and the warmup bars before it
+            futures.append(executor.submit(_shard_signals, signal_fn, data.iloc[offset:shard_end], offset,
+                                           shard_start, shard_end, warmup, params))
+        return np.concatenate([future.result() for future in futures])
+
+def simulate(data: pd.DataFrame, signals: np.ndarray, start: int = 20, initial_balance: float = 50,
+             stop_loss_pct: float = 0.05, take_profit_pct: float = 0.1) -> tuple:
+    """
+    Runs the position logic of the backtest scripts over precomputed signals.
+
+    The position is carried sequentially from bar to bar, which stitches the shards' signals
+    into one run: a position opened near the end of one shard is still open, with the same
+    entry price and pending exit, at the start of the next.
+
+    Args:
+        data (pd.DataFrame): The candles, with 'high', 'low' and 'close' columns and either a
+            'Datetime' column or a time index.
+        signals (np.ndarray): The signal codes of bars `start` onwards, from `signal_series`.
+        start (int, optional): The first bar the signals cover (default is 20).
+        initial_balance (float, optional): The starting balance in the quote currency (default is 50).
+        stop_loss_pct (float, optional): The stop-loss distance from the entry price (default is 0.05).
+        take_profit_pct (float, optional): The take-profit distance from the entry price (default is 0.1).
+
+    Returns:
+        tuple: The balance after each bar (list) and the trade log (pd.DataFrame).
+    """
+    high, low, close = (data[column].to_numpy(dtype=float) for column in ('high', 'low', 'close'))
+    times = data['Datetime'].to_numpy() if 'Datetime' in data else data.index.to_numpy()
+    balance, asset = initial_balance, 0.0
+    pending_exit = None
+    balance_history, trades = [], []
+
+    for i, code in zip(range(start, len(data)), signals):
+        signal = SIGNAL_NAMES[int(code)]
+        close_price, datetime = close[i - 1], times[i - 1]
+
+        if signal == 'buy' and balance > 0:
+            asset, balance = balance / close_price, 0
+            pending_exit = resolve_exit(high, low, close, i - 1, close_price,
+                                        stop_loss_pct=stop_loss_pct, take_profit_pct=take_profit_pct)
+            trades.append((datetime, 'buy', close_price, asset, balance))
+        elif signal == 'sell' and asset > 0:
+            balance, asset = asset * close_price, 0
+            pending_exit = None
+            trades.append((datetime, 'sell', close_price, asset, balance))
+
+        # Exit on the bar where the high/low first crossed the stop-loss or take-profit
+        if asset > 0 and pending_exit is not None and pending_exit[0] == i - 1:
+            _, exit_price, exit_reason = pending_exit
+            balance, asset = asset * exit_price, 0
+            pending_exit = None
+            trades.append((datetime, exit_reason, exit_price, asset, balance))
+
+        balance_history.append(balance + asset * close_price)
+
+    trade_log = pd.DataFrame(trades, columns=['Datetime', 'Action', 'Price', 'Asset_Balance', 'Balance'])
+    return balance_history, trade_log
+
+def sharded_backtest(signal_fn, data: pd.DataFrame, warmup: int = 200, start: int = 20, shards: int = None,
+                     max_workers: int = None, initial_balance: float = 50, stop_loss_pct: float = 0.05,
+                     take_profit_pct: float = 0.1, **params) -> tuple:
+    """
+    Backtests one strategy over a long history using all cores.
+
+    Signals are computed per shard in parallel (see `signal_series`), then the position is
+    simulated sequentially over them (see `simulate`), so the result does not depend on the
+    number of shards.
+
+    Returns:
+        tuple: The balance after each bar (list) and the trade log (pd.DataFrame).
+    """
+    signals = signal_series(signal_fn, data, warmup=warmup, start=start, shards=shards, max_workers=max_workers, **params)
+    return simulate(data, signals, start=start, initial_balance=initial_balance,
+                    stop_loss_pct=stop_loss_pct, take_profit_pct=take_profit_pct)
@@ -4,6 +4,10 @@ class SignalPool:
 
     This class allows the addition, removal, and combination of trading signals
     from multiple strategies, and provides a final decision based on weighted majority.
+
+    Signals can be added either as precomputed values or as producers (callables with an
+    estimated cost). Producers are evaluated lazily, cheapest first, and evaluation stops as soon
+    as the remaining weight can no longer change the weighted-majority result.
     """
 
     def __init__(self):
@@ -12,8 +16,12 @@ class SignalPool:
 
         Signals are stored in a dictionary where the key is the signal name,
         and the value contains the signal's decision ('buy', 'sell', 'hold') and its weight.
+        Producers not yet evaluated are stored separately with their weight and cost.
         """
         self.signals = {}
+        self.producers = {}
+        self.last_skipped = 0  # Producers skipped by the last combination
+        self.total_skipped = 0  # Producers skipped since the pool was created
 
     def add_signal(self, name: str, value: str, weight: int = 1):
         """
@@ -25,8 +33,22 @@ class SignalPool:
             weight (int, optional): The weight of the signal in the decision-making process (default is 1).
         """
         # Add or update the signal in the dictionary
+        self.producers.pop(name, None)
         self.signals[name] = {'value': value, 'weight': weight}
 
+    def add_producer(self, name: str, producer, weight: int = 1, cost: float = 1.0):
+        """
+        Adds or updates a lazily evaluated signal in the pool.
+
+        Args:
+            name (str): The name of the signal (e.g., 'macd', 'ml').
+            producer (callable): A function taking no arguments that returns 'buy', 'sell' or 'hold'.
+            weight (int, optional): The weight of the signal in the decision-making process (default is 1).
+            cost (float, optional): The estimated relative cost of evaluating the producer (default is 1.0).
+        """
+        self.signals.pop(name, None)
+        self.producers[name] = {'producer': producer, 'weight': weight, 'cost': cost}
+
     def remove_signal(self, name: str):
         """
         Removes a signal from the pool by its name.
@@ -37,6 +59,7 @@ class SignalPool:
         # Check if the signal exists and remove it
         if name in self.signals:
             del self.signals[name]
+        self.producers.pop(name, None)
 
     def get_combined_signal(self) -> str:
         """
@@ -45,12 +68,36 @@ class SignalPool:
         This method calculates the total weight for each decision ('buy', 'sell') and returns the
         decision with the highest weight. In case of a tie, 'hold' is returned.
 
+        Producers are evaluated cheapest first, and only until the decision is settled: once the
+        lead of 'buy' or 'sell' exceeds the total weight of the producers left, they are skipped.
+        The number skipped is recorded in `last_skipped` and added to `total_skipped`.
+
         Returns:
             str: The combined signal decision ('buy', 'sell', 'hold').
         """
         buy_weight = sum(sig['weight'] for sig in self.signals.values() if sig['value'] == 'buy')
         sell_weight = sum(sig['weight'] for sig in self.signals.values() if sig['value'] == 'sell')
 
+        # Evaluate producers cheapest first until the remaining weight cannot change the result
+        pending = sorted(self.producers.items(), key=lambda item: item[1]['cost'])
+        remaining_weight = sum(entry['weight'] for _, entry in pending)
+        evaluated = 0
+        for name, entry in pending:
+            if abs(buy_weight - sell_weight) > remaining_weight:
+                break
+            value = entry['producer']()
+            evaluated += 1
+            remaining_weight -= entry['weight']
+            del self.producers[name]
+            self.signals[name] = {'value': value, 'weight': entry['weight']}
+            if value == 'buy':
+                buy_weight += entry['weight']
+            elif value == 'sell':
+                sell_weight += entry['weight']
+
+        self.last_skipped = len(pending) - evaluated
+        self.total_skipped += self.last_skipped
+
         # Determine the final decision based on the weights
         if buy_weight > sell_weight:
             return 'buy'
@@ -65,4 +112,5 @@ class SignalPool:
 
         This method is useful for resetting the pool before adding new signals in the next iteration.
         """
-        self.signals.clear()
\ No newline at end of file
+        self.signals.clear()
+        self.producers.clear()
\ No newline at end of file
@@ -0,0 +1,186 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+import zlib
+from joblib import dump, load
+from config import STATE_PATH, MODEL_DIR, logger
+
+_MAGIC = b'SDPS'
+_VERSION = 1
+_FILE_HEADER = struct.Struct('<4sII')  # magic, version, slot size
+_SLOT_HEADER = struct.Struct('<QII')  # sequence, payload length, CRC32 of the payload
+
+# State restored when no checkpoint exists yet
+DEFAULT_STATE = {
+    'positions': {},  # asset -> free balance at the last checkpoint
+    'last_signals': {},  # strategy name -> last signal value
+    'previous_combined_signal': None,
+    'last_candle_time': None,  # Unix seconds of the last candle that was fully processed
+    'model_path': None,  # Path of the trained model artifact
+    'startup_buy_done': False,
+}
+
+class BotState:
+    """
+    Crash-safe, memory-mapped persistence of the bot's runtime state.
+
+    The file holds two fixed-size slots. Each checkpoint is written to the slot not holding the
+    latest state, with a sequence number and CRC, and only then flushed, so a crash mid-write
+    leaves the previous checkpoint intact. Loading picks the valid slot with the highest sequence.
+    """
+
+    def __init__(self, path: str = STATE_PATH, slot_size: int = 65536):
+        """
+        Opens (or creates) the state file and loads the latest checkpoint into `data`.
+
+        Args:
+            path (str, optional): The state file path (default is config.STATE_PATH).
+            slot_size (int, optional): Bytes per slot, limiting the size of the state (default is 65536).
+                A file written with another slot size is migrated, keeping its latest checkpoint.
+
+        Raises:
+            ValueError: If the file is not a bot state file, or its latest checkpoint does not fit in
+                a slot of `slot_size` bytes.
+        """
+        size = _FILE_HEADER.size + 2 * slot_size
+        if os.path.exists(path) and os.path.getsize(path) not in (0, size):
+            _migrate(path, slot_size)
+        elif not os.path.exists(path) or os.path.getsize(path) == 0:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(_FILE_HEADER.pack(_MAGIC, _VERSION, slot_size))
+                f.truncate(size)
+        self._file = open(path, 'r+b')
+        self._map = mmap.mmap(self._file.fileno(), size)
+        magic, version, stored_slot_size = _FILE_HEADER.unpack_from(self._map, 0)
+        if magic != _MAGIC or version != _VERSION or stored_slot_size != slot_size:
+            raise ValueError(f"{path} is not a version {_VERSION} bot state file.")
+        self.slot_size = slot_size
+        self.sequence = 0
+        self.data = dict(DEFAULT_STATE)
+        self._load()
+
+    def _slot_offset(self, slot: int) -> int:
+        return _FILE_HEADER.size + slot * self.slot_size
+
+    def _load(self):
+        best = _latest_checkpoint(self._map, self.slot_size)
+        if best is not None:
+            self.sequence = best[0]
+            self.data.update(json.loads(best[1]))
+            logger.info("Bot state restored", extra={'fields': {'sequence': self.sequence}})
+
+    def checkpoint(self, **updates):
+        """
+        Applies updates to the state and atomically persists it.
+
+        Args:
+            **updates: State keys and their new values (see DEFAULT_STATE).
+
+        Raises:
+            ValueError: If the serialized state does not fit in a slot; the state is then left unchanged.
+        """
+        # The in-memory state only changes once the checkpoint holding it has been written
+        data = {**self.data, **updates}
+        payload = json.dumps(data, default=str).encode('utf-8')
+        if len(payload) > self.slot_size - _SLOT_HEADER.size:
+            raise ValueError(f"Bot state of {len(payload)} bytes does not fit in a {self.slot_size} byte slot.")
+
+        # Write the payload first and the header last, into the slot not holding the latest state
+        sequence = self.sequence + 1
+        offset = self._slot_offset(sequence % 2)
+        self._map[offset + _SLOT_HEADER.size:offset + _SLOT_HEADER.size + len(payload)] = payload
+        _SLOT_HEADER.pack_into(self._map, offset, sequence, len(payload), zlib.crc32(payload))
+        self._map.flush()
+        self.sequence = sequence
+        self.data = data
+
+    def close(self):
+        """
+        Closes the state file.
+        """
+        self._map.close()
+        self._file.close()
+
+def _latest_checkpoint(buffer, slot_size: int) -> tuple:
+    # The (sequence, payload) of the valid slot with the highest sequence, or None if neither is valid
+    best = None
+    for slot in (0, 1):
+        offset = _FILE_HEADER.size + slot * slot_size
+        sequence, length, crc = _SLOT_HEADER.unpack_from(buffer, offset)
+        payload = bytes(buffer[offset + _SLOT_HEADER.size:offset + _SLOT_HEADER.size + length])
+        if sequence and length <= slot_size - _SLOT_HEADER.size and zlib.crc32(payload) == crc:
+            if best is None or sequence > best[0]:
+                best = (sequence, payload)
+    return best
+
+def _migrate(path: str, slot_size: int):
+    # Rewrites a state file with another slot size, keeping its latest checkpoint
+    with open(path, 'rb') as f:
+        content = f.read()
+    magic, version, stored_slot_size = (_FILE_HEADER.unpack_from(content, 0) if len(content) >= _FILE_HEADER.size
+                                        else (None, None, 0))
+    if magic != _MAGIC or version != _VERSION or len(content) != _FILE_HEADER.size + 2 * stored_slot_size:
+        raise ValueError(f"{path} is not a version {_VERSION} bot state file; move it aside to start from a fresh state.")
+    latest = _latest_checkpoint(content, stored_slot_size)
+    if latest is not None and len(latest[1]) > slot_size - _SLOT_HEADER.size:
+        raise ValueError(f"The bot state in {path} ({len(latest[1])} bytes) does not fit in a {slot_size} byte slot.")
+
+    migrated = bytearray(_FILE_HEADER.size + 2 * slot_size)
+    _FILE_HEADER.pack_into(migrated, 0, _MAGIC, _VERSION, slot_size)
+    if latest is not None:
+        sequence, payload = latest
+        offset = _FILE_HEADER.size + (sequence % 2) * slot_size
+        _SLOT_HEADER.pack_into(migrated, offset, sequence, len(payload), zlib.crc32(payload))
+        migrated[offset + _SLOT_HEADER.size:offset + _SLOT_HEADER.size + len(payload)] = payload
+    temporary = path + '.tmp'
+    with open(temporary, 'wb') as f:
+        f.write(migrated)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+    logger.info("Bot state file migrated", extra={'fields': {
+        'path': path, 'from_slot_size': stored_slot_size, 'to_slot_size': slot_size}})
+
+def save_model_artifact(model, directory: str = MODEL_DIR) -> str:
+    """
+    Saves a trained model under a content-addressed file name.
+
+    Args:
+        model: The trained model.
+        directory (str, optional): The directory holding model artifacts (default is config.MODEL_DIR).
+
+    Returns:
+        str: The path of the saved artifact.
+    """
+    os.makedirs(directory, exist_ok=True)
+    # A unique temporary name, so concurrent saves into the same directory do not overwrite each other
+    descriptor, temporary = tempfile.mkstemp(suffix='.joblib.tmp', dir=directory)
+    os.close(descriptor)
+    try:
+        dump(model, temporary)
+        with open(temporary, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()[:16]
+        path = os.path.join(directory, f'model-{digest}.joblib')
+        os.replace(temporary, path)
+    except BaseException:
+        os.remove(temporary)
+        raise
+    return path
+
+def load_model_artifact(path: str):
+    """
+    Loads a model saved by `save_model_artifact`.
+
+    Args:
+        path (str): The path of the artifact.
+
+    Returns:
+        The trained model, or None if the artifact is missing.
+    """
+    if not path or not os.path.exists(path):
+        return None
+    return load(path)
@@ -0,0 +1,154 @@
+import inspect
+import pandas as pd
+from config import ENABLED_STRATEGIES, STRATEGY_OVERRIDES, logger
+from features import FeaturePipeline
+from indicators import bollinger_trade_signal, macd_trade_signal, rsi_trade_signal, stochastic_trade_signal, atr_trade_signal
+from model import model_trade_signal
+
+class Strategy:
+    """
+    A trading signal together with what it needs to run.
+
+    Each strategy declares the candle columns it reads and the number of most recent candles
+    (its lookback) its signal depends on, so the engine fetches only the history the enabled
+    strategies need and hands each one just its window.
+    """
+
+    def __init__(self, name: str, signal, lookback, weight: int = 1, columns: tuple = ('close',),
+                 params: dict = None, cost: float = 1.0, context: tuple = (), pool: str = 'thread'):
+        """
+        Initializes a strategy.
+
+        Args:
+            name (str): The strategy name, used in the signal pool and the decision journal.
+            signal (callable): The signal function, taking a DataFrame and returning 'buy', 'sell' or 'hold'.
+            lookback (int or callable): The number of candles the signal needs, or a function of
+                `params` returning it.
+            weight (int, optional): The weight of the signal in the combined decision (default is 1).
+            columns (tuple, optional): The candle columns the signal reads (default is ('close',)).
+            params (dict, optional): Keyword arguments passed to the signal function.
+            cost (float, optional): The estimated relative cost of evaluating the signal (default is 1.0).
+            context (tuple, optional): Names of runtime objects the signal also takes, e.g. ('model',).
+            pool (str, optional): Where `evaluation.StrategyExecutor` runs the signal: 'thread' for
+                signals dominated by NumPy/pandas kernels, 'process' for pure-Python ones (default is 'thread').
+        """
+        self.name = name
+        self.signal = signal
+        self._lookback = lookback
+        self.weight = weight
+        self.columns = tuple(columns)
+        self.params = dict(params or {})
+        self.cost = cost
+        self.context = tuple(context)
+        self.pool = pool
+
+    @property
+    def lookback(self) -> int:
+        """
+        The number of most recent candles the signal depends on, for the current parameters.
+        """
+        return self._lookback(self.params) if callable(self._lookback) else self._lookback
+
+    def window(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Returns the last `lookback` candles of `df`, with only the declared columns.
+        """
+        return df.iloc[-self.lookback:][list(self.columns)]
+
+    def evaluate(self, df: pd.DataFrame, **context) -> str:
+        """
+        Runs the signal on its window of `df`.
+
+        Args:
+            df (pd.DataFrame): The candles, at least `lookback` of them for a complete result.
+            **context: Runtime objects the strategy declared in `context` (others are ignored).
+
+        Returns:
+            str: 'buy', 'sell' or 'hold'.
+        """
+        return self.signal(self.window(df), **self.arguments(**context))
+
+    def arguments(self, **context) -> dict:
+        """
+        Returns the keyword arguments of the signal function: the declared context and the parameters.
+        """
+        return {**{name: context[name] for name in self.context}, **self.params}
+
+    def configured(self, weight: int = None, params: dict = None, pool: str = None) -> 'Strategy':
+        """
+        Returns a copy of the strategy with the weight, parameters and pool overridden.
+
+        Raises:
+            ValueError: If a parameter is not taken by the signal function, or the pool is unknown.
+        """
+        accepted = inspect.signature(self.signal).parameters
+        unknown = sorted(set(params or {}) - set(accepted) - set(self.context))
+        if unknown:
+            raise ValueError(f"Unknown parameters {unknown} for strategy {self.name}")
+        if pool not in (None, 'thread', 'process'):
+            raise ValueError(f"Invalid pool {pool!r} for strategy {self.name}")
+        return Strategy(self.name, self.signal, self._lookback, weight=self.weight if weight is None else weight,
+                        columns=self.columns, params={**self.params, **(params or {})}, cost=self.cost,
+                        context=self.context, pool=pool or self.pool)
+
+# Keys a strategy override may set (see `Strategy.configured`)
+OVERRIDE_KEYS = ('weight', 'params', 'pool')
+
+# All available strategies by name. Lookbacks cover the longest window each signal reads:
+# exponentially weighted signals (MACD) get about three spans so the truncated history no longer
+# matters, and the ATR signal compares against the mean ATR of its whole window.
+REGISTRY = {}
+
+def register(strategy: Strategy) -> Strategy:
+    """
+    Adds a strategy to the registry, replacing any strategy with the same name.
+    """
+    REGISTRY[strategy.name] = strategy
+    return strategy
+
+register(Strategy('bollinger', bollinger_trade_signal,
+                  lookback=lambda params: max(params['window'], params['trend_period']),
+                  params={'window': 20, 'no_of_std': 2, 'trend_period': 50}))
+register(Strategy('macd', macd_trade_signal, lookback=3 * 26 + 9, params={'momentum_threshold': 0.001}))
+register(Strategy('rsi', rsi_trade_signal, lookback=14 + 1))
+register(Strategy('stochastic', stochastic_trade_signal, lookback=14 + 1, columns=('high', 'low', 'close')))
+register(Strategy('atr', atr_trade_signal, lookback=100, columns=('high', 'low', 'close')))
+register(Strategy('ml', model_trade_signal, lookback=FeaturePipeline.LOOKBACK, weight=2, columns=('close', 'volume'),
+                  cost=5, context=('model', 'pipeline')))
+
+def enabled_strategies(names: list = None, overrides: dict = None) -> list:
+    """
+    Returns the enabled strategies with their configured weights and parameters.
+
+    Args:
+        names (list of str, optional): The strategy names to enable (default is config.ENABLED_STRATEGIES).
+        overrides (dict, optional): Per-strategy 'weight', 'params' and 'pool' overrides
+            (default is config.STRATEGY_OVERRIDES).
+
+    Returns:
+        list of Strategy: The enabled strategies, in the order given.
+
+    Raises:
+        ValueError: If a name is not in the registry, or an override is invalid.
+    """
+    names = ENABLED_STRATEGIES if names is None else names
+    overrides = STRATEGY_OVERRIDES if overrides is None else overrides
+    unknown = [name for name in names if name not in REGISTRY]
+    if unknown:
+        raise ValueError(f"Unknown strategies {unknown}; available: {sorted(REGISTRY)}")
+    for name, override in overrides.items():
+        if name not in REGISTRY:
+            raise ValueError(f"Override for unknown strategy {name}; available: {sorted(REGISTRY)}")
+        invalid = sorted(set(override) - set(OVERRIDE_KEYS))
+        if invalid:
+            raise ValueError(f"Unknown override keys {invalid} for strategy {name}; allowed: {list(OVERRIDE_KEYS)}")
+    strategies = [REGISTRY[name].configured(**overrides.get(name, {})) for name in names]
+    logger.info("Strategies enabled", extra={'fields': {
+        'strategies': {strategy.name: {'weight': strategy.weight, 'lookback': strategy.lookback} for strategy in strategies}}})
+    return strategies
+
+def required_lookback(strategies: list) -> int:
+    """
+    Returns the number of candles needed to evaluate all the given strategies.
+    """
+    return max((strategy.lookback for strategy in strategies), default=0)
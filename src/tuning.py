@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed, dump
+from sklearn.model_selection import ParameterGrid, TimeSeriesSplit
+from sklearn.metrics import accuracy_score, f1_score
+from features import FeaturePipeline
+from model import build_features, create_model
+
+# Candidate hyperparameters searched by default for each model type
+DEFAULT_PARAM_GRIDS = {
+    'random_forest': {
+        'n_estimators': [50, 100, 200],
+        'max_depth': [None, 5, 10],
+        'min_samples_leaf': [1, 5, 20],
+    },
+    'decision_tree': {
+        'max_depth': [None, 3, 5, 10],
+        'min_samples_leaf': [1, 5, 20],
+    },
+}
+
+def purged_walk_forward_splits(n_samples: int, n_splits: int = 5, purge: int = FeaturePipeline.HORIZON) -> list:
+    """
+    Creates walk-forward train/test splits with a purge gap between them.
+
+    Each split trains on all rows before its test window and never on rows after it. The purge
+    drops the rows just before each test window from training so their targets cannot overlap it.
+
+    Args:
+        n_samples (int): The number of rows in the feature matrix.
+        n_splits (int, optional): The number of walk-forward folds (default is 5).
+        purge (int, optional): The number of rows dropped between train and test (default is
+            FeaturePipeline.HORIZON, the number of candles each target looks ahead).
+
+    Returns:
+        list: A list of (train_indices, test_indices) tuples.
+    """
+    return list(TimeSeriesSplit(n_splits=n_splits, gap=purge).split(np.empty((n_samples, 1))))
+
+def _evaluate_candidate(model_type: str, params: dict, X: np.ndarray, y: np.ndarray, splits: list) -> dict:
+    """
+    Fits one candidate on every fold and returns its mean and spread of test scores.
+    """
+    # Each candidate fits single-threaded; the parallelism is across candidates
+    fit_params = {**params, 'n_jobs': 1} if model_type == 'random_forest' else params
+
+    accuracies = []
+    f1_scores = []
+    for train_index, test_index in splits:
+        model = create_model(model_type, fit_params)
+        model.fit(X[train_index], y[train_index])
+        y_pred = model.predict(X[test_index])
+        accuracies.append(accuracy_score(y[test_index], y_pred))
+        f1_scores.append(f1_score(y[test_index], y_pred, zero_division=0))
+
+    return {
+        'params': params,
+        'mean_accuracy': float(np.mean(accuracies)),
+        'std_accuracy': float(np.std(accuracies)),
+        'mean_f1': float(np.mean(f1_scores)),
+        'std_f1': float(np.std(f1_scores)),
+    }
+
+def search_model(df, model_type: str = 'random_forest', param_grid: dict = None,
+                 n_splits: int = 5, purge: int = FeaturePipeline.HORIZON, scoring: str = 'f1', n_jobs: int = -1,
+                 artifact_path: str = None) -> tuple:
+    """
+    Searches model hyperparameters with purged walk-forward cross-validation.
+
+    The feature matrix is computed once and shared by every fold and candidate. Candidates run
+    in parallel worker processes; the feature arrays are memory-mapped rather than copied into
+    each worker, and at most two candidates per worker are queued at a time.
+
+    Args:
+        df (pd.DataFrame or FeaturePipeline): The input DataFrame containing the financial data,
+            or a feature pipeline already holding it.
+        model_type (str, optional): 'random_forest' or 'decision_tree' (default is 'random_forest').
+        param_grid (dict, optional): Candidate values per hyperparameter. Defaults to
+            DEFAULT_PARAM_GRIDS[model_type].
+        n_splits (int, optional): The number of walk-forward folds (default is 5).
+        purge (int, optional): The number of rows dropped between train and test (default is
+            FeaturePipeline.HORIZON).
+        scoring (str, optional): 'f1' or 'accuracy', the score candidates are ranked by (default is 'f1').
+        n_jobs (int, optional): The number of worker processes, -1 for all cores (default is -1).
+        artifact_path (str, optional): If given, the winning model is saved there with joblib.
+
+    Returns:
+        tuple: The winning model refitted on all rows, and a DataFrame ranking every candidate.
+    """
+    X, y = build_features(df)
+    splits = purged_walk_forward_splits(len(X), n_splits=n_splits, purge=purge)
+
+    candidates = ParameterGrid(param_grid or DEFAULT_PARAM_GRIDS[model_type])
+    results = Parallel(n_jobs=n_jobs, pre_dispatch='2*n_jobs', max_nbytes='1M')(
+        delayed(_evaluate_candidate)(model_type, params, X, y, splits) for params in candidates
+    )
+
+    report = pd.DataFrame(results).sort_values(
+        [f'mean_{scoring}', f'std_{scoring}'], ascending=[False, True], ignore_index=True
+    )
+    report.insert(0, 'rank', np.arange(1, len(report) + 1))
+
+    # Refit the winning candidate on every row so it sees the most recent data
+    model = create_model(model_type, report.loc[0, 'params'])
+    model.fit(X, y)
+
+    if artifact_path:
+        dump(model, artifact_path)
+
+    return model, report
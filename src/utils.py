@@ -1,31 +1,69 @@
-from decimal import Decimal, ROUND_DOWN
+from collections.abc import Mapping
+import numpy as np
 
-def format_quantity(quantity: float, precision: int = 8) -> Decimal:
+# Quote assets traded on the exchange, longest first so 'USDT' matches before 'USD'
+QUOTE_ASSETS = ('USDT', 'USDC', 'TRY', 'BTC', 'EUR', 'USD')
+
+def to_units(values, decimals, round_down: bool = True) -> np.ndarray:
     """
-    Formats a given quantity to a specified precision.
+    Converts amounts to integer multiples of 10**-decimals, element-wise and without Decimal.
+
+    The scaled values are first rounded to 6 decimal places, so float representation error
+    (e.g. 104.99 * 100 == 10498.999999999998) does not lose a unit when rounding down.
 
     Args:
-        quantity (float): The quantity to be formatted.
-        precision (int, optional): The number of decimal places to format to (default is 8).
+        values (float or array-like): The amounts.
+        decimals (int or array-like): The number of decimal places of each amount.
+        round_down (bool, optional): Round down, as order quantities must be (default is True);
+            otherwise round to the nearest unit.
 
     Returns:
-        Decimal: The formatted quantity as a Decimal object.
+        np.ndarray: The amounts as int64 units.
     """
-    # Ensure the quantity is formatted to the specified number of decimal places, rounding down
-    return Decimal(quantity).quantize(Decimal(f'1e-{precision}'), rounding=ROUND_DOWN)
+    scaled = np.round(np.asarray(values, dtype=np.float64) * 10.0 ** np.asarray(decimals), 6)
+    return (np.floor(scaled) if round_down else np.round(scaled)).astype(np.int64)
 
-def check_balance(symbol: str, required_amount: float, balances: list) -> bool:
+def format_units(units: int, decimals: int) -> str:
+    """
+    Formats integer units of 10**-decimals as a fixed-point decimal string (e.g. 10499, 2 -> '104.99').
+    """
+    units, decimals = int(units), int(decimals)
+    sign, digits = ('-' if units < 0 else ''), str(abs(units)).rjust(decimals + 1, '0')
+    return f"{sign}{digits[:-decimals]}.{digits[-decimals:]}" if decimals > 0 else f"{sign}{digits}"
+
+def split_symbol(symbol: str) -> tuple:
+    """
+    Splits a trading pair symbol into its base and quote assets.
+
+    Args:
+        symbol (str): The trading pair symbol (e.g., 'BTCTRY').
+
+    Returns:
+        tuple: A tuple containing the base and quote assets (e.g., ('BTC', 'TRY')).
+    """
+    for quote in QUOTE_ASSETS:
+        if symbol.endswith(quote) and len(symbol) > len(quote):
+            return symbol[:-len(quote)], quote
+    raise ValueError(f"Unknown quote asset in symbol: {symbol}")
+
+def check_balance(symbol: str, required_amount: float, balances) -> bool:
     """
     Checks if there is sufficient balance for a given asset symbol.
 
     Args:
         symbol (str): The symbol (e.g., 'BTC', 'TRY') to check the balance for.
         required_amount (float): The amount required to complete a transaction.
-        balances (list of dict): A list of dictionaries containing balance information for each asset.
+        balances (list of dict or Mapping): Either the list of balance dictionaries returned by
+            the exchange, or a mapping of asset to free balance (e.g., a BalanceLedger), which
+            is answered with a single lookup.
 
     Returns:
         bool: True if the required balance is available, False otherwise.
     """
+    # Mappings (such as the local balance ledger) are indexed by asset already
+    if isinstance(balances, Mapping):
+        return balances.get(symbol, 0.0) >= required_amount
+
     # Iterate through the balance list and find the balance for the given symbol
     for item in balances:
         if item['asset'] == symbol:
@@ -1,19 +1,24 @@
 import sys
 import ccxt
 import pandas as pd
-import matplotlib.pyplot as plt
 from datetime import datetime
 from tqdm import tqdm
 import os
+from functools import lru_cache
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
 
-from main import train_model, model_trade_signal, SignalPool
-from indicators import bollinger_trade_signal, macd_trade_signal, rsi_trade_signal, combined_bollinger_rsi_signal
+from model import train_model, model_trade_signal
+from indicators import bollinger_trade_signal, macd_trade_signal, rsi_trade_signal
+from exits import resolve_exit
+from candle_store import CandleStore
+from report import write_report
 
+@lru_cache(maxsize=None)
 def get_binance_data(symbol='BTC/TRY', timeframe='1m', since=None, limit=1000):
     """
-    Fetches historical data from Binance for the specified symbol.
+    Fetches historical data for the specified symbol, from the local candle store if it has
+    been backfilled (see src/backfill.py), otherwise from Binance.
 
     Args:
         symbol (str): The trading pair symbol (default is 'BTC/TRY').
@@ -24,11 +29,22 @@ def get_binance_data(symbol='BTC/TRY', timeframe='1m', since=None, limit=1000):
     Returns:
         pd.DataFrame: A DataFrame containing the historical data.
     """
+    if timeframe == '1m':
+        stored = CandleStore().load(symbol.replace('/', ''), resolution=1, start=since // 1000 if since else None)
+        if not stored.empty:
+            data = stored.reset_index().rename(columns={'time': 'Datetime'})
+            return data[['Datetime', 'close', 'low', 'high', 'volume']]
+
     exchange = ccxt.binance()
     ohlcv = exchange.fetch_ohlcv(symbol, timeframe=timeframe, since=since, limit=limit)
     data = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
     data['Datetime'] = pd.to_datetime(data['timestamp'], unit='ms')
-    return data[['Datetime', 'close']]
+    return data[['Datetime', 'close', 'low', 'high', 'volume']]
+
+def combined_bollinger_rsi_signal(df):
+    # Trade only when Bollinger Bands and RSI agree
+    bollinger, rsi = bollinger_trade_signal(df), rsi_trade_signal(df)
+    return bollinger if bollinger == rsi else 'hold'
 
 def run_backtest(indicator_signal, indicator_name, initial_balance_try=1000, stop_loss_pct=0.05, take_profit_pct=0.1):
     data = get_binance_data()
@@ -37,6 +53,8 @@ def run_backtest(indicator_signal, indicator_name, initial_balance_try=1000, sto
     balance_history = []
     trade_log = pd.DataFrame(columns=['Datetime', 'Action', 'Price', 'BTC_Balance', 'TRY_Balance'])
     entry_price = None
+    pending_exit = None
+    high, low, close = (data[column].to_numpy(dtype=float) for column in ('high', 'low', 'close'))
 
     for i in tqdm(range(20, len(data)), desc=f"Running {indicator_name} Backtest"):
         df = data.iloc[:i].copy()
@@ -49,6 +67,8 @@ def run_backtest(indicator_signal, indicator_name, initial_balance_try=1000, sto
             entry_price = close_price
             btc_balance = balance_try / close_price  # TRY to BTC conversion
             balance_try = 0
+            pending_exit = resolve_exit(high, low, close, i - 1, entry_price,
+                                        stop_loss_pct=stop_loss_pct, take_profit_pct=take_profit_pct)
             new_row = pd.DataFrame({
                 'Datetime': [datetime],
                 'Action': ['buy'],
@@ -61,6 +81,7 @@ def run_backtest(indicator_signal, indicator_name, initial_balance_try=1000, sto
         elif signal == 'sell' and btc_balance > 0:
             balance_try = btc_balance * close_price  # BTC to TRY conversion
             btc_balance = 0
+            pending_exit = None
             new_row = pd.DataFrame({
                 'Datetime': [datetime],
                 'Action': ['sell'],
@@ -71,32 +92,21 @@ def run_backtest(indicator_signal, indicator_name, initial_balance_try=1000, sto
             trade_log = pd.concat([trade_log, new_row], ignore_index=True)
             print(f"Selling BTC at {close_price} TRY/BTC, BTC balance: {btc_balance}, TRY balance: {balance_try} (Indicator: {indicator_name})", flush=True)
 
-        # Implement stop-loss and take-profit
-        if btc_balance > 0 and entry_price is not None:
-            if close_price <= entry_price * (1 - stop_loss_pct):
-                balance_try = btc_balance * close_price
-                btc_balance = 0
-                new_row = pd.DataFrame({
-                    'Datetime': [datetime],
-                    'Action': ['stop-loss'],
-                    'Price': [close_price],
-                    'BTC_Balance': [btc_balance],
-                    'TRY_Balance': [balance_try]
-                })
-                trade_log = pd.concat([trade_log, new_row], ignore_index=True)
-                print(f"Stop-loss triggered at {close_price} TRY/BTC", flush=True)
-            elif close_price >= entry_price * (1 + take_profit_pct):
-                balance_try = btc_balance * close_price
-                btc_balance = 0
-                new_row = pd.DataFrame({
-                    'Datetime': [datetime],
-                    'Action': ['take-profit'],
-                    'Price': [close_price],
-                    'BTC_Balance': [btc_balance],
-                    'TRY_Balance': [balance_try]
-                })
-                trade_log = pd.concat([trade_log, new_row], ignore_index=True)
-                print(f"Take-profit triggered at {close_price} TRY/BTC", flush=True)
+        # Exit on the bar where the high/low first crossed the stop-loss or take-profit
+        if btc_balance > 0 and pending_exit is not None and pending_exit[0] == i - 1:
+            _, exit_price, exit_reason = pending_exit
+            balance_try = btc_balance * exit_price
+            btc_balance = 0
+            pending_exit = None
+            new_row = pd.DataFrame({
+                'Datetime': [datetime],
+                'Action': [exit_reason],
+                'Price': [exit_price],
+                'BTC_Balance': [btc_balance],
+                'TRY_Balance': [balance_try]
+            })
+            trade_log = pd.concat([trade_log, new_row], ignore_index=True)
+            print(f"{exit_reason.capitalize()} triggered at {exit_price} TRY/BTC", flush=True)
 
         total_balance = balance_try + (btc_balance * close_price)
         balance_history.append(total_balance)
@@ -150,7 +160,6 @@ def run_ml_backtest(initial_balance_try=1000):
     return balance_history, trade_log
 
 # Run the backtests with different indicators
-plt.figure(figsize=(12, 6))
 
 balance_bollinger, trade_log_bollinger = run_backtest(bollinger_trade_signal, 'Bollinger Bands')
 balance_macd, trade_log_macd = run_backtest(macd_trade_signal, 'MACD')
@@ -166,16 +175,22 @@ total_balance = [
 
 data = get_binance_data()
 
-plt.plot(data['Datetime'][20:], balance_bollinger, label='Balance Over Time (Bollinger Bands)')
-plt.plot(data['Datetime'][20:], balance_macd, label='Balance Over Time (MACD)')
-plt.plot(data['Datetime'][20:], balance_rsi, label='Balance Over Time (RSI)')
-plt.plot(data['Datetime'][20:], balance_combined, label='Balance Over Time (Combined Bollinger & RSI)')
-plt.plot(data['Datetime'][20:], balance_ml, label='Balance Over Time (ML)')
-plt.plot(data['Datetime'][20:], total_balance, label='Total Balance', linestyle='--', linewidth=2, color='purple')
-
-plt.xlabel('Date')
-plt.ylabel('Balance (TRY)')
-plt.title('Backtesting Balance Over Time (TRY/BTC)')
-plt.legend()
-plt.grid(True)
-plt.show()
\ No newline at end of file
+# Write a static HTML report; every series is downsampled, so it stays small for long runs
+report_path = write_report(
+    os.path.join('reports', 'backtest_try-btc.html'), 'Backtesting Balance Over Time (TRY/BTC)',
+    {
+        'Bollinger Bands': balance_bollinger,
+        'MACD': balance_macd,
+        'RSI': balance_rsi,
+        'Combined Bollinger & RSI': balance_combined,
+        'ML': balance_ml,
+        'Total Balance': total_balance,
+    },
+    data['Datetime'][20:],
+    price=data.set_index('Datetime')['close'],
+    trades={'Bollinger Bands': trade_log_bollinger, 'MACD': trade_log_macd, 'RSI': trade_log_rsi,
+            'Combined Bollinger & RSI': trade_log_combined, 'ML': trade_log_ml},
+    summary={'Final balance (TRY)': f"{total_balance[-1]:.2f}", 'Bars': len(data)},
+    y_label='Balance (TRY)', dashed=('Total Balance',),
+)
+print(f"Report written to {report_path}", flush=True)
@@ -8,15 +8,26 @@ import sys
 import os
 import yfinance as yf
 import pandas as pd
-import matplotlib.pyplot as plt
 from tqdm import tqdm
+from functools import lru_cache
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
 
-from main import train_model, model_trade_signal
+from model import train_model, model_trade_signal
 from indicators import atr_trade_signal, bollinger_trade_signal, macd_trade_signal, rsi_trade_signal, stochastic_trade_signal
+from exits import resolve_exit
+from candle_store import CandleStore
+from backtest_cache import BacktestCache
+from report import write_report
 
+@lru_cache(maxsize=None)
 def get_yahoo_data():
+    # Prefer the last 5 days of BTCUSDT candles if they have been backfilled (see src/backfill.py)
+    stored = CandleStore().load('BTCUSDT', resolution=1, start=int(pd.Timestamp.now(tz='UTC').timestamp()) - 5 * 86400)
+    if not stored.empty:
+        data = stored.reset_index().rename(columns={'time': 'Datetime'})
+        return data[['Datetime', 'close', 'low', 'high', 'volume']]
+
     symbol = 'BTC-USD'
     data = yf.download(symbol, period='5d', interval='1m')
     data.reset_index(inplace=True)
@@ -30,6 +41,8 @@ def run_backtest(indicator_signal, indicator_name, initial_balance_usd=50, stop_
     balance_history = []
     trade_log = pd.DataFrame(columns=['Datetime', 'Action', 'Price', 'BTC_Balance', 'USD_Balance'])
     entry_price = None
+    pending_exit = None
+    high, low, close = (data[column].to_numpy(dtype=float) for column in ('high', 'low', 'close'))
 
     for i in tqdm(range(20, len(data)), desc=f"Running {indicator_name} Backtest"):
         df = data.iloc[:i].copy()
@@ -42,6 +55,8 @@ def run_backtest(indicator_signal, indicator_name, initial_balance_usd=50, stop_
             entry_price = close_price
             btc_balance = balance_usd / close_price
             balance_usd = 0
+            pending_exit = resolve_exit(high, low, close, i - 1, entry_price,
+                                        stop_loss_pct=stop_loss_pct, take_profit_pct=take_profit_pct)
             new_row = pd.DataFrame({
                 'Datetime': [datetime],
                 'Action': ['buy'],
@@ -54,6 +69,7 @@ def run_backtest(indicator_signal, indicator_name, initial_balance_usd=50, stop_
         elif signal == 'sell' and btc_balance > 0:
             balance_usd = btc_balance * close_price
             btc_balance = 0
+            pending_exit = None
             new_row = pd.DataFrame({
                 'Datetime': [datetime],
                 'Action': ['sell'],
@@ -64,32 +80,21 @@ def run_backtest(indicator_signal, indicator_name, initial_balance_usd=50, stop_
             trade_log = pd.concat([trade_log, new_row], ignore_index=True)
             print(f"Selling BTC at {close_price} USD, BTC balance: {btc_balance}, USD balance: {balance_usd} (Indicator: {indicator_name})", flush=True)
 
-        # Implement stop-loss and take-profit
-        if btc_balance > 0 and entry_price is not None:
-            if close_price <= entry_price * (1 - stop_loss_pct):
-                balance_usd = btc_balance * close_price
-                btc_balance = 0
-                new_row = pd.DataFrame({
-                    'Datetime': [datetime],
-                    'Action': ['stop-loss'],
-                    'Price': [close_price],
-                    'BTC_Balance': [btc_balance],
-                    'USD_Balance': [balance_usd]
-                })
-                trade_log = pd.concat([trade_log, new_row], ignore_index=True)
-                print(f"Stop-loss triggered at {close_price} USD", flush=True)
-            elif close_price >= entry_price * (1 + take_profit_pct):
-                balance_usd = btc_balance * close_price
-                btc_balance = 0
-                new_row = pd.DataFrame({
-                    'Datetime': [datetime],
-                    'Action': ['take-profit'],
-                    'Price': [close_price],
-                    'BTC_Balance': [btc_balance],
-                    'USD_Balance': [balance_usd]
-                })
-                trade_log = pd.concat([trade_log, new_row], ignore_index=True)
-                print(f"Take-profit triggered at {close_price} USD", flush=True)
+        # Exit on the bar where the high/low first crossed the stop-loss or take-profit
+        if btc_balance > 0 and pending_exit is not None and pending_exit[0] == i - 1:
+            _, exit_price, exit_reason = pending_exit
+            balance_usd = btc_balance * exit_price
+            btc_balance = 0
+            pending_exit = None
+            new_row = pd.DataFrame({
+                'Datetime': [datetime],
+                'Action': [exit_reason],
+                'Price': [exit_price],
+                'BTC_Balance': [btc_balance],
+                'USD_Balance': [balance_usd]
+            })
+            trade_log = pd.concat([trade_log, new_row], ignore_index=True)
+            print(f"{exit_reason.capitalize()} triggered at {exit_price} USD", flush=True)
 
         total_balance = balance_usd + btc_balance * close_price
         balance_history.append(total_balance)
@@ -142,15 +147,17 @@ def run_ml_backtest(initial_balance_usd=50):
 
     return balance_history, trade_log
 
-# Run the backtests with different indicators
-plt.figure(figsize=(12, 6))
-
-balance_bollinger, trade_log_bollinger = run_backtest(bollinger_trade_signal, 'Bollinger Bands')
-balance_macd, trade_log_macd = run_backtest(macd_trade_signal, 'MACD')
-balance_rsi, trade_log_rsi = run_backtest(rsi_trade_signal, 'RSI')
-balance_stochastic, trade_log_stochastic = run_backtest(stochastic_trade_signal, 'Stochastic')
-balance_atr, trade_log_atr = run_backtest(atr_trade_signal, 'ATR')
-balance_ml, trade_log_ml = run_ml_backtest()
+# Run the backtests with different indicators; runs whose data, code and parameters are
+# unchanged since a previous run are loaded from the backtest cache instead of recomputed
+cache = BacktestCache()
+data = get_yahoo_data()
+balance_bollinger, trade_log_bollinger = cache.run(run_backtest, bollinger_trade_signal, 'Bollinger Bands', data=data)
+balance_macd, trade_log_macd = cache.run(run_backtest, macd_trade_signal, 'MACD', data=data)
+balance_rsi, trade_log_rsi = cache.run(run_backtest, rsi_trade_signal, 'RSI', data=data)
+balance_stochastic, trade_log_stochastic = cache.run(run_backtest, stochastic_trade_signal, 'Stochastic', data=data)
+balance_atr, trade_log_atr = cache.run(run_backtest, atr_trade_signal, 'ATR', data=data)
+balance_ml, trade_log_ml = cache.run(run_ml_backtest, data=data)
+print(f"Backtest cache: {cache.hits} reused, {cache.misses} computed", flush=True)
 
 # Calculate the total balance across strategies
 initial_balance = 50
@@ -160,19 +167,23 @@ total_balance = [
 ]
 total_balance = [initial_balance] + total_balance
 
-data = get_yahoo_data()
-
-plt.plot(data['Datetime'][20:len(balance_bollinger)+20], balance_bollinger, label='Balance Over Time (Bollinger Bands)')
-plt.plot(data['Datetime'][20:], balance_macd, label='Balance Over Time (MACD)')
-plt.plot(data['Datetime'][20:], balance_rsi, label='Balance Over Time (RSI)')
-plt.plot(data['Datetime'][20:], balance_stochastic, label='Balance Over Time (Stochastic)')
-plt.plot(data['Datetime'][20:], balance_atr, label='Balance Over Time (ATR)')
-plt.plot(data['Datetime'][20:], balance_ml, label='Balance Over Time (ML)')
-plt.plot(data['Datetime'][20:], total_balance, label='Total Balance', linestyle='--', linewidth=2, color='purple')
-
-plt.xlabel('Date')
-plt.ylabel('Balance (USD)')
-plt.title('Backtesting Balance Over Time')
-plt.legend()
-plt.grid(True)
-plt.show()
\ No newline at end of file
+# Write a static HTML report; every series is downsampled, so it stays small for long runs
+report_path = write_report(
+    os.path.join('reports', 'backtest_usd-btc.html'), 'Backtesting Balance Over Time',
+    {
+        'Bollinger Bands': balance_bollinger,
+        'MACD': balance_macd,
+        'RSI': balance_rsi,
+        'Stochastic': balance_stochastic,
+        'ATR': balance_atr,
+        'ML': balance_ml,
+        'Total Balance': total_balance[1:],
+    },
+    data['Datetime'][20:],
+    price=data.set_index('Datetime')['close'],
+    trades={'Bollinger Bands': trade_log_bollinger, 'MACD': trade_log_macd, 'RSI': trade_log_rsi,
+            'Stochastic': trade_log_stochastic, 'ATR': trade_log_atr, 'ML': trade_log_ml},
+    summary={'Final balance (USD)': f"{total_balance[-1]:.2f}", 'Bars': len(data)},
+    y_label='Balance (USD)', dashed=('Total Balance',),
+)
+print(f"Report written to {report_path}", flush=True)
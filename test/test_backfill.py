@@ -0,0 +1,91 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from urllib.parse import parse_qs, urlparse
+import numpy as np
+import pandas as pd
+import pytest
+import requests
+import api
+import candle_store
+from backfill import backfill, chunk_ranges
+from candle_store import CandleStore
+
+START = 1700000000 - 1700000000 % 6000  # A multiple of the 100-candle chunk length used below
+
+class KlinesTransport:
+    """
+    Stands in for the exchange: one candle per minute of the requested range, closing at its index.
+    """
+
+    def __init__(self):
+        self.requests = []
+
+    def get(self, url, timeout=None):
+        query = parse_qs(urlparse(url).query)
+        start, end = int(query['from'][0]), int(query['to'][0])
+        self.requests.append((start, end))
+        times = list(range(start, end + 1, 60))
+        close = [float(t - START) / 60 for t in times]
+        response = requests.Response()
+        response.status_code = 200
+        response._content = pd.Series({'s': 'ok', 't': times, 'o': close, 'h': close, 'l': close, 'c': close,
+                                       'v': [1.0] * len(times)}).to_json().encode()
+        return response
+
+def make_candles(start, count, close=0.0):
+    index = pd.DatetimeIndex(pd.to_datetime(np.arange(start, start + 60 * count, 60), unit='s'), name='time')
+    return pd.DataFrame({column: np.full(count, close) for column in ('open', 'high', 'low', 'close', 'volume')},
+                        index=index)
+
+def test_chunk_ranges_are_aligned_and_cover_the_end():
+    length = 60 * 100
+    ranges = chunk_ranges(START + 90, START + 2 * length, chunk_bars=100)
+    assert ranges == [(START, START + length - 1), (START + length, START + 2 * length - 1),
+                      (START + 2 * length, START + 3 * length - 1)]
+    # An overlapping range gives the same boundaries, and an end just before a boundary adds no chunk
+    assert chunk_ranges(START + length + 5, START + 2 * length - 1, chunk_bars=100) == [ranges[1]]
+    assert chunk_ranges(START, START + length - 1, resolution=5, chunk_bars=20) == [(START, START + length - 1)]
+
+def test_backfill_resumes_by_skipping_stored_chunks(tmp_path, monkeypatch):
+    transport = KlinesTransport()
+    monkeypatch.setattr(api, 'transport', transport)
+    store = CandleStore(str(tmp_path))
+    end = START + 3 * 6000 - 1
+    store.write_chunk('BTCTRY', 1, START, START + 5999, make_candles(START, 100))
+
+    summary = backfill('BTCTRY', START, end, chunk_bars=100, max_workers=2, requests_per_second=1000, store=store)
+    assert (summary['chunks'], summary['skipped'], summary['downloaded'], summary['failed']) == (3, 1, 2, 0)
+    assert sorted(transport.requests) == [(START + 6000, START + 11999), (START + 12000, end)]
+    assert len(store.load('BTCTRY')) == 300
+
+    transport.requests.clear()
+    assert backfill('BTCTRY', START, end, chunk_bars=100, requests_per_second=1000, store=store)['skipped'] == 3
+    assert transport.requests == []
+
+def test_load_deduplicates_overlapping_chunks_and_filters_the_range(tmp_path):
+    store = CandleStore(str(tmp_path))
+    store.write_chunk('BTCTRY', 1, START, START + 5999, make_candles(START, 100, close=1.0))
+    store.write_chunk('BTCTRY', 1, START + 3000, START + 8999, make_candles(START + 3000, 100, close=2.0))
+    df = store.load('BTCTRY')
+    assert len(df) == 150 and df.index.is_monotonic_increasing and df.index.is_unique
+
+    df = store.load('BTCTRY', start=START + 600, end=START + 1199)
+    assert len(df) == 10
+    assert (df.index[0].timestamp(), df.index[-1].timestamp()) == (START + 600, START + 1140)
+    assert store.load('BTCTRY', start=START + 9000).empty
+    assert store.load('ETHTRY').empty
+
+def test_a_failed_write_leaves_no_chunk(tmp_path, monkeypatch):
+    store = CandleStore(str(tmp_path))
+    def failing_save(f, records):
+        f.write(b'\x93NUMPY')  # Part of a file, then the disk fills up
+        raise OSError('No space left on device')
+    monkeypatch.setattr(candle_store.np, 'save', failing_save)
+    with pytest.raises(OSError):
+        store.write_chunk('BTCTRY', 1, START, START + 5999, make_candles(START, 100))
+    monkeypatch.undo()
+    assert not store.has_chunk('BTCTRY', 1, START, START + 5999)
+    assert store.load('BTCTRY').empty
@@ -0,0 +1,66 @@
+import sys
+import os
+import importlib
+import textwrap
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import numpy as np
+import pytest
+from backtest_cache import BacktestCache, fingerprint_function
+
+CALLEE = textwrap.dedent('''
+    WINDOWS = {'short': 5, 'long': [20, 50]}
+
+    def score(values):
+        return sum(values)
+
+    class Pipeline:
+        def run(self):
+            return 1
+''')
+STRATEGY = textwrap.dedent('''
+    import callee_module
+    from callee_module import Pipeline, WINDOWS
+
+    def backtest(values):
+        return callee_module.score(values) + Pipeline().run() + WINDOWS['short']
+''')
+
+@pytest.fixture
+def modules(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    def load(callee):
+        (tmp_path / 'callee_module.py').write_text(callee)
+        (tmp_path / 'strategy_module.py').write_text(STRATEGY)
+        for name in ('callee_module', 'strategy_module'):
+            sys.modules.pop(name, None)
+        importlib.invalidate_caches()
+        return importlib.import_module('strategy_module')
+    yield load
+    for name in ('callee_module', 'strategy_module'):
+        sys.modules.pop(name, None)
+
+@pytest.mark.parametrize('old, new', [
+    ('return sum(values)', 'return sum(values) * 2'),  # A function used through its module
+    ('return 1', 'return 2'),  # A method of a class
+    ("'long': [20, 50]", "'long': [20, 60]"),  # A dict constant
+])
+def test_editing_a_callee_changes_the_fingerprint(modules, old, new):
+    before = fingerprint_function(modules(CALLEE).backtest)
+    assert fingerprint_function(modules(CALLEE).backtest) == before
+    assert fingerprint_function(modules(CALLEE.replace(old, new)).backtest) != before
+
+def test_none_results_are_cached(tmp_path):
+    calls = []
+    def backtest(values):
+        calls.append(values)
+        return None
+    cache = BacktestCache(root=str(tmp_path), max_bytes=1 << 20)
+    data = np.arange(10.0)
+    assert cache.run(backtest, 1, data=data) is None
+    assert cache.run(backtest, 1, data=data) is None
+    assert calls == [1] and (cache.hits, cache.misses) == (1, 1)
+    cache.run(backtest, 2, data=data)
+    assert calls == [1, 2]
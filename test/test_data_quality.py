@@ -0,0 +1,43 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import numpy as np
+import pandas as pd
+import pytest
+from data_quality import check_candles, quality_metrics
+
+def make_candles(times):
+    close = np.arange(1, len(times) + 1, dtype=np.float64)
+    index = pd.DatetimeIndex(pd.to_datetime(np.asarray(times), unit='s'), name='time')
+    return pd.DataFrame({'open': close, 'high': close + 1, 'low': close - 0.5, 'close': close, 'volume': 1.0}, index=index)
+
+def test_invalid_unsorted_and_duplicate_candles_are_repaired():
+    df = make_candles([0, 60, 120, 120, 240, 180, 300])
+    df.iloc[1, df.columns.get_loc('close')] = np.nan
+    checked, metrics = check_candles(df, spacing=60, symbol='TESTPAIR')
+    assert checked.index.is_monotonic_increasing and checked.index.is_unique
+    assert checked.loc[pd.Timestamp(120, unit='s'), 'close'] == 4  # The last candle of a timestamp is kept
+    assert (metrics['invalid'], metrics['unsorted'], metrics['duplicates']) == (1, 1, 1)
+    assert (metrics['gaps'], metrics['missing_bars']) == (1, 1)  # The dropped candle leaves a gap
+    assert quality_metrics('TESTPAIR')['invalid'] == 1
+
+def test_gaps_are_flagged_or_filled_up_to_the_limit():
+    df = make_candles([0, 60, 180, 240, 600])
+    flagged, metrics = check_candles(df, spacing=60, policy='flag')
+    assert len(flagged) == 5
+    assert (metrics['gaps'], metrics['missing_bars'], metrics['largest_gap']) == (2, 6, 5)
+
+    filled, metrics = check_candles(df, spacing=60, policy='fill', max_fill=3)
+    assert metrics['filled_bars'] == 1  # The five-candle gap is too long to fill
+    assert filled.loc[pd.Timestamp(120, unit='s')].tolist() == [2, 2, 2, 2, 0]
+    assert len(filled) == 6 and filled.index.is_monotonic_increasing
+
+def test_spacing_defaults_to_the_most_common_step():
+    _, metrics = check_candles(make_candles([0, 300, 600, 900, 1500]))
+    assert (metrics['gaps'], metrics['missing_bars']) == (1, 1)
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        check_candles(make_candles([0, 60]), policy='interpolate')
@@ -0,0 +1,64 @@
+import sys
+import os
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import numpy as np
+import pandas as pd
+from evaluation import StrategyExecutor
+from signal_pool import SignalPool
+from strategies import REGISTRY, Strategy
+
+def make_candles(count=300, seed=11):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, count)))
+    index = pd.date_range('2024-01-01', periods=count, freq='min', name='time')
+    return pd.DataFrame({'open': close, 'high': close * 1.005, 'low': close * 0.995, 'close': close, 'volume': 1.0}, index=index)
+
+def sleepy_signal(df, value='hold'):
+    time.sleep(0.2)
+    return value
+
+def test_concurrent_evaluation_matches_sequential():
+    df = make_candles()
+    strategies = [REGISTRY[name] for name in ('bollinger', 'macd', 'rsi', 'stochastic', 'atr')]
+    expected = [strategy.evaluate(df) for strategy in strategies]
+    executor = StrategyExecutor(max_workers=2)
+    try:
+        for pool in ('thread', 'process'):
+            futures = executor.submit([strategy.configured(pool=pool) for strategy in strategies], df)
+            assert [future.result() for future in futures.values()] == expected
+    finally:
+        executor.shutdown()
+
+def test_cycle_takes_about_as_long_as_the_slowest_strategy():
+    strategies = [Strategy(f'slow_{i}', sleepy_signal, lookback=10, params={'value': value})
+                  for i, value in enumerate(['buy', 'buy', 'sell', 'hold'])]
+    pool = SignalPool()
+    executor = StrategyExecutor(max_workers=4)
+    try:
+        start = time.perf_counter()
+        executor.add_producers(pool, strategies, make_candles())
+        assert pool.get_combined_signal() == 'buy'
+        assert time.perf_counter() - start < 0.6
+    finally:
+        executor.shutdown()
+
+def test_strategies_the_pool_skips_never_start():
+    started = []
+    def recorded_signal(df, name='', value='hold'):
+        started.append(name)
+        return value
+    cheap = [Strategy(f'cheap_{i}', recorded_signal, lookback=10, params={'name': f'cheap_{i}', 'value': 'buy'})
+             for i in range(3)]
+    expensive = Strategy('model', recorded_signal, lookback=10, cost=5, params={'name': 'model', 'value': 'sell'})
+    pool = SignalPool()
+    executor = StrategyExecutor(max_workers=4)
+    try:
+        executor.add_producers(pool, [expensive] + cheap, make_candles())
+        assert pool.get_combined_signal() == 'buy'
+        assert pool.last_skipped == 1
+        assert sorted(started) == ['cheap_0', 'cheap_1', 'cheap_2']
+    finally:
+        executor.shutdown()
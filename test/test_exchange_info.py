@@ -0,0 +1,68 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import requests
+import api
+from exchange_info import ExchangeInfo
+from orders import OrderBatch
+
+SYMBOLS = [
+    {'name': 'BTCTRY', 'status': 'TRADING', 'numeratorScale': 8, 'denominatorScale': 2,
+     'filters': [{'filterType': 'PRICE_FILTER', 'tickSize': '10', 'minExchangeValue': '99.91', 'minAmount': None}]},
+    {'name': 'ETHTRY', 'status': 'HALT', 'numeratorScale': 6, 'denominatorScale': 2, 'filters': []},
+]
+PRICES = {'BTCTRY': 3500000.0, 'ETHTRY': 100000.0, 'DOGETRY': 5.0}
+
+def test_validate_quantizes_and_rejects_locally():
+    info = ExchangeInfo(symbols=SYMBOLS)
+    units, precisions, reasons = info.validate(['BTCTRY', 'BTCTRY', 'ETHTRY', 'DOGETRY'], [104.99, 0.00000001, 1.0, 5.0],
+                                               [3500000.0, 3500000.0, 100000.0, 5.0], quote=[True, False, False, False])
+    assert units.tolist()[:2] == [10499, 1]
+    assert precisions.tolist()[:2] == [2, 8]
+    assert reasons.tolist() == ['', 'below minimum notional', 'pair not trading', 'unknown pair']
+
+def test_prices_are_rounded_to_the_tick():
+    units, precisions = ExchangeInfo(symbols=SYMBOLS).quantize_prices(['BTCTRY'], [3512345.678])
+    assert (units.tolist(), precisions.tolist()) == ([351235000], [2])
+
+def test_rules_are_fetched_once_and_refreshed_after_the_ttl(tmp_path):
+    calls, now = [], [1000.0]
+    def fetch():
+        calls.append(now[0])
+        return SYMBOLS
+    path = str(tmp_path / 'exchange_info.json')
+    info = ExchangeInfo(path=path, ttl=100, fetch=fetch, clock=lambda: now[0])
+    for _ in range(3):
+        assert info.rules('BTCTRY')['min_notional'] == 99.91
+    # Another instance reads the saved copy instead of fetching
+    assert ExchangeInfo(path=path, ttl=100, fetch=fetch, clock=lambda: now[0]).rules('ETHTRY')['trading'] is False
+    now[0] += 100
+    info.rules('BTCTRY')
+    assert calls == [1000.0, 1100.0]
+
+def test_order_batch_sends_only_valid_orders():
+    batch = OrderBatch(exchange_info=ExchangeInfo(symbols=SYMBOLS))
+    batch.add('BTCTRY', 'buy', 104.99, quote=True)
+    batch.add('ETHTRY', 'sell', 0.5)
+    batch.add('DOGETRY', 'sell', 100)
+    sent = []
+    batch.submit(PRICES, place=lambda *args, **kwargs: sent.append((args, kwargs)) or {})
+    assert sent == [(('BTCTRY', 'buy', 104.99), {'quantity_precision': 2})]
+
+def test_order_prices_are_sent_at_the_pair_tick_and_precision(monkeypatch):
+    sent = []
+    class Transport:
+        def post(self, url, json=None, **kwargs):
+            sent.append(json)
+            response = requests.Response()
+            response.status_code, response._content = 200, b'{"data": {}}'
+            return response
+    monkeypatch.setattr(api, 'transport', Transport())
+    info = ExchangeInfo(symbols=SYMBOLS)
+    api.place_order('BTCTRY', 'sell', 0.123456789, price=3512345.678, stop_loss=3400004.9, exchange_info=info)
+    api.place_order('BTCTRY', 'buy', 104.99, quantity_precision=2, exchange_info=info)
+    assert sent[0]['quantity'] == '0.12345678'
+    assert (sent[0]['price'], sent[0]['stopPrice'], sent[0]['takeProfitPrice']) == ('3512350.00', '3400000.00', None)
+    assert (sent[1]['quantity'], sent[1]['price'], sent[1]['stopPrice']) == ('104.99', 0, None)
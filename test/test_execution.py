@@ -0,0 +1,51 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from execution import ExecutionScheduler, SimulatedOrderBook, benchmark
+
+def run(scheduler, book):
+    next_time = scheduler.step()
+    while next_time is not None:
+        book.advance(next_time)
+        next_time = scheduler.step()
+
+def test_sliced_orders_slip_less_than_one_order():
+    results = benchmark('buy', 2000000.0, duration=300, interval=30)
+    assert all(result['filled'] > 0.999 for result in results.values())
+    assert results['twap']['children'] == 10
+    assert results['twap']['slippage_bps'] < results['single']['slippage_bps']
+    assert results['iceberg']['slippage_bps'] < results['single']['slippage_bps']
+
+def test_twap_spreads_rejected_children_over_the_rest_of_the_schedule():
+    book = SimulatedOrderBook()
+    sent = []
+    reported = []
+    def place(symbol, side, quantity, **kwargs):
+        sent.append(quantity)
+        return None if len(sent) == 2 else book.place(symbol, side, quantity)
+    def on_response(parent, quantity, response, price):
+        reported.append((parent.id, quantity, response is not None, price))
+    scheduler = ExecutionScheduler(place=place, order_book=book.order_book, clock=book.clock, on_response=on_response)
+    parent = scheduler.submit('BTCTRY', 'sell', 0.4, duration=40, interval=10)
+    run(scheduler, book)
+    assert parent.status == 'filled'
+    assert abs(parent.filled - 0.4) < 1e-8
+    assert sent == [0.1, 0.1, 0.15, 0.15]  # The rejected child is spread over the last two intervals
+    # Every child order is reported, the rejected one too, with the price it was valued at
+    assert [(quantity, accepted) for _, quantity, accepted, _ in reported] == [
+        (0.1, True), (0.1, False), (0.15, True), (0.15, True)]
+    assert all(id == parent.id and price == book.mid for id, _, _, price in reported)
+
+def test_small_orders_are_placed_at_once_and_stop_cancels_the_rest():
+    book = SimulatedOrderBook()
+    scheduler = ExecutionScheduler(place=book.place, order_book=book.order_book, slice_notional=100000)
+    assert scheduler.place('BTCTRY', 'buy', 5000.0)['data']['quantity'] == 5000.0
+    scheduler.start()
+    scheduled = scheduler.place('BTCTRY', 'buy', 500000.0)
+    parent = scheduler.parents[0]
+    assert scheduled == {'scheduled': parent.id}
+    scheduler.stop(timeout=0.5)
+    assert parent.status == 'cancelled'
+    assert 0 < parent.filled < 500000.0
@@ -0,0 +1,47 @@
+import sys
+import os
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from exits import resolve_exits, STOP_LOSS, TAKE_PROFIT, TRAILING_STOP, TIME_EXIT, NO_EXIT
+
+HIGH = np.array([101, 102, 104, 111, 108, 103, 100], dtype=float)
+LOW = np.array([99, 100, 101, 103, 102, 94, 90], dtype=float)
+CLOSE = np.array([100, 101, 103, 108, 103, 95, 92], dtype=float)
+
+def test_take_profit_hit_intrabar():
+    # The close never reaches 110, but the high of bar 3 does
+    exit_indices, exit_prices, exit_reasons = resolve_exits(HIGH, LOW, CLOSE, [0], [100], stop_loss_pct=0.05, take_profit_pct=0.1)
+    assert exit_indices[0] == 3
+    assert np.isclose(exit_prices[0], 110)
+    assert exit_reasons[0] == TAKE_PROFIT
+
+def test_stop_loss_hit_intrabar():
+    exit_indices, exit_prices, exit_reasons = resolve_exits(HIGH, LOW, CLOSE, [3], [108], stop_loss_pct=0.1)
+    assert exit_indices[0] == 5
+    assert np.isclose(exit_prices[0], 97.2)
+    assert exit_reasons[0] == STOP_LOSS
+
+def test_trailing_stop_follows_previous_highs():
+    exit_indices, exit_prices, exit_reasons = resolve_exits(HIGH, LOW, CLOSE, [0], [100], trailing_stop_pct=0.05)
+    # The highest high before bar 5 is 111, so the trailing stop sits at 105.45
+    assert exit_indices[0] == 4
+    assert np.isclose(exit_prices[0], 111 * 0.95)
+    assert exit_reasons[0] == TRAILING_STOP
+
+def test_gap_through_stop_fills_at_open():
+    open_ = np.array([100, 101, 102, 104, 107, 93, 91], dtype=float)
+    _, exit_prices, _ = resolve_exits(HIGH, LOW, CLOSE, [3], [108], stop_loss_pct=0.1, open_=open_)
+    assert exit_prices[0] == 93
+
+def test_time_exit_and_open_position():
+    exit_indices, exit_prices, exit_reasons = resolve_exits(HIGH, LOW, CLOSE, [0, 1], [100, 101], max_holding_bars=2)
+    assert list(exit_indices) == [2, 3]
+    assert list(exit_prices) == [103, 108]
+    assert list(exit_reasons) == [TIME_EXIT, TIME_EXIT]
+
+    exit_indices, exit_prices, exit_reasons = resolve_exits(HIGH, LOW, CLOSE, [5], [95], take_profit_pct=0.5)
+    assert exit_indices[0] == -1
+    assert np.isnan(exit_prices[0])
+    assert exit_reasons[0] == NO_EXIT
@@ -0,0 +1,49 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import numpy as np
+import pandas as pd
+from features import FEATURE_COLUMNS, FeaturePipeline
+
+def make_candles(count=600, seed=11):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range('2024-01-01', periods=count, freq='min', name='time')
+    return pd.DataFrame({'close': 100 * np.exp(np.cumsum(rng.normal(0, 0.01, count))),
+                         'volume': rng.random(count)}, index=index)
+
+def rolling_features(df: pd.DataFrame) -> np.ndarray:
+    return pd.DataFrame({
+        'returns': df['close'].pct_change(),
+        'SMA_50': df['close'].rolling(FeaturePipeline.SHORT_WINDOW).mean(),
+        'SMA_200': df['close'].rolling(FeaturePipeline.LONG_WINDOW).mean(),
+        'volume': df['volume'],
+    })[FEATURE_COLUMNS].to_numpy()
+
+def test_batch_and_incremental_features_match_the_rolling_computation():
+    df = make_candles()
+    expected = rolling_features(df)
+    batch = FeaturePipeline.from_frame(df)
+    incremental = FeaturePipeline(capacity=8)  # Grows while appending
+    for close, volume in zip(df['close'], df['volume']):
+        incremental.append(close, volume)
+    for pipeline in (batch, incremental):
+        np.testing.assert_allclose(pipeline.X, expected[FeaturePipeline.LOOKBACK - 1:-FeaturePipeline.HORIZON], rtol=1e-10)
+        np.testing.assert_allclose(pipeline.latest(), expected[-1:], rtol=1e-10)
+    np.testing.assert_array_equal(batch.y, incremental.y)
+
+def test_appending_after_from_frame_matches_building_from_all_candles():
+    df = make_candles()
+    full = FeaturePipeline.from_frame(df)
+    appended = FeaturePipeline.from_frame(df.iloc[:400])
+    for close, volume in zip(df['close'].iloc[400:], df['volume'].iloc[400:]):
+        appended.append(close, volume)
+    updated = FeaturePipeline.from_frame(df.iloc[:400])
+    updated.update(df.iloc[300:500])  # Only the candles after the last one seen are added
+    updated.update(df)
+    for pipeline in (appended, updated):
+        assert len(pipeline) == len(full) == len(df)
+        np.testing.assert_allclose(pipeline.X, full.X, rtol=1e-10)
+        np.testing.assert_array_equal(pipeline.y, full.y)
+        np.testing.assert_allclose(pipeline.latest(), full.latest(), rtol=1e-10)
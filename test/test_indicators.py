@@ -0,0 +1,56 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import numpy as np
+import pandas as pd
+import pytest
+import indicators
+from api import OHLCV_COLUMNS, parse_ohlcv
+from config import OHLCV_DTYPE
+
+def make_rows(count=120, seed=3):
+    close = 100 * np.exp(np.cumsum(np.random.default_rng(seed).normal(0, 0.01, count)))
+    return [{'time': 1700000000 + 60 * i, 'open': str(c), 'high': c * 1.01, 'low': c * 0.99, 'close': c, 'volume': '2.5'}
+            for i, c in enumerate(close)]
+
+@pytest.mark.parametrize('dtype', [OHLCV_DTYPE, 'float32'])
+def test_parse_ohlcv_gives_typed_columns(dtype):
+    df = parse_ohlcv(make_rows(), dtype=dtype)
+    assert list(df.columns) == list(OHLCV_COLUMNS)
+    assert all(df[column].dtype == np.dtype(dtype) for column in OHLCV_COLUMNS)
+    assert df.index.name == 'time' and df.index[1] - df.index[0] == pd.Timedelta(minutes=1)
+    assert df['volume'].iloc[0] == 2.5
+
+@pytest.mark.parametrize('function, columns', [
+    (indicators.bollinger_bands, ['SMA', 'Upper Band', 'Lower Band']),
+    (indicators.macd, ['MACD', 'Signal Line']),
+    (indicators.rsi, ['RSI']),
+    (indicators.stochastic_oscillator, ['%K', '%D']),
+    (indicators.atr, ['ATR']),
+])
+def test_indicators_return_their_columns_and_leave_the_input_unchanged(function, columns):
+    df = parse_ohlcv(make_rows())
+    original = df.copy()
+    result = function(df)
+    assert list(result.columns) == columns and result.index.equals(df.index)
+    assert result[columns[0]].dtype == df['close'].dtype
+    pd.testing.assert_frame_equal(df, original)
+
+def test_trade_signals_leave_the_input_unchanged():
+    df = parse_ohlcv(make_rows())
+    original = df.copy()
+    for signal in (indicators.bollinger_trade_signal, indicators.macd_trade_signal, indicators.rsi_trade_signal,
+                   indicators.stochastic_trade_signal, indicators.atr_trade_signal):
+        assert signal(df) in indicators.SIGNAL_CODES
+    pd.testing.assert_frame_equal(df, original)
+
+@pytest.mark.parametrize('name', sorted(indicators.SIGNAL_SERIES))
+def test_signal_series_cast_integer_prices_like_the_indicators(name):
+    df = parse_ohlcv(make_rows()) * 1000
+    whole = df.round().astype(np.int64)
+    series = indicators.SIGNAL_SERIES[name]
+    pd.testing.assert_series_equal(series(whole), series(whole.astype(np.float64)))
+    frames = {column: whole[[column]].rename(columns={column: 'BTCUSDT'}) for column in OHLCV_COLUMNS}
+    assert series(frames)['BTCUSDT'].tolist() == series(whole).tolist()
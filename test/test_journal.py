@@ -0,0 +1,74 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import pandas as pd
+import journal
+import pytest
+from journal import CYCLE, NOT_EVALUATED, ORDER, SCHEDULED, SIGNAL_CODES, DecisionJournal, read_journal
+
+def test_journal_for_other_strategies_is_rotated_or_rejected(tmp_path):
+    path = str(tmp_path / 'journal.bin')
+    journal = DecisionJournal(path, ['rsi', 'macd'])
+    journal.record_order('buy', 1.0)
+    journal.close()
+
+    with pytest.raises(ValueError):
+        DecisionJournal(path, ['rsi'])
+    DecisionJournal(path, ['rsi'], rotate=True).close()
+    assert read_journal(path)[0] == ['rsi']
+    rotated = [name for name in os.listdir(tmp_path) if name != 'journal.bin']
+    assert len(rotated) == 1
+    strategies, records = read_journal(str(tmp_path / rotated[0]))
+    assert strategies == ['rsi', 'macd'] and len(records) == 1
+
+def test_rotations_within_one_second_keep_every_journal(tmp_path, monkeypatch):
+    monkeypatch.setattr(journal.time, 'time', lambda: 1700000000.0)
+    path = str(tmp_path / 'journal.bin')
+    for strategies in (['rsi'], ['macd'], ['atr'], ['rsi']):
+        decisions = DecisionJournal(path, strategies, rotate=True)
+        decisions.record_order('buy', 1.0)
+        decisions.close()
+    assert sorted(os.listdir(tmp_path)) == ['journal.1700000000-1.bin', 'journal.1700000000-2.bin',
+                                            'journal.1700000000.bin', 'journal.bin']
+    assert read_journal(str(tmp_path / 'journal.1700000000-2.bin'))[0] == ['atr']
+
+def test_records_round_trip(tmp_path):
+    path = str(tmp_path / 'journal.bin')
+    candle = pd.Series({'open': 1.0, 'high': 2.0, 'low': 0.5, 'close': 1.5, 'volume': 10.0},
+                       name=pd.Timestamp('2024-01-01 00:05:00'))
+    journal = DecisionJournal(path, ['rsi', 'macd', 'atr'])
+    journal.record_cycle(candle, {'rsi': {'value': 'buy', 'weight': 1.0}, 'macd': {'value': 'sell', 'weight': 1.0}}, 'buy')
+    journal.record_order('buy', 0.25, price=100.0, accepted=False)
+    journal.record_order('sell', 2.0, scheduled=True)
+    journal.close()
+
+    strategies, records = read_journal(path)
+    assert strategies == ['rsi', 'macd', 'atr']
+    assert records['kind'].tolist() == [CYCLE, ORDER, SCHEDULED]
+    cycle, order, scheduled = records
+    assert cycle['candle_time'] == 1704067500
+    assert (cycle['open'], cycle['high'], cycle['low'], cycle['close'], cycle['volume']) == (1.0, 2.0, 0.5, 1.5, 10.0)
+    assert cycle['signals'].tolist() == [SIGNAL_CODES['buy'], SIGNAL_CODES['sell'], NOT_EVALUATED]
+    assert cycle['combined'] == SIGNAL_CODES['buy']
+    assert order['side'] == SIGNAL_CODES['buy'] and order['quantity'] == 0.25
+    assert order['price'] == 100.0 and not order['accepted']
+    assert scheduled['side'] == SIGNAL_CODES['sell'] and scheduled['quantity'] == 2.0 and not scheduled['accepted']
+
+def test_truncated_tail_is_ignored_and_dropped_on_reopen(tmp_path):
+    path = str(tmp_path / 'journal.bin')
+    journal = DecisionJournal(path, ['rsi'])
+    journal.record_order('buy', 1.0)
+    journal.record_order('sell', 2.0)
+    journal.close()
+    with open(path, 'ab') as f:
+        f.write(b'\x01' * 7)  # A crash mid-write
+
+    assert read_journal(path)[1]['quantity'].tolist() == [1.0, 2.0]
+    journal = DecisionJournal(path, ['rsi'])
+    journal.record_order('sell', 3.0)
+    journal.close()
+    _, records = read_journal(path)
+    assert records['quantity'].tolist() == [1.0, 2.0, 3.0]
+    assert records['side'].tolist() == [SIGNAL_CODES['buy'], SIGNAL_CODES['sell'], SIGNAL_CODES['sell']]
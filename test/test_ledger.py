@@ -0,0 +1,43 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from ledger import BalanceLedger
+
+BALANCES = [{'asset': 'TRY', 'free': '1000', 'locked': '0'}, {'asset': 'BTC', 'free': '0.01', 'locked': '0'}]
+
+def make_ledger():
+    ledger = BalanceLedger(fetch_balances=lambda: BALANCES, tolerance=1e-6)
+    assert ledger.reconcile()
+    return ledger
+
+def response(side, quantity, price='0', method='market'):
+    return {'success': True, 'data': {'pairSymbol': 'BTCTRY', 'type': side, 'quantity': str(quantity),
+                                      'price': price, 'method': method}}
+
+def test_limit_order_ack_reserves_until_filled():
+    ledger = make_ledger()
+    ledger.on_order_response(response('buy', 0.001, price='100000', method='limit'))
+    assert ledger.balances['TRY'] == {'free': 900.0, 'locked': 100.0}
+    ledger.on_fill('BTCTRY', 'buy', 0.001, 100000, fee=0.1)
+    assert ledger['BTC'] == 0.011
+    assert ledger.balances['TRY']['locked'] == 0 and abs(ledger['TRY'] - 899.9) < 1e-9
+
+def test_market_orders_are_applied_as_fills():
+    ledger = make_ledger()
+    ledger.on_order_response(response('buy', 500), price=100000)  # Quote amount, at the reference price
+    assert (ledger['TRY'], ledger['BTC']) == (500.0, 0.015)
+    ledger.on_order_response(response('sell', 0.005, price='110000'))  # The response price wins
+    assert (ledger['TRY'], round(ledger['BTC'], 12)) == (1050.0, 0.01)
+    assert all(entry['locked'] == 0 for entry in ledger.balances.values())
+
+def test_reconcile_records_drift():
+    ledger = make_ledger()
+    ledger.on_order_response(response('buy', 500), price=100000)
+    ledger.reconcile([{'asset': 'TRY', 'free': '500', 'locked': '0'}, {'asset': 'BTC', 'free': '0.015', 'locked': '0'}])
+    assert ledger.stats()['drift_events'] == 0 and ledger.max_drift == 0
+    ledger.reconcile(BALANCES)  # The exchange disagrees with the local fills
+    assert ledger.drift['TRY'] == -500.0 and abs(ledger.drift['BTC'] - 0.005) < 1e-12
+    assert ledger.stats()['drift_events'] == 1 and ledger.max_drift == 500.0
+    assert not ledger.reconcile([])
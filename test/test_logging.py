@@ -0,0 +1,20 @@
+import sys
+import os
+import logging
+import multiprocessing
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import config
+
+def root_handler_types(_) -> list:
+    return [type(handler).__name__ for handler in logging.getLogger().handlers]
+
+def test_text_format_keeps_structured_fields():
+    record = logging.LogRecord('bot', logging.INFO, __file__, 1, "Order placed", None, None)
+    record.fields = {'side': 'buy', 'quantity': 0.5}
+    assert config.TextFormatter().format(record) == 'INFO:bot:Order placed side="buy" quantity=0.5'
+
+def test_forked_children_log_directly():
+    with multiprocessing.get_context('fork').Pool(1) as pool:
+        assert pool.map(root_handler_types, [0]) == [['StreamHandler']]
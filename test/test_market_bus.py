@@ -0,0 +1,58 @@
+import sys
+import os
+import uuid
+from multiprocessing import shared_memory
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import numpy as np
+import pandas as pd
+import market_bus
+from market_bus import CandleBusReader, CandleBusWriter
+
+def candles(start: int, closes: list) -> pd.DataFrame:
+    index = pd.DatetimeIndex(pd.to_datetime([start + 60 * i for i in range(len(closes))], unit='s'), name='time')
+    closes = np.asarray(closes, dtype=np.float64)
+    return pd.DataFrame({'open': closes, 'high': closes + 1, 'low': closes - 1, 'close': closes,
+                         'volume': np.ones(len(closes))}, index=index)
+
+def test_reader_sees_new_candles_and_updates_to_the_last_one(monkeypatch):
+    # The reader shares the writer's process here, so it must not unregister the writer's buffer
+    monkeypatch.setattr(market_bus.resource_tracker, 'unregister', lambda *args: None)
+    symbol = f'TEST{uuid.uuid4().hex[:8]}'
+    writer = CandleBusWriter(symbol, capacity=4)
+    reader = CandleBusReader(symbol)
+    try:
+        assert writer.publish(candles(0, [1, 2, 3])) == 3
+        assert writer.publish(candles(0, [1, 2, 3])) == 1  # The last candle is rewritten in place
+        assert reader.count == 3
+
+        # The forming candle closes at 3.5 and two more candles follow, wrapping the ring buffer
+        assert writer.publish(candles(120, [3.5, 4, 5])) == 3
+        assert reader.count == 5
+        frame = reader.frame()
+        assert frame['close'].tolist() == [2, 3.5, 4, 5]
+        assert frame.index.as_unit('s').asi8.tolist() == [60, 120, 180, 240]
+        assert reader.window(2)[:, 4].tolist() == [4, 5]
+        assert writer.publish(candles(0, [1, 2])) == 0  # Older candles are ignored
+    finally:
+        reader.close()
+        writer.close()
+
+def test_writer_replaces_a_stale_buffer_and_readers_give_up_on_a_stuck_write(monkeypatch):
+    monkeypatch.setattr(market_bus.resource_tracker, 'unregister', lambda *args: None)
+    symbol = f'TEST{uuid.uuid4().hex[:8]}'
+    # A writer that crashed without closing leaves its buffer behind
+    stale = shared_memory.SharedMemory(name=market_bus.bus_name(symbol), create=True, size=64)
+    stale.close()
+    writer = CandleBusWriter(symbol, capacity=4)
+    reader = CandleBusReader(symbol)
+    try:
+        writer.publish(candles(0, [1, 2]))
+        assert reader.frame()['close'].tolist() == [1, 2]
+        writer.header[market_bus._SEQUENCE] += 1  # The writer dies halfway through a write
+        monkeypatch.setattr(market_bus, '_READ_ATTEMPTS', 5)
+        assert reader.window() is None and reader.frame() is None
+    finally:
+        reader.close()
+        writer.close()
@@ -0,0 +1,49 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import pytest
+from orders import OrderBatch
+
+PRICES = {'BTCTRY': 100.0, 'ETHTRY': 20.0}
+
+def submit(batch, prices=PRICES) -> list:
+    sent = []
+    batch.submit(prices, place=lambda *args, **kwargs: sent.append((args, kwargs)) or {'data': {}})
+    return sent
+
+def test_opposing_intents_cancel_out():
+    batch = OrderBatch(min_notional=10)
+    batch.add('BTCTRY', 'buy', 500.0, quote=True, source='rsi')
+    batch.add('BTCTRY', 'sell', 5.0, source='macd')
+    assert batch.net(PRICES) == []
+    assert submit(batch) == []
+    assert batch.intents == [] and batch.intents_received == 2 and batch.orders_sent == 0
+
+def test_startup_buy_and_sell_signal_net_into_one_order_per_pair():
+    batch = OrderBatch(min_notional=10)
+    batch.add('BTCTRY', 'buy', 1000.0, quote=True, source='startup')  # 10 BTC at 100
+    batch.add('BTCTRY', 'sell', 4.0, source='bollinger')
+    batch.add('ETHTRY', 'sell', 3.0, source='rsi')
+    batch.add('ETHTRY', 'buy', 20.0, quote=True, source='macd')  # 1 ETH at 20
+    # The net buy is sent in the quote asset, the net sell in the base asset
+    assert submit(batch) == [(('BTCTRY', 'buy', 600.0), {'quantity_precision': 2}),
+                             (('ETHTRY', 'sell', 2.0), {'quantity_precision': 8})]
+    assert batch.orders_sent == 2
+
+def test_net_orders_below_the_minimum_are_dropped():
+    batch = OrderBatch(min_notional=100)
+    batch.add('BTCTRY', 'buy', 1000.0, quote=True)
+    batch.add('BTCTRY', 'sell', 9.5)  # Leaves a 50 TRY buy
+    batch.add('ETHTRY', 'sell', 1.0)  # Worth 20 TRY
+    assert submit(batch) == []
+    assert batch.orders_sent == 0
+
+def test_pairs_without_a_price_are_refused():
+    batch = OrderBatch()
+    batch.add('XRPTRY', 'buy', 100.0, quote=True)
+    with pytest.raises(ValueError):
+        batch.net(PRICES)
+    with pytest.raises(ValueError):
+        batch.add('BTCTRY', 'hold', 1.0)
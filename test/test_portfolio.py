@@ -0,0 +1,56 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import numpy as np
+import pandas as pd
+import indicators
+from indicators import SIGNAL_CODES
+from portfolio import align_prices, signal_matrix, portfolio_backtest
+
+def make_candles(count=300, seed=5):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, count)))
+    index = pd.date_range('2024-01-01', periods=count, freq='min', name='time')
+    return pd.DataFrame({'open': close, 'high': close * (1 + rng.random(count) * 0.01),
+                         'low': close * (1 - rng.random(count) * 0.01), 'close': close, 'volume': 1.0}, index=index)
+
+def test_signal_series_match_scalar_signals():
+    df = make_candles()
+    pairs = [(indicators.bollinger_trade_signal, indicators.bollinger_signal_series),
+             (indicators.macd_trade_signal, indicators.macd_signal_series),
+             (indicators.rsi_trade_signal, indicators.rsi_signal_series),
+             (indicators.stochastic_trade_signal, indicators.stochastic_signal_series),
+             (indicators.atr_trade_signal, indicators.atr_signal_series)]
+    for scalar, vectorized in pairs:
+        expected = [SIGNAL_CODES[scalar(df.iloc[:t + 1])] for t in range(2, len(df))]
+        np.testing.assert_array_equal(vectorized(df).to_numpy()[2:], expected)
+
+def test_scalar_signals_read_the_last_bar():
+    falling = pd.DataFrame({'close': np.linspace(200, 100, 30), 'high': np.linspace(201, 101, 30),
+                            'low': np.linspace(199, 99, 30), 'volume': 1.0})
+    rising = falling.iloc[::-1].reset_index(drop=True)
+    assert indicators.rsi_trade_signal(falling) == 'buy' and indicators.rsi_trade_signal(rising) == 'sell'
+    assert indicators.rsi_trade_signal(falling.head(5)) == 'hold'  # Not enough bars for an RSI
+
+def test_single_pair_portfolio_matches_all_in_all_out_loop():
+    df = make_candles(count=1000, seed=7)
+    prices = align_prices({'BTCTRY': df})
+    signals = signal_matrix(prices, ['rsi'])
+    result = portfolio_backtest(prices, signals, initial_balance=1000, fee=0.0)
+
+    cash, units, equity = 1000.0, 0.0, []
+    for close, signal in zip(df['close'], signals['BTCTRY']):
+        if signal > 0 and units == 0:
+            cash, units = 0.0, cash / close
+        elif signal < 0 and units > 0:
+            cash, units = units * close, 0.0
+        equity.append(cash + units * close)
+    np.testing.assert_allclose(result['equity'].to_numpy(), equity)
+
+def test_weights_sum_to_one_when_invested():
+    prices = align_prices({f'PAIR{i}TRY': make_candles(seed=i) for i in range(4)})
+    for allocation in ('equal', 'signal', 'volatility'):
+        weights = portfolio_backtest(prices, signal_matrix(prices), allocation=allocation)['weights'].sum(axis=1)
+        assert np.all(np.isclose(weights, 1) | np.isclose(weights, 0))
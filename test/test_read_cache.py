@@ -0,0 +1,77 @@
+import sys
+import os
+import threading
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import pandas as pd
+import pytest
+from read_cache import ReadThroughCache
+
+class Clock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+def test_concurrent_identical_calls_share_one_call():
+    release, calls = threading.Event(), []
+    def fetch(symbol):
+        calls.append(symbol)
+        release.wait(5)
+        return [symbol]
+    cache = ReadThroughCache(fetch, ttl=60, clock=Clock())
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache('BTCTRY'))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    while cache.stats()['coalesced'] < 3:
+        threading.Event().wait(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert calls == ['BTCTRY'] and results == [['BTCTRY']] * 4
+    assert cache.stats() == {'hits': 0, 'misses': 1, 'coalesced': 3, 'evictions': 0, 'entries': 1}
+
+def test_results_expire_after_the_ttl_or_at_the_next_candle():
+    clock, calls = Clock(1000.0), []
+    cache = ReadThroughCache(lambda: calls.append(clock.now) or [clock.now], ttl=50, candle_seconds=60, clock=clock)
+    cache()
+    clock.now = 1019.0
+    cache()  # Cached: the candle that started at 960 is still forming
+    clock.now = 1020.0
+    cache()  # A new candle started at 1020
+    clock.now = 1069.0
+    cache()
+    clock.now = 1070.0
+    cache()  # The TTL expired before the next candle
+    assert calls == [1000.0, 1020.0, 1070.0]
+
+def test_least_recently_used_results_are_evicted():
+    calls = []
+    cache = ReadThroughCache(lambda symbol: calls.append(symbol) or [symbol], ttl=60, max_entries=2, clock=Clock())
+    cache('A'), cache('B'), cache('A'), cache('C'), cache('A'), cache('B')
+    assert calls == ['A', 'B', 'C', 'B']
+    assert cache.stats()['evictions'] == 2
+
+def test_failures_are_not_cached():
+    outcomes = [RuntimeError('timeout'), [], ['ok']]
+    def fetch():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+    cache = ReadThroughCache(fetch, ttl=60, clock=Clock())
+    with pytest.raises(RuntimeError):
+        cache()
+    assert cache() == []
+    assert cache() == ['ok'] and cache() == ['ok']
+    assert cache.stats()['misses'] == 3
+
+def test_callers_cannot_modify_the_cached_result():
+    cache = ReadThroughCache(lambda: pd.DataFrame({'close': [1.0, 2.0]}), ttl=60, clock=Clock())
+    first = cache()
+    first['close'] *= 10
+    first.loc[0, 'close'] = -1
+    assert cache()['close'].tolist() == [1.0, 2.0]
@@ -0,0 +1,61 @@
+import sys
+import os
+import json
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import requests
+import api
+from replay import recording, replay_cycles, compare_runs
+
+class FakeExchange:
+    def __init__(self):
+        self.calls = 0
+
+    def _response(self, payload):
+        response = requests.Response()
+        response.status_code = 200
+        response.encoding = 'utf-8'
+        response._content = json.dumps(payload).encode('utf-8')
+        return response
+
+    def get(self, url, **kwargs):
+        self.calls += 1
+        rows = [{'time': 1700000000 + 60 * i, 'open': 100 + i, 'high': 101 + i, 'low': 99 + i,
+                 'close': 100.5 + i + self.calls, 'volume': 1} for i in range(10)]
+        return self._response(rows)
+
+    def post(self, url, **kwargs):
+        self.calls += 1
+        return self._response({'data': {'id': self.calls}})
+
+def cycle():
+    df = api.get_ohlcv('BTCTRY')
+    side = 'buy' if df['close'].iloc[-1] > df['open'].iloc[-1] else 'sell'
+    api.place_order('BTCTRY', side, 0.001)
+
+def test_replay_reproduces_recorded_cycles(tmp_path):
+    path = str(tmp_path / 'recording.jsonl.gz')
+    previous, api.transport = api.transport, FakeExchange()
+    try:
+        with recording(path) as recorder:
+            for _ in range(3):
+                cycle()
+                recorder.mark_cycle()
+    finally:
+        api.transport = previous
+
+    baseline = replay_cycles(path, cycle)
+    candidate = replay_cycles(path, cycle)
+    assert api.transport is previous
+    assert len(baseline['cycle_seconds']) == 3
+    assert baseline['served'] == 6 and baseline['missed'] == 0
+    assert [params['pairSymbol'] for _, _, params in baseline['sent']] == ['BTCTRY'] * 3
+    assert compare_runs(baseline, candidate)['identical']
+
+def test_unrecorded_request_fails_like_a_network_error(tmp_path):
+    path = str(tmp_path / 'empty.jsonl.gz')
+    with recording(path):
+        pass
+    result = replay_cycles(path, lambda: api.get_ohlcv('BTCTRY'))
+    assert result['missed'] == 1
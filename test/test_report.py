@@ -0,0 +1,41 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import numpy as np
+import pandas as pd
+from report import lttb, write_report
+
+def test_lttb_keeps_the_endpoints_and_the_peaks():
+    x = np.arange(10000, dtype=np.float64)
+    y = np.sin(x / 500)
+    y[4321] = 50.0
+    kept = lttb(x, y, threshold=200)
+    assert len(kept) == 200
+    assert kept[0] == 0 and kept[-1] == 9999
+    assert np.all(np.diff(kept) > 0)
+    assert 4321 in kept
+
+def test_lttb_keeps_every_point_of_short_series():
+    x, y = np.arange(50.0), np.ones(50)
+    np.testing.assert_array_equal(lttb(x, y, threshold=50), np.arange(50))
+    np.testing.assert_array_equal(lttb(x, y, threshold=500), np.arange(50))
+
+def test_write_report_draws_every_trade_and_downsampled_series(tmp_path):
+    index = pd.date_range('2024-01-01', periods=5000, freq='min')
+    price = pd.Series(100 + np.cumsum(np.random.default_rng(2).normal(size=5000)), index=index)
+    # Trade logs built row by row with pd.concat hold their timestamps in an object column
+    trades = pd.DataFrame({'Datetime': pd.Series(list(index[[10, 500, 900, 4000]]), dtype=object), 'Action': ['buy', 'sell', 'buy', 'stop-loss'],
+                           'Price': price.iloc[[10, 500, 900, 4000]].to_numpy()})
+    path = write_report(str(tmp_path / 'report' / 'run.html'), 'Run <1>', {'RSI': price.to_numpy(), 'Total': price.to_numpy()},
+                        index, price=price, trades={'RSI': trades, 'MACD': trades.iloc[:0]},
+                        summary={'Final balance': 123.4}, points=300, dashed=('Total',))
+    with open(path, encoding='utf-8') as f:
+        document = f.read()
+    assert document.count('<circle') == 4
+    assert document.count('<polyline') == 3
+    assert document.count('stroke-dasharray') == 1
+    assert all(len(line.split('points="')[1].split('"')[0].split()) == 300
+               for line in document.splitlines() if '<polyline' in line)
+    assert 'Run &lt;1&gt;' in document and 'Final balance' in document
@@ -0,0 +1,39 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import numpy as np
+import pandas as pd
+from indicators import SIGNAL_CODES, bollinger_trade_signal, macd_trade_signal
+from sharded_backtest import shard_ranges, signal_series, sharded_backtest
+
+def make_candles(count=600, seed=3):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.004, count)))
+    index = pd.date_range('2024-01-01', periods=count, freq='min', name='time')
+    return pd.DataFrame({'close': close, 'high': close * 1.003, 'low': close * 0.997, 'volume': 1.0}, index=index)
+
+def test_shard_ranges_cover_the_range_once():
+    ranges = shard_ranges(20, 1000, 7)
+    assert ranges[0][0] == 20 and ranges[-1][1] == 1000
+    assert all(a_end == b_start for (_, a_end), (b_start, _) in zip(ranges, ranges[1:]))
+
+def test_sharded_run_matches_sequential_run():
+    data = make_candles()
+    sequential_signals = signal_series(bollinger_trade_signal, data, warmup=60, max_workers=1)
+    sharded_signals = signal_series(bollinger_trade_signal, data, warmup=60, shards=5, max_workers=2)
+    np.testing.assert_array_equal(sequential_signals, sharded_signals)
+
+    sequential = sharded_backtest(bollinger_trade_signal, data, warmup=60, max_workers=1)
+    sharded = sharded_backtest(bollinger_trade_signal, data, warmup=60, shards=5, max_workers=2)
+    assert sequential[0] == sharded[0]
+    assert sequential[1].equals(sharded[1])
+
+def test_default_warmup_matches_the_full_history_for_an_ewm_strategy():
+    data = make_candles(count=700)
+    # Each bar evaluated on every candle before it, as the backtest scripts do
+    full_history = [SIGNAL_CODES[macd_trade_signal(data.iloc[:i])] for i in range(20, len(data))]
+    np.testing.assert_array_equal(signal_series(macd_trade_signal, data, max_workers=1), full_history)
+    # A warmup shorter than the convergence length changes signals
+    assert (signal_series(macd_trade_signal, data, warmup=60, max_workers=1) != full_history).any()
@@ -0,0 +1,54 @@
+import sys
+import os
+import itertools
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from signal_pool import SignalPool
+
+def eager_combined_signal(values, weights):
+    buy_weight = sum(weight for value, weight in zip(values, weights) if value == 'buy')
+    sell_weight = sum(weight for value, weight in zip(values, weights) if value == 'sell')
+    if buy_weight > sell_weight:
+        return 'buy'
+    elif sell_weight > buy_weight:
+        return 'sell'
+    return 'hold'
+
+def test_lazy_evaluation_matches_eager_decision():
+    weights = [1, 1, 1, 2]
+    costs = [3, 1, 2, 10]
+    for values in itertools.product(['buy', 'sell', 'hold'], repeat=len(weights)):
+        pool = SignalPool()
+        for i, (value, weight, cost) in enumerate(zip(values, weights, costs)):
+            pool.add_producer(f'signal_{i}', lambda value=value: value, weight=weight, cost=cost)
+        assert pool.get_combined_signal() == eager_combined_signal(values, weights)
+
+def test_short_circuit_skips_expensive_producers():
+    calls = []
+
+    def producer(name, value):
+        def evaluate():
+            calls.append(name)
+            return value
+        return evaluate
+
+    pool = SignalPool()
+    pool.add_producer('ml', producer('ml', 'sell'), weight=2, cost=10)
+    pool.add_signal('precomputed', 'buy', weight=1)
+    for name in ('rsi', 'macd', 'bollinger'):
+        pool.add_producer(name, producer(name, 'buy'), weight=1, cost=1)
+
+    # Once the cheap producers give 'buy' a lead of 4 against a remaining weight of 2,
+    # the expensive ML producer cannot change the result and is never called
+    assert pool.get_combined_signal() == 'buy'
+    assert calls == ['rsi', 'macd', 'bollinger']
+    assert pool.last_skipped == 1
+    assert pool.total_skipped == 1
+
+def test_reset_clears_producers():
+    pool = SignalPool()
+    pool.add_producer('rsi', lambda: 'buy')
+    pool.reset()
+    assert pool.get_combined_signal() == 'hold'
+    assert pool.last_skipped == 0
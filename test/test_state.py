@@ -0,0 +1,56 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import pytest
+from state import BotState, load_model_artifact, save_model_artifact
+
+def test_checkpoints_survive_a_slot_size_change(tmp_path):
+    path = str(tmp_path / 'state.bin')
+    state = BotState(path, slot_size=4096)
+    state.checkpoint(positions={'BTC': 0.5})
+    state.checkpoint(startup_buy_done=True)
+    state.close()
+
+    state = BotState(path, slot_size=8192)
+    assert os.path.getsize(path) == 12 + 2 * 8192
+    assert state.data['positions'] == {'BTC': 0.5} and state.data['startup_buy_done'] is True
+    state.checkpoint(last_candle_time=1700000000)
+    state.close()
+    state = BotState(path, slot_size=8192)
+    assert state.sequence == 3 and state.data['last_candle_time'] == 1700000000
+    state.close()
+
+def test_other_files_are_refused_not_overwritten(tmp_path):
+    path = str(tmp_path / 'state.bin')
+    with open(path, 'wb') as f:
+        f.write(b'not a state file')
+    with pytest.raises(ValueError):
+        BotState(path, slot_size=4096)
+    with open(path, 'rb') as f:
+        assert f.read() == b'not a state file'
+
+    big = str(tmp_path / 'big.bin')
+    state = BotState(big, slot_size=4096)
+    state.checkpoint(last_signals={f'strategy_{i}': 'hold' for i in range(100)})
+    state.close()
+    with pytest.raises(ValueError):
+        BotState(big, slot_size=256)
+    assert os.path.getsize(big) == 12 + 2 * 4096
+
+def test_a_checkpoint_that_does_not_fit_leaves_the_state_unchanged(tmp_path):
+    state = BotState(str(tmp_path / 'state.bin'), slot_size=256)
+    state.checkpoint(positions={'BTC': 0.5})
+    with pytest.raises(ValueError):
+        state.checkpoint(positions={f'COIN{i}': 1.0 for i in range(100)})
+    assert state.data['positions'] == {'BTC': 0.5} and state.sequence == 1
+    state.close()
+
+def test_model_artifacts_are_saved_without_leftover_temporary_files(tmp_path):
+    directory = str(tmp_path / 'models')
+    first = save_model_artifact({'weights': [1, 2]}, directory)
+    second = save_model_artifact({'weights': [3]}, directory)
+    assert first != second
+    assert sorted(os.listdir(directory)) == sorted(os.path.basename(path) for path in (first, second))
+    assert load_model_artifact(first) == {'weights': [1, 2]}
@@ -0,0 +1,32 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import pytest
+from strategies import REGISTRY, enabled_strategies, required_lookback
+
+def test_enabled_strategies_apply_overrides_in_the_given_order():
+    strategies = enabled_strategies(['rsi', 'bollinger'], {'bollinger': {'weight': 3, 'params': {'window': 80}}})
+    assert [strategy.name for strategy in strategies] == ['rsi', 'bollinger']
+    bollinger = strategies[1]
+    assert bollinger.weight == 3
+    assert bollinger.params == {'window': 80, 'no_of_std': 2, 'trend_period': 50}
+    assert bollinger.lookback == 80  # The lookback follows the overridden window
+    assert REGISTRY['bollinger'].params['window'] == 20  # The registry entry is not modified
+
+def test_required_lookback_is_the_longest_window():
+    assert required_lookback(enabled_strategies(['rsi', 'macd', 'atr'], {})) == 100
+    assert required_lookback(enabled_strategies(['rsi', 'stochastic'], {})) == 15
+    assert required_lookback([]) == 0
+
+@pytest.mark.parametrize('names, overrides', [
+    (['rsi', 'unknown'], {}),
+    (['rsi'], {'unknown': {'weight': 2}}),
+    (['rsi'], {'rsi': {'wieght': 2}}),
+    (['bollinger'], {'bollinger': {'params': {'windw': 10}}}),
+    (['rsi'], {'rsi': {'pool': 'gpu'}}),
+])
+def test_invalid_names_and_overrides_are_rejected(names, overrides):
+    with pytest.raises(ValueError):
+        enabled_strategies(names, overrides)
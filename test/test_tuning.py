@@ -0,0 +1,56 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import numpy as np
+import pandas as pd
+from features import FeaturePipeline
+from model import build_features, prepare_data
+from joblib import load
+from tuning import purged_walk_forward_splits, search_model
+
+def test_splits_walk_forward_with_the_purge_gap():
+    splits = purged_walk_forward_splits(100, n_splits=4, purge=3)
+    assert len(splits) == 4
+    previous_end = None
+    for train, test in splits:
+        assert not set(train) & set(test)
+        assert np.array_equal(test, np.arange(test[0], test[-1] + 1))
+        assert train.max() == test.min() - 4  # Exactly `purge` rows dropped before the test window
+        assert previous_end is None or test[0] == previous_end + 1
+        previous_end = test[-1]
+    assert previous_end == 99
+
+def test_target_is_the_next_candle_direction():
+    close = 100 + np.cumsum(np.random.default_rng(1).normal(size=300))
+    pipeline = FeaturePipeline.from_frame(pd.DataFrame({'close': close, 'volume': 1.0}))
+    X, y = pipeline.X, pipeline.y
+    assert len(X) == len(y) == 300 - FeaturePipeline.LOOKBACK
+    # Row i (candle LOOKBACK - 1 + i) is labelled with the direction of the candle after it
+    next_returns = close[FeaturePipeline.LOOKBACK:] / close[FeaturePipeline.LOOKBACK - 1:-1] - 1
+    assert np.array_equal(y, (next_returns > 0).astype(int))
+    assert np.array_equal(X[:, 0], close[FeaturePipeline.LOOKBACK - 1:-1] / close[FeaturePipeline.LOOKBACK - 2:-2] - 1)
+
+    X_train, X_test, y_train, y_test = prepare_data(pipeline)
+    assert len(X_test) == 20 and len(X_train) == 80 - FeaturePipeline.HORIZON
+    assert np.array_equal(X_test, X[80:]) and np.array_equal(y_train, y[:len(X_train)])
+
+def test_search_model_ranks_candidates_and_saves_the_winner(tmp_path):
+    rng = np.random.default_rng(2)
+    df = pd.DataFrame({'close': 100 + np.cumsum(rng.normal(size=400)), 'volume': rng.uniform(1, 2, 400)})
+    path = str(tmp_path / 'model.joblib')
+    grid = {'max_depth': [1, 3, 5], 'min_samples_leaf': [1, 20]}
+    model, report = search_model(df, model_type='decision_tree', param_grid=grid, n_splits=3, n_jobs=2,
+                                 artifact_path=path)
+
+    assert len(report) == 6 and report['rank'].tolist() == [1, 2, 3, 4, 5, 6]
+    scores = list(zip(-report['mean_f1'], report['std_f1']))
+    assert scores == sorted(scores)  # Best mean out-of-fold score first, ties broken by the smaller spread
+    assert model.get_params()['max_depth'] == report.loc[0, 'params']['max_depth']
+    assert model.get_params()['min_samples_leaf'] == report.loc[0, 'params']['min_samples_leaf']
+
+    X, _ = build_features(df)
+    saved = load(path)
+    assert saved.get_params() == model.get_params()
+    assert np.array_equal(saved.predict(X), model.predict(X))
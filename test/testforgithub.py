@@ -9,7 +9,7 @@ from indicators import (
     stochastic_trade_signal,
     atr_trade_signal
 )
-from main import train_model, model_trade_signal
+from model import train_model, model_trade_signal
 
 def get_yahoo_data():
     """